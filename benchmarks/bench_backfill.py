@@ -0,0 +1,172 @@
+# 과거 구간 백필(fng.backfill) 동등성 확인 + 벤치마크 (네트워크 불필요)
+#   1) 백필의 지표 1~3이 같은 날 실시간 경로와 같은지
+#      - 지표 1, 2: IndicatorState에 전날까지 마감 봉을 넣고 당일 종가를 pending_close로 미리보기 (get_scores와 같은 방식)
+#      - 지표 3: 하루씩 push_breadth한 IndicatorState.adr_ratio, 그리고 저장된 집계로 창을 만드는
+#        korea_fear_greed.collect_adr_window + sync_breadth 경로
+#      유효 20거래일의 가장 오래된 날이 정확히 ADR_CANDIDATE_DAYS일 전인 경계 사례가 포함되도록 데이터를 만듭니다.
+#      (백필은 당일 KRX 집계까지 쓰므로, 실시간 경로도 as_of 당일 집계가 공개된 것으로 보고 비교)
+#   2) chunk 분할/프로세스 병렬 계산이 한 번에 계산한 결과와 같은지
+#   3) 구간 전체 계산 시간: 단일 프로세스 vs 프로세스 풀
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_backfill --days 2500 --workers 4
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_rolling_state import TOLERANCE, same
+from fng import scoring
+from fng.backfill import SCORE_COLUMNS, WARMUP_DAYS, backfill_scores, build_inputs, compute_scores
+from fng.krx_daily import KrxDailyStore
+from fng.rolling_state import IndicatorState
+
+FLOAT_COLUMNS = SCORE_COLUMNS + ("adr_raw", "vkospi", "put_call_ratio")
+
+
+def synthetic(days, seed=0):
+    """^KS11 종가와 KrxDailyStore.frame() 형태의 일별 집계. 최근 구간의 1년은 데이터 이상일이 많아 45일 경계에 자주 걸림."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2026-10-16", periods=days)
+    kospi = pd.DataFrame({"Close": 2500 * np.exp(np.cumsum(rng.normal(0, 0.012, days)))}, index=index)
+    krx = pd.DataFrame({
+        "adv": rng.integers(50, 700, days).astype(float),
+        "dec": rng.integers(1, 700, days).astype(float),
+        "put_vol": rng.integers(100000, 900000, days).astype(float),
+        "call_vol": rng.integers(100000, 900000, days).astype(float),
+        "vkospi": 15 + 10 * rng.random(days),
+    }, index=index)
+    sparse = np.zeros(days, dtype=bool)
+    sparse[-400:-150] = True
+    krx.loc[rng.random(days) < np.where(sparse, 0.38, 0.03), "dec"] = 0 # 데이터 이상일 (건너뛰어야 함)
+    krx.loc[rng.random(days) < 0.01, ["adv", "dec"]] = np.nan # 아직 조회하지 못한 날
+    return kospi, krx
+
+
+def boundary_days(krx):
+    """유효 20거래일의 가장 오래된 날이 정확히 ADR_CANDIDATE_DAYS일 전인 거래일 수."""
+    valid = krx.index[(krx["dec"] > 0) & krx["adv"].notna()]
+    first_day = pd.Series(valid, index=valid).shift(scoring.ADR_DAYS - 1).reindex(krx.index).ffill()
+    return int(((krx.index - first_day).dt.days == scoring.ADR_CANDIDATE_DAYS).sum())
+
+
+def check_live(inputs, krx, scores):
+    """지표 1~3: 백필 결과 vs 같은 날 IndicatorState (하루씩 반영, 체크포인트 없이 이어서)."""
+    dates = inputs.index.strftime('%Y%m%d')
+    closes, breadth = IndicatorState(), IndicatorState()
+    mismatches = 0
+    for i, date_str in enumerate(dates):
+        pending = inputs["close"].iloc[i]
+        ma, rsi = closes.ma(pending), closes.rsi(pending)
+        closes.push_close(date_str, pending)
+        adv, dec = krx["adv"].iloc[i], krx["dec"].iloc[i]
+        breadth.push_breadth(date_str, None if pd.isna(adv) else adv, None if pd.isna(dec) else dec)
+        adr = breadth.adr_ratio(date_str)
+
+        row = scores.iloc[i]
+        checks = (
+            ("indicator1", scoring.DEFAULT_SCORE if ma is None else scoring.ma_gap_score(pending, ma), row["indicator1"]),
+            ("indicator2", scoring.DEFAULT_SCORE if rsi is None else rsi, row["indicator2"]),
+            ("adr_raw", adr, row["adr_raw"]),
+        )
+        for name, got, want in checks:
+            if not same(got, want):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"불일치 {date_str} {name}: 실시간 {got} != 백필 {want}")
+    print(f"실시간 경로 (IndicatorState): {len(dates)}거래일, 불일치 {mismatches}건")
+    return mismatches
+
+
+def check_collect(inputs, krx, scores, days):
+    """지표 3: 백필 결과 vs 저장된 집계로 창을 만드는 get_scores 경로 (최근 days거래일)."""
+    os.environ["KRX_RATE_LIMIT"] = "0" # KrxFetcher의 기본 요청 제한은 임포트 시점에 정해짐
+    with contextlib.redirect_stdout(io.StringIO()):
+        import korea_fear_greed
+
+    store = KrxDailyStore(os.path.join(tempfile.mkdtemp(), "krx_daily.sqlite"))
+    published = krx[["adv", "dec"]].dropna()
+    for day, adv, dec in zip(published.index.strftime('%Y%m%d'), published["adv"], published["dec"]):
+        store.update(day, adv=int(adv), dec=int(dec))
+
+    def fetch(date_str): # 저장되지 않은 날 = 아직 조회하지 못한 날
+        return None, None
+
+    dates = inputs.index.strftime('%Y%m%d')
+    mismatches = 0
+    for i in range(len(dates) - days, len(dates)):
+        as_of = inputs.index[i]
+        # kospi_history.trading_days(ADR_CANDIDATE_DAYS)와 같은 후보 구간 (as_of와의 차이가 45일 미만)
+        candidates = [d for d, day in zip(dates[:i + 1], inputs.index[:i + 1])
+                      if (as_of - day).days < scoring.ADR_CANDIDATE_DAYS]
+        candidates.reverse()
+        with contextlib.redirect_stdout(io.StringIO()):
+            window, _ = korea_fear_greed.collect_adr_window(candidates, fetch=fetch, store=store)
+        state = IndicatorState()
+        state.sync_breadth(reversed(window))
+        got, want = state.adr_ratio(dates[i]), scores["adr_raw"].iloc[i]
+        if not same(got, want):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"불일치 {dates[i]} adr_raw: collect_adr_window {got} != 백필 {want}")
+    print(f"실시간 경로 (collect_adr_window): {days}거래일, 불일치 {mismatches}건")
+    return mismatches
+
+
+def check_chunks(inputs, start, end, workers, chunk_days):
+    """chunk 분할(단일 프로세스/프로세스 풀) vs 구간 한 번에 계산."""
+    single = backfill_scores(inputs, start, end, workers=1, chunk_days=len(inputs))
+    mismatches = 0
+    for label, w in (("chunk 분할", 1), (f"프로세스 {workers}개", workers)):
+        split = backfill_scores(inputs, start, end, workers=w, chunk_days=chunk_days)
+        diff = (split[list(FLOAT_COLUMNS)] - single[list(FLOAT_COLUMNS)]).abs()
+        nan_same = (split[list(FLOAT_COLUMNS)].isna() == single[list(FLOAT_COLUMNS)].isna()).all().all()
+        scale = single[list(FLOAT_COLUMNS)].abs().clip(lower=1.0)
+        bad = int((diff > TOLERANCE * scale).sum().sum()) + int((split["score"] != single["score"]).sum())
+        ok = bad == 0 and nan_same and split.index.equals(single.index)
+        mismatches += 0 if ok else max(bad, 1)
+        print(f"{label} (chunk {chunk_days}거래일): {len(split)}거래일, 최대 차이 {np.nanmax(diff.values):.1e}, "
+              f"{'일치' if ok else '불일치'}")
+    return mismatches
+
+
+def bench(inputs, start, end, workers, chunk_days, repeat):
+    for label, w in (("단일 프로세스", 1), (f"프로세스 {workers}개", workers)):
+        runs = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            backfill_scores(inputs, start, end, workers=w, chunk_days=chunk_days)
+            runs.append(time.perf_counter() - started)
+        print(f"백필 {label}: {np.median(runs) * 1000:.1f}ms (중앙값, {repeat}회)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='과거 구간 백필 동등성/성능 확인')
+    parser.add_argument('--days', type=int, default=2500)
+    parser.add_argument('--collect-days', type=int, default=500, help='collect_adr_window 경로로 비교할 최근 거래일 수')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--chunk-days', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    kospi, krx = synthetic(args.days)
+    inputs = build_inputs(kospi, krx)
+    scores = compute_scores(inputs)
+    print(f"입력: {args.days}거래일, 45일 경계에 걸린 거래일 {boundary_days(krx)}일")
+
+    mismatches = check_live(inputs, krx, scores)
+    mismatches += check_collect(inputs, krx, scores, min(args.collect_days, args.days))
+    start, end = inputs.index[WARMUP_DAYS], inputs.index[-1]
+    mismatches += check_chunks(inputs, start, end, args.workers, args.chunk_days)
+    bench(inputs, start, end, args.workers, args.chunk_days, args.repeat)
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
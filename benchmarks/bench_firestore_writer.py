@@ -0,0 +1,191 @@
+# IndexWriter(일괄 쓰기 + 월별 요약 문서) 동작 확인 및 왕복 횟수 비교
+#   1) 문서마다 collection.add() vs IndexWriter: Firestore 왕복(커밋) 횟수
+#   2) 차트용 1년 이력 읽기: 일별 문서 전체 조회 vs 월별 요약 문서 조회 (읽은 문서 수)
+#   3) 같은 날을 다시 쓰면 요약 문서의 그날 항목만 바뀌는지 (필드가 줄어든 항목이면 빠진 필드가 지워지는지)
+#
+# 기본은 메모리 안의 가짜 Firestore를 사용합니다 (네트워크/인증 불필요).
+# Firestore 에뮬레이터로 확인하려면:
+#   gcloud emulators firestore start --host-port=127.0.0.1:8080
+#   FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python -m benchmarks.bench_firestore_writer --emulator
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_firestore_writer --days 250
+import argparse
+import copy
+import itertools
+from datetime import datetime, timedelta
+
+from fng.firestore_writer import IndexWriter, read_history, month_key
+
+OPERATORS = {">=": lambda a, b: a >= b, "<=": lambda a, b: a <= b, "==": lambda a, b: a == b}
+
+
+def _merge(target, data):
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+class FakeFirestore:
+    """IndexWriter/read_history가 쓰는 만큼만 구현한 메모리 Firestore. 왕복 횟수와 읽은 문서 수를 셉니다."""
+
+    def __init__(self):
+        self.data = {} # 컬렉션 -> {문서 ID: dict}
+        self.round_trips = 0
+        self.reads = 0
+        self._ids = itertools.count()
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class FakeDocument:
+    def __init__(self, db, collection, doc_id):
+        self.db, self.collection, self.id = db, collection, doc_id
+
+    def _write(self, data, merge=False):
+        docs = self.db.data.setdefault(self.collection, {})
+        if isinstance(merge, list): # 필드 경로 목록: 경로마다 값을 통째로 교체 (Firestore set(merge=[...])와 같음)
+            target = docs.setdefault(self.id, {})
+            for path in merge:
+                *parents, name = path.replace("`", "").split(".")
+                source, node = data, target
+                for key in parents:
+                    source, node = source[key], node.setdefault(key, {})
+                node[name] = copy.deepcopy(source[name])
+        elif merge and self.id in docs:
+            _merge(docs[self.id], data)
+        else:
+            docs[self.id] = copy.deepcopy(data)
+
+    def set(self, data, merge=False):
+        self.db.round_trips += 1
+        self._write(data, merge)
+
+
+class FakeQuery:
+    def __init__(self, db, collection, filters=()):
+        self.db, self.collection, self.filters = db, collection, filters
+
+    def where(self, field, op, value):
+        return FakeQuery(self.db, self.collection, self.filters + ((field, OPERATORS[op], value),))
+
+    def stream(self):
+        self.db.round_trips += 1
+        for doc_id, data in sorted(self.db.data.get(self.collection, {}).items()):
+            if all(field in data and op(data[field], value) for field, op, value in self.filters):
+                self.db.reads += 1
+                yield FakeSnapshot(doc_id, data)
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, name):
+        super().__init__(db, name)
+
+    def document(self, doc_id=None):
+        return FakeDocument(self.db, self.collection, doc_id or "auto%06d" % next(self.db._ids))
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, ref, data, merge=False):
+        self.writes.append((ref, data, merge))
+
+    def commit(self):
+        self.db.round_trips += 1
+        for ref, data, merge in self.writes:
+            ref._write(data, merge)
+
+
+def sample_rows(days):
+    start = datetime(2025, 1, 2)
+    for i in range(days):
+        date_str = (start + timedelta(days=i * 7 // 5)).strftime('%Y%m%d') # 평일 간격 근사
+        entry = {"score": 40 + i % 30, "kospi_value": 2500.0 + i, "indicator1": 50.0}
+        yield date_str, entry
+
+
+def bench(db_factory, days):
+    db = db_factory()
+    for date_str, entry in sample_rows(days):
+        db.collection('korea_index').add(dict(entry, date=date_str))
+    naive = db.round_trips if hasattr(db, "round_trips") else None
+
+    db = db_factory()
+    with IndexWriter(db, 'korea_index') as writer:
+        for date_str, entry in sample_rows(days):
+            writer.add(dict(entry, date=date_str), date_str, history=entry, doc_id="bf_" + date_str)
+    print(f"쓰기 {days}일: add() 왕복 {naive}회 -> IndexWriter 커밋 {writer.stats['commits']}회 "
+          f"(문서 {writer.stats['documents']}건, 월 요약 {writer.stats['history_updates']}건)")
+    return db
+
+
+def check_history(db, days):
+    rows = list(sample_rows(days))
+    first, last = rows[0][0], rows[-1][0]
+    if hasattr(db, "reads"):
+        db.reads = 0
+        list(db.collection('korea_index').stream())
+        daily_reads = db.reads
+        db.reads = 0
+    history = read_history(db, 'korea_index', month_key(first), month_key(last))
+    if hasattr(db, "reads"):
+        print(f"차트 이력 읽기: 일별 문서 {daily_reads}건 -> 월 요약 문서 {db.reads}건")
+    assert [d for d, _ in history] == [d for d, _ in rows], "요약 문서의 날짜가 쓴 날짜와 다릅니다"
+
+    # 같은 날을 지표 하나가 빠진 항목으로 다시 쓰면 그날 항목 전체가 바뀌고 같은 달의 다른 날은 유지
+    date_str, entry = rows[-1]
+    rewritten = {k: v for k, v in dict(entry, score=99).items() if k != "indicator1"}
+    with IndexWriter(db, 'korea_index') as writer:
+        writer.add(dict(rewritten, date=date_str), date_str, history=rewritten, doc_id="bf_" + date_str)
+    updated = dict(read_history(db, 'korea_index', month_key(date_str), month_key(date_str)))
+    assert updated[date_str] == rewritten, f"다시 쓴 항목이 다릅니다 (이전 필드가 남음?): {updated[date_str]}"
+    assert len(updated) == sum(1 for d, _ in rows if month_key(d) == month_key(date_str))
+    print(f"같은 날 다시 쓰기: {date_str} 항목만 교체 (빠진 필드 삭제), 같은 달 {len(updated)}일 유지")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='IndexWriter 일괄 쓰기/월별 요약 문서 확인')
+    parser.add_argument('--days', type=int, default=250)
+    parser.add_argument('--emulator', action='store_true', help='FIRESTORE_EMULATOR_HOST의 에뮬레이터 사용')
+    args = parser.parse_args()
+
+    if args.emulator:
+        from google.cloud import firestore
+
+        def db_factory():
+            client = firestore.Client(project="demo-fng")
+            for collection in ('korea_index', 'korea_index_history'):
+                for doc in client.collection(collection).stream():
+                    doc.reference.delete()
+            return client
+    else:
+        db_factory = FakeFirestore
+    db = bench(db_factory, args.days)
+    check_history(db, args.days)
+
+
+if __name__ == "__main__":
+    main()
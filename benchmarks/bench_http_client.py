@@ -0,0 +1,112 @@
+# 공용 HttpClient 벤치마크/동작 확인 (로컬 스텁 서버 사용, 네트워크 불필요)
+#   1) keep-alive 연결 풀 vs 요청마다 새 연결(requests.get): 소요 시간, 서버가 받은 TCP 연결 수
+#   2) 503 + Retry-After 응답에 대한 재시도/대기 (get, 스트리밍 stream 모두)
+#   3) 응답이 멈춘 서버에 대한 읽기 타임아웃
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_http_client --requests 200
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from fng.http_client import HttpClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive 허용
+    disable_nagle_algorithm = True # 헤더/본문 분할 전송 시 Nagle + delayed ACK로 생기는 40ms 지연 방지
+    connections = set()
+    flaky_remaining = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        with StubHandler.lock:
+            StubHandler.connections.add(self.client_address)
+        if self.path.startswith("/flaky"):
+            with StubHandler.lock:
+                fail = StubHandler.flaky_remaining > 0
+                StubHandler.flaky_remaining -= 1
+            if fail:
+                self._send(503, {"error": "busy"}, {"Retry-After": "0.3"})
+                return
+        if self.path.startswith("/slow"):
+            time.sleep(2)
+        self._send(200, {"observations": [{"date": "2026-01-01", "value": "4.33"}]})
+
+
+def start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:%d" % server.server_address[1]
+
+
+def timed(label, func, n):
+    StubHandler.connections.clear()
+    started = time.perf_counter()
+    for _ in range(n):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {n}회 {elapsed:.3f}s ({elapsed / n * 1000:.2f}ms/요청), TCP 연결 {len(StubHandler.connections)}개")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HttpClient 연결 풀/재시도/타임아웃 확인')
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    server, base = start_stub()
+    try:
+        client = HttpClient(max_retries=3, backoff_base=0.05)
+        unpooled = timed("requests.get (새 연결)", lambda: requests.get(base + "/ok", timeout=5).json(), args.requests)
+        pooled = timed("HttpClient (keep-alive)", lambda: client.get(base + "/ok").json(), args.requests)
+        print(f"연결 풀 사용 시 {unpooled / pooled:.1f}배")
+
+        StubHandler.flaky_remaining = 2
+        started = time.perf_counter()
+        response = client.get(base + "/flaky")
+        waited = time.perf_counter() - started
+        assert response.status_code == 200 and waited >= 0.6, (response.status_code, waited)
+        print(f"503 + Retry-After: 0.3 두 번 후 성공, 대기 {waited:.2f}s, 누적 재시도 {client.stats['retries']}회")
+
+        # 스트리밍(뉴스 피드 등)도 같은 재시도 정책을 따르고 받은 바이트를 집계
+        StubHandler.flaky_remaining = 2
+        retries, received = client.stats["retries"], client.stats["bytes"]
+        started = time.perf_counter()
+        body = b"".join(client.stream(base + "/flaky", 16))
+        waited = time.perf_counter() - started
+        assert json.loads(body)["observations"] and client.stats["retries"] - retries == 2 and waited >= 0.6
+        assert client.stats["bytes"] - received == len(body)
+        print(f"스트리밍 503 + Retry-After: 재시도 2회 후 {len(body)}바이트 수신, 대기 {waited:.2f}s")
+
+        impatient = HttpClient(read_timeout=0.5, max_retries=1, backoff_base=0.01)
+        started = time.perf_counter()
+        try:
+            impatient.get(base + "/slow")
+            raise AssertionError("타임아웃이 발생하지 않았습니다")
+        except requests.exceptions.Timeout:
+            print(f"멈춘 응답: 읽기 타임아웃 0.5s x {impatient.stats['requests']}회 후 {time.perf_counter() - started:.2f}s에 중단")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# 모듈 임포트(콜드 스타트) 시간 측정: python -X importtime 결과를 모듈별 누적 시간으로 정리
+# 임포트만으로 Firebase/google-genai/pykrx/bs4가 로드되지 않는지도 확인합니다.
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_import_time                       # korea_fear_greed
+#   python -m benchmarks.bench_import_time --module main --top 15
+import argparse
+import subprocess
+import sys
+
+# 임포트 시점에 로드되면 안 되는 무거운/불필요한 모듈
+LAZY_MODULES = ("firebase_admin", "google.genai", "pykrx", "bs4")
+
+
+def measure(module):
+    check = "import sys, %s; print(','.join(m for m in %r if m in sys.modules))" % (module, LAZY_MODULES)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", check],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return rows, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='python -X importtime 기반 임포트 시간 측정')
+    parser.add_argument('--module', default='korea_fear_greed')
+    parser.add_argument('--top', type=int, default=10, help='대상 모듈이 직접 임포트하는 모듈 중 누적 시간 상위 N개 출력')
+    args = parser.parse_args()
+
+    rows, loaded = measure(args.module)
+    # 이름 앞 공백이 한 칸인 행이 최상위 임포트이고 중첩될수록 두 칸씩 늘어남
+    def depth(name):
+        return (len(name) - len(name.lstrip()) - 1) // 2
+
+    total_ms = sum(r[0] for r in rows if depth(r[2]) == 0) / 1000
+    print(f"import {args.module}: {total_ms:.1f}ms (인터프리터 기본 모듈 포함, 모듈 {len(rows)}개)")
+    children = [r for r in rows if depth(r[2]) == 1]
+    for cumulative_us, _, name in sorted(children, reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name.strip()}")
+    if loaded:
+        print(f"경고: 임포트 시점에 로드된 지연 대상 모듈: {', '.join(loaded)}")
+    else:
+        print(f"지연 대상 모듈({', '.join(LAZY_MODULES)})은 임포트 시점에 로드되지 않음")
+
+
+if __name__ == "__main__":
+    main()
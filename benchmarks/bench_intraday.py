@@ -0,0 +1,134 @@
+# 장중 갱신(korea_fear_greed.IntradayIndex) 비용 측정 (benchmarks.fixtures의 오프라인 환경, 네트워크/API 키 불필요)
+#   1) 첫 갱신: 날짜가 바뀌었으므로 전체 get_scores로 기준값 계산
+#   2) 장중 갱신: 오늘(KST) 봉의 현재가를 바꿔 가며 refresh() -> ^KS11 최근 봉만 조회, 바뀐 필드만 Firestore에 씀
+#   3) 확인: 장중 결과가 같은 데이터로 전체 계산(build_index_snapshot)한 결과와 같은지,
+#      현재가가 그대로면 Firestore 쓰기가 없는지, 장 시간 밖에서는 ^KS11 조회가 없는지
+# --reader-latency로 ^KS11 조회(FinanceDataReader) 응답 시간을 흉내 낼 수 있습니다.
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_intraday --refreshes 50
+#   python -m benchmarks.bench_intraday --reader-latency 0.2 --latency 0.05
+import argparse
+import contextlib
+import io
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.fixtures import DEFAULT_FIXTURE_DIR, Fixtures, OfflineEnvironment, synthesize
+
+
+class LiveReader:
+    """fixture의 ^KS11 일봉 뒤에 오늘(KST) 장중 봉을 붙여 돌려주는 reader. close를 바꾸면 현재가가 바뀜."""
+
+    def __init__(self, fixtures, today, latency=0.0):
+        self.fixtures = fixtures
+        self.today = pd.Timestamp(today)
+        self.latency = latency
+        self.close = float(fixtures.frame["Close"].iloc[-1])
+        self.empty = False # True면 빈 DataFrame (데이터 제공처 장애 흉내)
+        self.calls = 0
+
+    def __call__(self, symbol, start=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        df = self.fixtures.read_ohlcv(symbol, start)
+        if self.empty:
+            return df.iloc[:0]
+        bar = pd.DataFrame({"Open": [self.close], "High": [self.close], "Low": [self.close], "Close": [self.close],
+                            "Volume": [100_000], "Change": [0.0]}, index=pd.DatetimeIndex([self.today], name="Date"))
+        return pd.concat([df, bar])
+
+
+def quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='장중 갱신(IntradayIndex) 비용 측정 및 전체 계산과의 일치 확인')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURE_DIR, help='fixture 디렉터리 (없으면 합성)')
+    parser.add_argument('--refreshes', type=int, default=30, help='장중 갱신 횟수')
+    parser.add_argument('--reader-latency', type=float, default=0.0, help='^KS11 조회 지연(초)')
+    parser.add_argument('--latency', type=float, default=0.0, help='KRX 스텁 요청당 지연(초)')
+    args = parser.parse_args()
+
+    os.environ["KRX_RATE_LIMIT"] = "0"
+    if not os.path.exists(os.path.join(args.fixtures, "manifest.json")):
+        synthesize(args.fixtures)
+    fixtures = Fixtures(args.fixtures)
+    with quiet():
+        import korea_fear_greed
+
+    # fixture의 마지막 거래일 다음 영업일 장중 (실행 시각과 무관하게 최근 공개 거래일 = fixture의 마지막 거래일)
+    now = (pd.Timestamp(fixtures.live_days[-1]) + pd.offsets.BDay(1)).to_pydatetime().replace(hour=11)
+    reader = LiveReader(fixtures, now.strftime('%Y%m%d'), args.reader_latency)
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as workdir, OfflineEnvironment(fixtures, workdir, latency=args.latency) as env:
+        intraday = korea_fear_greed.IntradayIndex(db=env.db, reader=reader)
+        started = time.perf_counter()
+        with quiet():
+            intraday.refresh(now)
+        baseline = time.perf_counter() - started
+        krx_requests = env.server.requests.get("krx", 0)
+        print(f"기준값 (전체 get_scores): {baseline * 1000:.0f}ms, KRX 요청 {krx_requests}회, ^KS11 조회 {reader.calls}회")
+
+        base_close, timings = reader.close, []
+        for i in range(args.refreshes):
+            reader.close = round(base_close * (1 + rng.gauss(0, 0.01)), 2)
+            started = time.perf_counter()
+            with quiet():
+                snapshot = intraday.refresh(now + pd.Timedelta(minutes=5 * (i + 1)))
+            timings.append(time.perf_counter() - started)
+        writes = intraday.stats["writes"]
+        print(f"장중 갱신 {args.refreshes}회: 중앙값 {statistics.median(timings) * 1000:.1f}ms, "
+              f"최대 {max(timings) * 1000:.1f}ms (기준값 대비 {baseline / statistics.median(timings):.0f}배 빠름)")
+        print(f"Firestore 쓰기 {writes}회, 필드 {intraday.stats['fields_written']}개 "
+              f"(회당 평균 {intraday.stats['fields_written'] / max(writes, 1):.1f}개)")
+        assert env.server.requests.get("krx", 0) == krx_requests, "장중 갱신에서 KRX 요청이 발생했습니다"
+        assert intraday.stats["baselines"] == 1, f"기준값을 다시 계산했습니다 ({intraday.stats['baselines']}회)"
+        # 시간 비교가 아무것도 하지 않은 갱신이 아니라 실제 재계산을 잰 것인지 확인
+        assert intraday.stats["live_updates"] == args.refreshes, \
+            f"장중 재계산 {intraday.stats['live_updates']}회 != 갱신 {args.refreshes}회"
+
+        # 같은 현재가로 다시 갱신하면 쓰지 않음
+        with quiet():
+            intraday.refresh(now + pd.Timedelta(minutes=5 * (args.refreshes + 1)))
+        assert intraday.stats["writes"] == writes, "값이 그대로인데 Firestore에 다시 썼습니다"
+
+        # 같은 데이터로 전체 계산한 결과와 비교
+        with quiet():
+            full = korea_fear_greed.build_index_snapshot(korea_fear_greed.KospiHistory(reader=reader))
+        for key in ("final_score", "status_phase", "kospi_value", "kospi_change_point", "kospi_change_rate"):
+            assert snapshot[key] == full[key], f"{key} 불일치: {snapshot[key]} != {full[key]}"
+        for live, expected in zip(snapshot["indicator_scores"], full["indicator_scores"]):
+            assert math.isclose(live, expected, rel_tol=1e-9, abs_tol=1e-9), \
+                f"지표 점수 불일치: {snapshot['indicator_scores']} != {full['indicator_scores']}"
+        live_doc = env.db.data[korea_fear_greed.LIVE_COLLECTION][korea_fear_greed.LIVE_DOCUMENT]
+        assert live_doc["score"] == full["final_score"] and live_doc["kospi_value"] == full["kospi_value"]
+        print(f"전체 계산과 일치: 점수 {full['final_score']}, KOSPI {full['kospi_value']}, "
+              f"지표 {[round(s, 2) for s in full['indicator_scores']]}")
+
+        # ^KS11이 빈 응답을 주면 예외 없이 직전 스냅샷 유지
+        reader.empty = True
+        with quiet():
+            kept = intraday.refresh(now + pd.Timedelta(minutes=5 * (args.refreshes + 2)))
+        reader.empty = False
+        assert kept == snapshot, "빈 ^KS11 응답에서 스냅샷이 바뀌었습니다"
+        print("빈 ^KS11 응답: 직전 스냅샷 유지")
+
+        # 장 마감 후에는 ^KS11을 다시 조회하지 않음
+        calls = reader.calls
+        with quiet():
+            intraday.refresh(now.replace(hour=18))
+        assert reader.calls == calls, "장 시간 밖에서 ^KS11을 조회했습니다"
+        print("장 마감 후 갱신: 조회 없음")
+
+
+if __name__ == "__main__":
+    main()
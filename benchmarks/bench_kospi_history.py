@@ -0,0 +1,108 @@
+# ^KS11 다운로드 횟수/소요 시간 벤치마크: 지표별 개별 조회(기존) vs 공유 KospiHistory(변경 후)
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_kospi_history            # 지연을 흉내 낸 가짜 reader (오프라인)
+#   python -m benchmarks.bench_kospi_history --live     # 실제 FinanceDataReader 호출
+#   python -m benchmarks.bench_kospi_history --fail-first 3   # 처음 3번 실패하는 불안정한 네트워크 흉내
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from fng.kospi_history import KospiHistory, KOSPI_SYMBOL
+
+
+class CountingReader:
+    """fdr.DataReader 대체품. 호출 횟수를 세고, 네트워크 지연과 일시적 실패를 흉내 냅니다."""
+
+    def __init__(self, latency=0.15, fail_first=0, live=False, per_row_latency=0.0):
+        self.latency = latency
+        self.per_row_latency = per_row_latency # 전송량에 비례하는 지연
+        self.fail_first = fail_first
+        self.live = live
+        self.calls = 0
+
+    def __call__(self, symbol, start=None):
+        self.calls += 1
+        if self.live:
+            import FinanceDataReader as fdr
+            return fdr.DataReader(symbol, start=start)
+        time.sleep(self.latency)
+        if self.calls <= self.fail_first:
+            raise ConnectionError("simulated network error")
+        index = pd.bdate_range(start=start, end=datetime.now().date())
+        time.sleep(self.per_row_latency * len(index))
+        close = 2500 + np.cumsum(np.random.default_rng(0).normal(0, 10, len(index)))
+        return pd.DataFrame({'Open': close, 'High': close + 5, 'Low': close - 5, 'Close': close,
+                             'Volume': np.full(len(index), 500000)}, index=index)
+
+
+def legacy_fetch_pattern(reader, retry_delay):
+    """변경 전 get_scores의 ^KS11 조회 패턴 (지표 1, 2, 3, KOSPI 현재가가 각각 다운로드)."""
+    # 지표 1: 200일, 지표 2: 40일 (각각 최대 10회 재시도)
+    for lookback, min_len in ((200, 125), (40, 15)):
+        for i in range(10):
+            target_date = datetime.now() - timedelta(days=i)
+            try:
+                df = reader(KOSPI_SYMBOL, start=target_date - timedelta(days=lookback))
+                if not df.empty and len(df) >= min_len:
+                    break
+            except Exception:
+                pass
+            time.sleep(retry_delay)
+    # 지표 3: ADR 거래일 달력 (재시도 없음)
+    try:
+        reader(KOSPI_SYMBOL, start=datetime.now() - timedelta(days=45))
+    except Exception:
+        pass
+    # KOSPI 현재가/등락
+    for i in range(10):
+        target_date = datetime.now() - timedelta(days=i)
+        try:
+            df = reader(KOSPI_SYMBOL, start=target_date - timedelta(days=5))
+            if not df.empty and len(df) >= 2:
+                break
+        except Exception:
+            pass
+        time.sleep(retry_delay)
+
+
+def shared_fetch_pattern(reader, retry_delay):
+    """변경 후: 하나의 KospiHistory를 모든 지표가 공유."""
+    history = KospiHistory(reader=reader, retry_delay=retry_delay)
+    df = history.get()
+    df['Close'].rolling(window=125).mean()
+    history.trading_days(45)
+    df['Close'].iloc[-2:]
+
+
+def run(name, pattern, reader, retry_delay):
+    started = time.perf_counter()
+    pattern(reader, retry_delay)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<8} 네트워크 호출: {reader.calls:>3}회, 소요 시간: {elapsed:.3f}s")
+    return reader.calls, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='^KS11 다운로드 횟수/소요 시간 벤치마크')
+    parser.add_argument('--live', action='store_true', help='실제 FinanceDataReader로 호출')
+    parser.add_argument('--latency', type=float, default=0.15, help='가짜 reader의 호출당 지연(초)')
+    parser.add_argument('--fail-first', type=int, default=0, help='처음 N번의 호출을 실패로 처리')
+    parser.add_argument('--retry-delay', type=float, default=0.5, help='재시도 간 대기(초)')
+    args = parser.parse_args()
+
+    results = {}
+    for name, pattern in (("before", legacy_fetch_pattern), ("after", shared_fetch_pattern)):
+        reader = CountingReader(latency=args.latency, fail_first=args.fail_first, live=args.live)
+        results[name] = run(name, pattern, reader, args.retry_delay)
+
+    before_calls, before_time = results["before"]
+    after_calls, after_time = results["after"]
+    print(f"호출 수 {before_calls} -> {after_calls}, 소요 시간 {before_time / max(after_time, 1e-9):.1f}배 단축")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# ADR 20거래일 수집 벤치마크: 직렬 조회(기존) vs KrxFetcher 병렬 조회
+# 가짜 KRX 응답(지연, 일부 휴장/이상 데이터 포함)으로 두 방식의 합산 결과가 같은지 확인하고 소요 시간을 비교합니다.
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_krx_fetcher --latency 0.3 --workers 4 --rate 10
+import argparse
+import random
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+
+from fng.krx_fetcher import KrxFetcher
+
+
+def make_fake_adr(latency, invalid_ratio, seed=0):
+    rng = random.Random(seed)
+    table = {}
+    calls = []
+
+    def fake_get_adr_counts(date_str):
+        calls.append(date_str)
+        time.sleep(latency * (0.5 + rng.random()))
+        if date_str not in table:
+            r = random.Random(date_str)
+            table[date_str] = (None, None) if r.random() < invalid_ratio else (r.randint(200, 600), r.randint(200, 600))
+        return table[date_str]
+
+    return fake_get_adr_counts, calls
+
+
+def collect_serial(get_adr_counts, days):
+    total_adv = total_dec = days_found = 0
+    for t_date in days:
+        adv, dec = get_adr_counts(t_date)
+        if adv is not None and dec is not None and dec > 0:
+            total_adv += adv
+            total_dec += dec
+            days_found += 1
+        if days_found == 20:
+            break
+        time.sleep(0.1) # 기존 코드의 API 부하 방지 지연
+    return total_adv, total_dec, days_found
+
+
+def collect_concurrent(get_adr_counts, days, fetcher):
+    total_adv = total_dec = days_found = 0
+    with closing(fetcher.map(get_adr_counts, days)) as results:
+        for t_date, counts, error in results:
+            adv, dec = counts if error is None else (None, None)
+            if adv is not None and dec is not None and dec > 0:
+                total_adv += adv
+                total_dec += dec
+                days_found += 1
+            if days_found == 20:
+                break
+    return total_adv, total_dec, days_found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ADR 20거래일 수집 직렬/병렬 비교')
+    parser.add_argument('--latency', type=float, default=0.2, help='가짜 KRX 호출당 평균 지연(초)')
+    parser.add_argument('--invalid-ratio', type=float, default=0.1, help='데이터가 없는 날의 비율')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=10.0, help='초당 최대 요청 수')
+    args = parser.parse_args()
+
+    days = [(datetime(2026, 1, 30) - timedelta(days=i)).strftime('%Y%m%d') for i in range(45)]
+
+    fake, calls = make_fake_adr(args.latency, args.invalid_ratio)
+    started = time.perf_counter()
+    serial = collect_serial(fake, days)
+    serial_time = time.perf_counter() - started
+    print(f"serial     {serial_time:.2f}s, 요청 {len(calls)}회, 결과 {serial}")
+
+    fake, calls = make_fake_adr(args.latency, args.invalid_ratio)
+    fetcher = KrxFetcher(max_workers=args.workers, rate_limit=args.rate)
+    started = time.perf_counter()
+    concurrent = collect_concurrent(fake, days, fetcher)
+    concurrent_time = time.perf_counter() - started
+    print(f"concurrent {concurrent_time:.2f}s, 요청 {fetcher.calls}회, 결과 {concurrent}")
+
+    assert serial == concurrent, "직렬/병렬 결과가 다릅니다"
+    print(f"결과 일치, {serial_time / max(concurrent_time, 1e-9):.1f}배 단축")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# 뉴스 헤드라인 지표(fng.news) 수집 처리량 측정
+#   1) 가짜 RSS/Atom 피드 파일 생성 (큰 피드 1개 + 작은 피드 여러 개, 피드 간 중복 기사 포함)
+#   2) 첫 실행: 스트리밍 파싱 -> 중복 제거 -> 배치 감성 점수 -> 날짜별 합계 (헤드라인/초)
+#      큰 피드 하나를 파싱할 때의 최대 메모리는 따로 측정
+#   3) 같은 피드로 다시 실행: 모두 이미 본 헤드라인이라 다시 점수를 매기는 헤드라인이 0개인지 확인
+#   4) --http: 로컬 http.server로 같은 피드를 제공해 HTTP 스트리밍 경로도 측정
+# 상태 파일은 임시 디렉터리에 만들므로 .cache/news_state.json은 건드리지 않습니다.
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_news --headlines 200000 --feeds 5
+#   python -m benchmarks.bench_news --http
+import argparse
+import functools
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+from benchmarks.bench_sentiment import make_headlines
+from fng.news import KST, NewsState, parse_headlines, read_chunks, update_news_indicator
+
+TODAY = "20260105"
+
+
+def write_rss(path, items):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel><title>bench</title>\n')
+        for title, moment in items:
+            f.write(f"<item><title>{escape(title)}</title><pubDate>{format_datetime(moment)}</pubDate>"
+                    f"<description>{escape(title)} ...</description></item>\n")
+        f.write("</channel></rss>\n")
+
+
+def write_atom(path, items):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom"><title>bench</title>\n')
+        for title, moment in items:
+            f.write(f"<entry><title>{escape(title)}</title><updated>{moment.isoformat()}</updated></entry>\n")
+        f.write("</feed>\n")
+
+
+def make_feeds(directory, headlines, feeds, duplicate_rate=0.2, seed=0):
+    """
+    헤드라인 절반은 큰 피드 하나에, 나머지는 작은 피드들에 나눠 씁니다.
+    작은 피드는 duplicate_rate만큼 큰 피드의 기사를 다시 싣습니다 (피드 간 중복).
+    반환: (파일 경로 목록, 고유 헤드라인 수)
+    """
+    rng = random.Random(seed)
+    end = datetime.strptime(TODAY, '%Y%m%d').replace(hour=15, tzinfo=KST)
+    # 템플릿 조합만으로는 제목이 겹치므로 번호를 붙여 고유하게 만든다
+    titles = [f"{text} ({i})" for i, text in enumerate(make_headlines(headlines, seed))]
+    items = [(title, end - timedelta(minutes=rng.randrange(5 * 24 * 60))) for title in titles]
+    big, rest = items[:len(items) // 2], items[len(items) // 2:]
+    paths = [os.path.join(directory, "big.xml")]
+    write_rss(paths[0], big)
+    small = max(feeds - 1, 1)
+    for n in range(small):
+        chunk = rest[n::small]
+        chunk += rng.sample(big, int(len(chunk) * duplicate_rate))
+        path = os.path.join(directory, f"feed{n}.xml")
+        (write_atom if n % 2 else write_rss)(path, chunk)
+        paths.append(path)
+    return paths, len(items)
+
+
+def run(label, sources, state_path):
+    started = time.perf_counter()
+    result = update_news_indicator(TODAY, sources, state_path)
+    elapsed = time.perf_counter() - started
+    print(f"{label}: 헤드라인 {result['parsed']:,}개 {elapsed:.3f}s ({result['parsed'] / elapsed:,.0f}개/초), "
+          f"새로 점수 {result['scored']:,}, 중복 {result['duplicates']:,}, 오래됨 {result['stale']:,}")
+    return result
+
+
+def parse_memory(path):
+    """피드 하나를 파싱하는 동안의 최대 메모리 (tracemalloc은 느리므로 처리량 측정과 따로 잰다)."""
+    tracemalloc.start()
+    count = sum(1 for _ in parse_headlines(read_chunks(path), TODAY))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"파싱 메모리: {os.path.basename(path)} ({os.path.getsize(path) / 2**20:.1f}MB, 헤드라인 {count:,}개) "
+          f"최대 {peak / 2**20:.2f}MB")
+
+
+def serve(directory):
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='뉴스 헤드라인 수집 처리량 측정')
+    parser.add_argument('--headlines', type=int, default=100000, help='고유 헤드라인 수')
+    parser.add_argument('--feeds', type=int, default=5)
+    parser.add_argument('--http', action='store_true', help='로컬 HTTP 서버로 제공한 피드도 측정')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths, unique = make_feeds(directory, args.headlines, args.feeds)
+        size = sum(os.path.getsize(p) for p in paths)
+        print(f"피드 {len(paths)}개, 고유 헤드라인 {unique:,}개, {size / 2**20:.1f}MB")
+
+        state_path = os.path.join(directory, "news_state.json")
+        first = run("첫 실행", paths, state_path)
+        assert first["scored"] == unique, f"고유 헤드라인 수와 점수를 매긴 수가 다릅니다: {first['scored']} != {unique}"
+        second = run("재실행", paths, state_path)
+        assert second["scored"] == 0, "재실행에서 이미 본 헤드라인을 다시 점수 매겼습니다"
+        assert second["mean_compound"] == first["mean_compound"]
+        print("지표 6: 최근 헤드라인 %d개, 평균 compound %.4f, 점수 %.2f (긍정 %d, 부정 %d)" % (
+            first["headlines"], first["mean_compound"], first["score"], first["positive"], first["negative"]))
+        parse_memory(paths[0])
+        state_size = os.path.getsize(state_path)
+        print(f"상태 파일: {state_size / 2**20:.1f}MB, 날짜 {len(NewsState.restore(state_path).days)}개")
+
+        if args.http:
+            server = serve(directory)
+            try:
+                urls = ["http://127.0.0.1:%d/%s" % (server.server_address[1], os.path.basename(p)) for p in paths]
+                http_state = os.path.join(directory, "news_state_http.json")
+                result = run("HTTP 첫 실행", urls, http_state)
+                assert result["scored"] == unique and result["errors"] == 0
+                assert abs(result["mean_compound"] - first["mean_compound"]) < 1e-9
+            finally:
+                server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
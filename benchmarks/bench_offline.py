@@ -0,0 +1,164 @@
+# 오프라인 전체 실행 벤치마크 (benchmarks.fixtures의 기록/합성 데이터 + 로컬 스텁, 네트워크/API 키 불필요)
+#   korea.cold    : 캐시(.cache) 없이 korea_fear_greed.main() (KOSPI 이력, KRX 조회, Firestore, 정적 데이터, 리포트)
+#   korea.warm    : 같은 작업 디렉터리에서 다시 main() (KRX 일별 집계/OHLCV/리포트 캐시 적중)
+#   get_scores    : 캐시가 채워진 상태에서 build_index_snapshot()만
+#   update_fng    : main.update_fng() (CNN/FRED 수집, Firestore, 정적 데이터, S&P 500 리포트)
+#   reports.force : KOSPI/S&P 500 리포트를 REPORT_FORCE=1로 새로 생성 (가짜 Gemini 스트리밍)
+#   reports.cached: 같은 입력으로 다시 생성 (리포트 캐시 재사용)
+# 시나리오마다 fng.telemetry를 새로 시작해 전체 시간과 단계별(span) 시간, 주요 카운터의 중앙값을 보고합니다.
+# --json으로 결과를 저장하고 --compare로 이전 결과와 비교하면, 허용 범위를 넘게 느려진 항목이 있을 때 종료 코드 1.
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.fixtures synthesize
+#   python -m benchmarks.bench_offline --repeat 3 --json .cache/bench_offline.json
+#   python -m benchmarks.bench_offline --compare .cache/bench_offline.json --tolerance 0.25
+#   python -m benchmarks.bench_offline --latency 0.05 --chunk-delay 0.02 --krx-rate 5   # 실제 서비스에 가까운 지연
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import DEFAULT_FIXTURE_DIR, Fixtures, OfflineEnvironment, synthesize
+
+# 보고할 카운터 (요청 수/캐시 적중 등 성능 변화의 원인을 보여 주는 값)
+KEY_COUNTERS = ("http.requests", "http.retries", "kospi_history.fetches", "krx.calls", "krx.rate_limit_sleep_seconds",
+                "ohlcv_cache.hits", "report_cache.hits", "report_cache.misses")
+
+
+def run_scenario(name, func, repeat, before=None, quiet=True):
+    """func를 repeat번 실행해 회차별 telemetry 요약을 모읍니다. before: 회차마다 먼저 실행 (시간에 포함하지 않음)."""
+    from fng import telemetry
+
+    runs = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        telemetry.reset()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            func()
+        elapsed = time.perf_counter() - started
+        summary = telemetry.get_telemetry().summary()
+        runs.append({"seconds": elapsed, "stages": {k: v["seconds"] for k, v in summary["stages"].items()},
+                     "counters": summary["counters"]})
+    return summarize(name, runs)
+
+
+def summarize(name, runs):
+    stages = sorted({stage for run in runs for stage in run["stages"]})
+    result = {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "stages": {stage: statistics.median(run["stages"].get(stage, 0.0) for run in runs) for stage in stages},
+        "counters": {key: runs[-1]["counters"][key] for key in KEY_COUNTERS if key in runs[-1]["counters"]},
+        "repeat": len(runs),
+    }
+    print(f"{name}: {result['seconds']:.3f}s (중앙값, {len(runs)}회)")
+    for stage, seconds in sorted(result["stages"].items(), key=lambda kv: -kv[1])[:8]:
+        print(f"    {stage:<28} {seconds:8.3f}s")
+    if result["counters"]:
+        print("    " + ", ".join(f"{k}={v:g}" for k, v in result["counters"].items()))
+    return result
+
+
+def compare(results, baseline_path, tolerance, min_seconds=0.05):
+    """baseline보다 (1 + tolerance)배 넘게 느려진 시나리오/단계 목록. min_seconds보다 짧은 값은 비교하지 않음."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["scenarios"]
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        pairs = [(name, base["seconds"], result["seconds"])]
+        pairs += [(f"{name}/{stage}", base["stages"][stage], seconds)
+                  for stage, seconds in result["stages"].items() if stage in base["stages"]]
+        for label, before, after in pairs:
+            if max(before, after) >= min_seconds and after > before * (1 + tolerance):
+                regressions.append((label, before, after))
+    print(f"\n기준 결과와 비교 ({baseline_path}, 허용 {tolerance:.0%}):")
+    for label, before, after in regressions:
+        print(f"  느려짐: {label} {before:.3f}s -> {after:.3f}s ({after / before - 1:+.0%})")
+    if not regressions:
+        print("  느려진 항목 없음")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='오프라인 fixture로 전체 실행(get_scores, update_fng, 리포트) 시간 측정')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURE_DIR, help='fixture 디렉터리 (없으면 합성)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help='로컬 스텁의 요청당 지연(초)')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='가짜 Gemini 스트리밍 조각 간격(초)')
+    parser.add_argument('--krx-rate', type=float, default=0.0, help='KRX 초당 요청 제한 (0: 제한 없음, 운영 기본값 5)')
+    parser.add_argument('--json', help='결과 저장 경로')
+    parser.add_argument('--compare', help='비교할 이전 결과 (--json으로 저장한 파일)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='--compare 허용 비율 (0.25: 25%%까지 느려져도 통과)')
+    parser.add_argument('--verbose', action='store_true', help='실행 중 출력을 숨기지 않음')
+    args = parser.parse_args()
+
+    # KrxFetcher의 기본 요청 제한은 임포트 시점에 정해지므로 korea_fear_greed보다 먼저 설정
+    os.environ["KRX_RATE_LIMIT"] = str(args.krx_rate)
+    if not os.path.exists(os.path.join(args.fixtures, "manifest.json")):
+        synthesize(args.fixtures)
+    fixtures = Fixtures(args.fixtures)
+    print(f"fixture: {args.fixtures} ({fixtures.source}, 거래일 {len(fixtures.live_days)}일, "
+          f"마지막 거래일 {fixtures.live_days[-1]})")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import korea_fear_greed
+        import main as us_main
+
+    quiet = not args.verbose
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, OfflineEnvironment(
+            fixtures, workdir, latency=args.latency, chunk_delay=args.chunk_delay) as env:
+        results["korea.cold"] = run_scenario("korea.cold", korea_fear_greed.main, args.repeat,
+                                             before=env.reset_state, quiet=quiet)
+        results["korea.warm"] = run_scenario("korea.warm", korea_fear_greed.main, args.repeat, quiet=quiet)
+        snapshot = korea_fear_greed.build_index_snapshot
+        results["get_scores"] = run_scenario("get_scores", snapshot, args.repeat, quiet=quiet)
+        results["update_fng"] = run_scenario("update_fng", us_main.update_fng, args.repeat, quiet=quiet)
+
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            data = snapshot()
+        us_data = {"fng_score": 44.7, "fng_description": "fear", "last_update": fixtures.live_days[-1]}
+
+        def reports():
+            korea_fear_greed.generate_gemini_report(data)
+            us_main.generate_gemini_snp_report(us_data)
+
+        os.environ["REPORT_FORCE"] = "1"
+        try:
+            results["reports.force"] = run_scenario("reports.force", reports, args.repeat, quiet=quiet)
+        finally:
+            del os.environ["REPORT_FORCE"]
+        results["reports.cached"] = run_scenario("reports.cached", reports, args.repeat, quiet=quiet)
+
+        # 결과 확인: 리포트 HTML과 정적 데이터가 작업 디렉터리에 만들어졌고 Firestore에 두 지수가 기록됨
+        for path in ("public/gemini_adv.html", "public/gemini_adv_ko_en.html", "public/gemini_snp_adv.html",
+                     "public/data/korea_index/manifest.json", "public/data/us_index/manifest.json"):
+            assert os.path.exists(os.path.join(workdir, path)), f"출력 파일이 없습니다: {path}"
+        assert {"korea_index", "us_index"} <= set(env.db.data), f"Firestore 컬렉션 누락: {sorted(env.db.data)}"
+        # 스텁이 빈 응답만 돌려주면 KRX 지표가 기본값으로 계산되어도 실행은 성공하므로, 최근 거래일 집계가 저장됐는지 확인
+        record = korea_fear_greed.krx_daily_store.get(fixtures.live_days[-1])
+        assert record is not None and record["vkospi"] is not None and record["put_vol"] is not None, \
+            f"최근 거래일 {fixtures.live_days[-1]}의 KRX 데이터를 fixture에서 받지 못했습니다"
+        print(f"\n스텁 요청: {env.server.requests}, Gemini 요청 {env.gemini.requests}회, 마지막 점수 {data['final_score']}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"fixtures": fixtures.manifest.get("source"), "args": vars(args), "scenarios": results},
+                      f, ensure_ascii=False, indent=1)
+        print(f"결과 저장: {args.json}")
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
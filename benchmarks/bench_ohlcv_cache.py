@@ -0,0 +1,50 @@
+# OHLCV 디스크 캐시 벤치마크: 캐시가 없는 첫 실행(cold)과 증분 조회만 하는 다음 실행(warm) 비교
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_ohlcv_cache            # 가짜 reader (오프라인, 임시 캐시 디렉터리)
+#   python -m benchmarks.bench_ohlcv_cache --live     # 실제 FinanceDataReader 호출
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_kospi_history import CountingReader
+from fng.kospi_history import KospiHistory
+from fng.ohlcv_cache import OhlcvCache
+
+
+def run(name, cache_dir, reader):
+    cache = OhlcvCache(cache_dir=cache_dir)
+    history = KospiHistory(reader=reader, cache=cache)
+    started = time.perf_counter()
+    df = history.get()
+    elapsed = time.perf_counter() - started
+    stats = cache.stats
+    print(f"{name:<5} {elapsed:.3f}s, 네트워크 호출 {stats['network_calls']}회, "
+          f"받은 행 {stats['rows_fetched']}개, 전송량(근사) {stats['bytes_fetched']:,} bytes, 결과 {len(df)}행")
+    return elapsed, stats["bytes_fetched"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OHLCV 디스크 캐시 cold/warm 벤치마크')
+    parser.add_argument('--live', action='store_true', help='실제 FinanceDataReader로 호출')
+    parser.add_argument('--latency', type=float, default=0.1, help='가짜 reader의 호출당 지연(초)')
+    parser.add_argument('--per-row-latency', type=float, default=0.002, help='가짜 reader의 행당 전송 지연(초)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def make_reader():
+            return CountingReader(latency=args.latency, per_row_latency=args.per_row_latency, live=args.live)
+
+        cold_time, cold_bytes = run("cold", cache_dir, make_reader())
+        warm_time, warm_bytes = run("warm", cache_dir, make_reader())
+
+        cache_file_size = sum(os.path.getsize(os.path.join(root, f))
+                              for root, _, files in os.walk(cache_dir) for f in files)
+        print(f"캐시 파일 크기: {cache_file_size:,} bytes")
+        print(f"warm 실행: 소요 시간 {cold_time / max(warm_time, 1e-9):.1f}배 단축, "
+              f"전송량 {cold_bytes:,} -> {warm_bytes:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
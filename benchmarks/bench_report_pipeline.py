@@ -0,0 +1,138 @@
+# 리포트 파이프라인 벤치마크 (가짜 Gemini 클라이언트 사용, 네트워크/API 키 불필요)
+#   기존: 한국어 생성 완료 -> 번역 요청 (직렬), KR 리포트 -> US 리포트 (직렬)
+#   변경: 한국어 스트리밍 저장 + 영어 동시 생성, KR/US 리포트 asyncio 동시 실행
+#   캐시: 같은 입력으로 다시 실행하면 Gemini 요청 없이 직전 리포트를 재사용하는지 (fng.report_cache)
+#   템플릿: ^KS11 조회 실패로 KOSPI 값/등락이 없어도 KOSPI 리포트가 렌더링되는지 (fng.report_template)
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_report_pipeline --chunks 20 --chunk-delay 0.05
+import argparse
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from fng import report_pipeline
+from fng.gemini_models import ModelResolver
+from fng.report_cache import ReportCache, report_key
+from fng.report_pipeline import ReportJob, generate_reports
+from fng.report_template import ADVICE_COUNT, POINT_COUNT, parse_narrative, render_kospi_report
+
+
+class FakeGemini:
+    """chunk_delay 간격으로 chunks개 조각을 내보내는 스트리밍 응답과, 같은 시간이 걸리는 일반 응답."""
+
+    def __init__(self, chunks, chunk_delay):
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+        self.models = SimpleNamespace(list=self._list, generate_content=self._generate)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content_stream=self._stream))
+
+    def _list(self):
+        return [SimpleNamespace(name="models/gemini-fake-flash")]
+
+    def _body(self, contents, i):
+        lang = "en" if "영어" in contents[-400:] or "[번역할 HTML]" in contents else "ko"
+        return "<p>%s-%d</p>" % (lang, i)
+
+    def _generate(self, model, contents):
+        self.requests += 1
+        time.sleep(self.chunks * self.chunk_delay)
+        return SimpleNamespace(text="".join(self._body(contents, i) for i in range(self.chunks)))
+
+    async def _stream(self, model, contents):
+        self.requests += 1
+
+        async def chunks():
+            for i in range(self.chunks):
+                await asyncio.sleep(self.chunk_delay)
+                yield SimpleNamespace(text=self._body(contents, i))
+        return chunks()
+
+
+def make_jobs(client, out_dir, cached=False):
+    jobs = []
+    for label in ("KOSPI", "S&P 500"):
+        models = ModelResolver(client, cache_path=os.path.join(out_dir, "model.json"), override="models/gemini-fake-flash")
+        name = label.replace(" ", "").replace("&", "").lower()
+        jobs.append(ReportJob(label=label, models=models, prompt="[분석할 실시간 데이터] %s" % label,
+                              ko_path=os.path.join(out_dir, name + ".html"),
+                              bilingual_path=os.path.join(out_dir, name + "_ko_en.html"),
+                              translate_prompt="번역하세요",
+                              cache_key=report_key({"label": label}) if cached else ""))
+    return jobs
+
+
+def legacy(client, jobs):
+    # 기존 흐름: 리포트마다 generate_content 두 번을 직렬로, 리포트도 하나씩
+    for job in jobs:
+        ko = client.models.generate_content(model="m", contents=job.prompt).text
+        client.models.generate_content(model="m", contents="%s\n\n[번역할 HTML]\n%s" % (job.translate_prompt, ko))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='리포트 스트리밍/동시 생성 벤치마크')
+    parser.add_argument('--chunks', type=int, default=20)
+    parser.add_argument('--chunk-delay', type=float, default=0.05)
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp()
+    client = FakeGemini(args.chunks, args.chunk_delay)
+    started = time.perf_counter()
+    legacy(client, make_jobs(client, out_dir))
+    legacy_elapsed = time.perf_counter() - started
+
+    for mode in ("translate", "parallel"):
+        report_pipeline.EN_MODE = mode
+        jobs = make_jobs(client, out_dir)
+        started = time.perf_counter()
+        asyncio.run(generate_reports(jobs))
+        elapsed = time.perf_counter() - started
+        with open(jobs[0].bilingual_path, encoding='utf-8') as f:
+            assert 'lang-en' in f.read()
+        print(f"[{mode}] KR+US 전체 {elapsed:.2f}s, 한국어 첫 조각 {jobs[0].timings['ko_first_chunk']:.2f}s")
+    print(f"기존 직렬 흐름: {legacy_elapsed:.2f}s")
+
+    # 같은 입력으로 두 번: 두 번째는 요청 0회, 파일 내용도 그대로여야 함
+    cache = ReportCache(os.path.join(out_dir, "report_cache.json"))
+    for run in (1, 2):
+        jobs = make_jobs(client, out_dir, cached=True)
+        before = client.requests
+        started = time.perf_counter()
+        asyncio.run(generate_reports(jobs, cache))
+        print(f"[캐시 {run}회차] {time.perf_counter() - started:.2f}s, Gemini 요청 {client.requests - before}회")
+    assert cache.stats["hits"] == 2 and cache.stats["misses"] == 2
+
+    # ^KS11 조회에 실패한 날: build_index_snapshot()의 KOSPI 값/등락이 None이어도 리포트를 만들어야 함
+    data = {"final_score": 50, "status_phase": "중립", "indicator_scores": [50, 50, 50, 50, 50],
+            "kospi_value": None, "kospi_change_point": None, "kospi_change_rate": None}
+    narrative = dict({key: "문장" for key in ("summary", "analysis_title", "overview", "advice_title", "closing")},
+                     indicators=[{"status": "중립", "analysis": "분석"}] * 5,
+                     points=[{"title": "제목", "text": "내용"}] * POINT_COUNT,
+                     advice=[{"title": "제목", "text": "내용"}] * ADVICE_COUNT)
+    narrative = parse_narrative(json.dumps(narrative, ensure_ascii=False), 5)
+    for lang in ("ko", "en"):
+        assert "KOSPI - " in render_kospi_report(data, narrative, datetime(2026, 10, 16, 16), lang)
+    print("KOSPI 값 없음: 리포트 렌더링 ('-' 표시)")
+
+    # 영문 리포트에는 지표 이름·라벨까지 한글이 남으면 안 됨 (내러티브도 영문으로 채워서 확인)
+    # 뉴스 피드를 쓰는 날의 indicator6(뉴스 심리)까지 포함해서 6개 지표로 렌더링
+    narrative = dict({key: "sentence" for key in ("summary", "analysis_title", "overview", "advice_title", "closing")},
+                     indicators=[{"status": "Neutral", "analysis": "analysis"}] * 6,
+                     points=[{"title": "title", "text": "text"}] * POINT_COUNT,
+                     advice=[{"title": "title", "text": "text"}] * ADVICE_COUNT)
+    narrative = parse_narrative(json.dumps(narrative), 6)
+    html = render_kospi_report(dict(data, kospi_value=2600.5, indicator_scores=[50] * 6), narrative,
+                               datetime(2026, 10, 16, 16), "en")
+    assert "News Sentiment" in html
+    assert re.search(r"[가-힣]", html) is None, re.findall(r"[가-힣]+", html)
+    print("영문 리포트: 한글 없음")
+
+
+if __name__ == "__main__":
+    main()
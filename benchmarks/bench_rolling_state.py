@@ -0,0 +1,176 @@
+# 지표 1~3 증분 상태(IndicatorState) 동등성 확인 + 벤치마크 (네트워크 불필요)
+#   1) 거래일마다 한 봉씩 반영한 MA125/RSI14/ADR20이 pandas rolling 식(get_scores 기존 계산)과 같은지
+#   2) 중간에 체크포인트/복원을 거쳐도 결과가 같은지
+#   3) 장중 미확정 봉(pending_close) 미리보기가 그 봉을 포함한 pandas 계산과 같은지
+#   4) 과거 거래일 하나의 KRX 조회가 첫 실행에서 실패하고 다음 실행에서 성공할 때, ADR 창이
+#      매 실행 후보 구간 전체를 다시 조회하던 방식과 같은지 (korea_fear_greed.collect_adr_window, 가짜 조회 함수)
+#   5) 하루 갱신 비용: 증분 상태 push vs 전체 이력 rolling 재계산
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_rolling_state --days 2500
+import argparse
+import contextlib
+import io
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from fng import scoring
+from fng.krx_daily import KrxDailyStore
+from fng.rolling_state import IndicatorState
+
+TOLERANCE = 1e-9
+
+
+def synthetic(days, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2026-10-16", periods=days)
+    close = pd.Series(2500 * np.exp(np.cumsum(rng.normal(0, 0.012, days))), index=index)
+    adv = pd.Series(rng.integers(50, 700, days), index=index).astype(float)
+    dec = pd.Series(rng.integers(0, 700, days), index=index).astype(float)
+    dec[rng.random(days) < 0.03] = 0 # 데이터 이상일 (건너뛰어야 함)
+    return close, adv, dec
+
+
+def pandas_reference(close, adv, dec):
+    """get_scores가 쓰던 pandas 계산: 각 날짜 기준 MA125, RSI14, 유효 20거래일 ADR."""
+    ma = close.rolling(window=scoring.MA_WINDOW).mean()
+    rsi = scoring.rsi(close)
+    valid = dec > 0
+    sums_adv = adv[valid].rolling(scoring.ADR_DAYS).sum().reindex(close.index).ffill()
+    sums_dec = dec[valid].rolling(scoring.ADR_DAYS).sum().reindex(close.index).ffill()
+    return ma, rsi, sums_adv / sums_dec * 100
+
+
+def same(a, b):
+    if a is None or (isinstance(a, float) and math.isnan(a)):
+        return b is None or pd.isna(b)
+    return not pd.isna(b) and abs(a - b) <= TOLERANCE * max(1.0, abs(b))
+
+
+def check_equivalence(close, adv, dec):
+    ma_ref, rsi_ref, adr_ref = pandas_reference(close, adv, dec)
+    dates = close.index.strftime('%Y%m%d')
+    checkpoint = os.path.join(tempfile.mkdtemp(), "state.json")
+    state = IndicatorState()
+    mismatches = 0
+    for i, date_str in enumerate(dates):
+        if i == len(dates) // 2: # 중간에 체크포인트로 저장했다가 복원해 이어서 계산
+            state.checkpoint(checkpoint)
+            state = IndicatorState.restore(checkpoint)
+        state.push_close(date_str, close.iloc[i])
+        state.push_breadth(date_str, adv.iloc[i], dec.iloc[i])
+        adr = state.adr_ratio(date_str)
+        checks = ((state.ma(), ma_ref.iloc[i]), (state.rsi(), rsi_ref.iloc[i]))
+        if i >= 60: # 45일 후보 구간 조건은 pandas 기준식에 없으므로 유효일이 충분히 쌓인 뒤만 비교
+            checks += ((adr, adr_ref.iloc[i]),)
+        for got, want in checks:
+            if not same(got, want):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"불일치 {date_str}: {got} != {want}")
+    print(f"동등성: {len(dates)}거래일, 불일치 {mismatches}건 (체크포인트/복원 포함)")
+    return mismatches
+
+
+def check_pending(close):
+    state = IndicatorState()
+    state.sync_closes(close.iloc[:-1], until="99999999")
+    pending = close.iloc[-1]
+    ma_ok = same(state.ma(pending), close.rolling(scoring.MA_WINDOW).mean().iloc[-1])
+    rsi_ok = same(state.rsi(pending), scoring.rsi(close).iloc[-1])
+    before = state.to_dict()
+    print(f"미확정 봉 미리보기: MA {'일치' if ma_ok else '불일치'}, RSI {'일치' if rsi_ok else '불일치'}, "
+          f"상태 {'변경 없음' if state.to_dict() == before else '변경됨'}")
+    return ma_ok and rsi_ok
+
+
+def check_late_breadth(adv, dec, failed_index=5):
+    """후보 중 failed_index번째(최신부터) 거래일 조회가 첫 실행에서 실패하고 다음 실행에서 성공하는 경우."""
+    os.environ["KRX_RATE_LIMIT"] = "0" # KrxFetcher의 기본 요청 제한은 임포트 시점에 정해짐
+    with contextlib.redirect_stdout(io.StringIO()):
+        import korea_fear_greed
+
+    dates = adv.index.strftime('%Y%m%d')
+    as_of = (adv.index[-1] + pd.offsets.BDay(1)).strftime('%Y%m%d')
+    candidates = [d for d in dates if (pd.Timestamp(as_of) - pd.Timestamp(d)).days < scoring.ADR_CANDIDATE_DAYS]
+    candidates.reverse()
+    counts = dict(zip(dates, zip(adv.astype(int), dec.astype(int))))
+    valid = [d for d in candidates if counts[d][1] > 0]
+    failed = valid[failed_index]
+    store = KrxDailyStore(os.path.join(tempfile.mkdtemp(), "krx_daily.sqlite"))
+    failing = {failed}
+
+    def fetch(date_str): # get_adr_counts_from_krx_api처럼 받은 날의 집계를 저장하고 (상승, 하락)을 반환
+        if date_str in failing:
+            return None, None
+        a, b = counts[date_str]
+        store.update(date_str, adv=a, dec=b)
+        return a, b
+
+    def baseline(excluded): # 매 실행 후보 구간 전체를 최신부터 다시 조회하던 방식
+        return [(d,) + counts[d] for d in valid if d not in excluded][:scoring.ADR_DAYS]
+
+    ok = True
+    first_calls = candidates.index(valid[scoring.ADR_DAYS]) + 1 # 실패한 날 대신 21번째 유효일까지
+    for label, expected_calls in (("첫 실행", first_calls), ("다음 실행", 1), ("그다음 실행", 0)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            window, calls = korea_fear_greed.collect_adr_window(candidates, fetch=fetch, store=store)
+        expected = baseline(failing)
+        state = IndicatorState()
+        state.sync_breadth(reversed(window))
+        got, want = state.adr_ratio(as_of), scoring.adr_ratio(sum(a for _, a, _ in expected), sum(b for _, _, b in expected))
+        same_window = window == expected and same(got, want)
+        # 첫 실행: 21번째 유효일까지 + 미리 시작한 요청(max_workers - 1개 이하). 이후: 실패했던 날만 다시 요청
+        if label == "첫 실행":
+            calls_ok = expected_calls <= calls < expected_calls + korea_fear_greed.KrxFetcher().max_workers
+        else:
+            calls_ok = calls == expected_calls
+        ok = ok and same_window and calls_ok
+        print(f"늦게 채워진 거래일 ({label}, {failed} {'실패' if failing else '성공'}): "
+              f"창 {'일치' if same_window else '불일치'}, KRX 요청 {calls}회")
+        failing = set()
+    return ok
+
+
+def bench(close, repeat):
+    # 기존: 매 실행 전체 이력(약 137거래일)에 rolling 재계산
+    window = close.iloc[-137:]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        window.rolling(window=scoring.MA_WINDOW).mean().iloc[-1]
+        scoring.rsi(window).iloc[-1]
+    full = (time.perf_counter() - started) / repeat
+
+    state = IndicatorState()
+    state.sync_closes(close.iloc[:-1], until="99999999")
+    pending = float(close.iloc[-1])
+    started = time.perf_counter()
+    for _ in range(repeat):
+        state.ma(pending)
+        state.rsi(pending)
+    incremental = (time.perf_counter() - started) / repeat
+    print(f"지표 1, 2 계산: pandas rolling {full * 1e6:.1f}us, 증분 상태 {incremental * 1e6:.2f}us ({full / incremental:.0f}배)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='증분 지표 상태 동등성/성능 확인')
+    parser.add_argument('--days', type=int, default=2500)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    close, adv, dec = synthetic(args.days)
+    mismatches = check_equivalence(close, adv, dec)
+    pending_ok = check_pending(close)
+    late_ok = check_late_breadth(adv, dec)
+    bench(close, args.repeat)
+    if mismatches or not pending_ok or not late_ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
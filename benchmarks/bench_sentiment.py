@@ -0,0 +1,75 @@
+# 감성 분석(fng.sentiment, /analyze) 처리량 측정
+#   1) SentimentModel.score_batch: 헤드라인 N개를 한 번에 계산
+#   2) /analyze {"texts": [...]} JSON 배치 요청 (Flask 테스트 클라이언트)
+#   3) /analyze NDJSON 스트리밍 요청 (한 줄에 {"id", "text"})
+# 헤드라인은 한국어/영어 템플릿을 섞어 만든 가짜 데이터입니다 (네트워크 불필요).
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.bench_sentiment --count 20000
+import argparse
+import json
+import random
+import time
+
+from fng.sentiment import SentimentModel
+
+SUBJECTS_KO = ["코스피", "코스닥", "삼성전자", "반도체주", "2차전지주", "외국인", "원·달러 환율", "증시"]
+EVENTS_KO = ["외국인 순매수에 사상 최고치 경신", "경기 침체 우려에 급락", "금리 인하 기대감에 반등", "어닝 쇼크로 신저가",
+             "관망세 속 보합", "실적 개선 전망에 강세", "상승하지 못하고 약세 마감", "변동성 확대 속 하락세"]
+SUBJECTS_EN = ["Stocks", "The S&P 500", "Tech shares", "Chipmakers", "Treasury yields", "Bank stocks", "Oil", "The dollar"]
+EVENTS_EN = ["rallied to a record high on rate cut hopes", "plunged after a profit warning", "were little changed",
+             "did not fall despite recession fears", "slid as inflation worries grew", "rebounded on strong earnings",
+             "tumbled in a broad sell-off", "climbed as optimism returned"]
+
+
+def make_headlines(count, seed=0):
+    rng = random.Random(seed)
+    headlines = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            headlines.append(f"{rng.choice(SUBJECTS_KO)}, {rng.choice(EVENTS_KO)}")
+        else:
+            headlines.append(f"{rng.choice(SUBJECTS_EN)} {rng.choice(EVENTS_EN)}")
+    return headlines
+
+
+def measure(label, count, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {count}건 {elapsed:.3f}s ({count / elapsed:,.0f}건/초)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='감성 분석 처리량 측정')
+    parser.add_argument('--count', type=int, default=20000)
+    args = parser.parse_args()
+
+    headlines = make_headlines(args.count)
+    model = measure("사전 로드", 1, SentimentModel.load)
+    scores = measure("score_batch", args.count, lambda: model.score_batch(headlines))
+    single = [model.analyze([text])[0]["compound"] for text in headlines[:1000]]
+    assert all(abs(a - round(float(b), 4)) < 1e-9 for a, b in zip(single, scores["compound"][:1000])), "배치와 단건 결과가 다릅니다"
+
+    import main as app_module # Flask 앱 (firebase 등 초기화 경고는 무시해도 됨)
+    client = app_module.app.test_client()
+    batch = headlines[:app_module.SENTIMENT_MAX_BATCH]
+    response = measure("/analyze JSON 배치", len(batch), lambda: client.post('/analyze', json={"texts": batch}))
+    assert response.status_code == 200
+
+    body = "".join(json.dumps({"id": i, "text": text}, ensure_ascii=False) + "\n" for i, text in enumerate(headlines))
+    # 응답 본문은 읽을 때 생성되므로 본문까지 읽는 시간을 잰다
+    text = measure("/analyze NDJSON 스트리밍", args.count,
+                   lambda: client.post('/analyze', data=body.encode('utf-8'),
+                                       content_type='application/x-ndjson').get_data(as_text=True))
+    rows = [json.loads(line) for line in text.splitlines()]
+    assert [row["id"] for row in rows] == list(range(args.count)), "NDJSON 응답 순서가 요청과 다릅니다"
+    labels = {}
+    for row in rows:
+        labels[row["sentiment"]] = labels.get(row["sentiment"], 0) + 1
+    print("라벨 분포:", labels)
+
+
+if __name__ == "__main__":
+    main()
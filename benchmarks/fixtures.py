@@ -0,0 +1,484 @@
+# 오프라인 벤치마크용 고정 데이터(fixture)와 로컬 스텁
+# 실제 서비스 대신 디스크의 응답을 돌려주므로 KRX/FRED/Gemini/Firebase 자격 증명이나 네트워크 없이
+# get_scores, update_fng, 리포트 생성을 그대로(HttpClient, 캐시, KrxFetcher 포함) 실행할 수 있습니다.
+#
+# 디렉터리 구성 (기본 .cache/fixtures, FNG_FIXTURE_DIR로 변경):
+#   manifest.json                 source(recorded/synthetic), trading_days(기록된 거래일, 오래된 날짜부터)
+#   ohlcv/KS11.csv                ^KS11 일봉 (FinanceDataReader 형식)
+#   krx/<endpoint>/<basDd>.json.gz  KRX Open API 응답 본문 그대로 (sto_stk_bydd_trd, drv_opt_bydd_trd, idx_drvprod_dd_trd)
+#   fred/<series_id>.json         FRED series/observations 응답 본문 (최신 관측값부터)
+#   cnn.json                      CNN Fear & Greed (value, description, last_update)
+#   gemini/<kospi|snp>_<ko|en>.json  모델이 돌려줄 서술 문장 JSON
+#
+# 기록된 거래일은 실행 시점의 최근 평일로 옮겨서(rebase) 제공하므로, 오래전에 기록한 데이터도
+# "어제까지 마감된 거래일"로 보입니다 (KospiHistory의 조회 구간, 거래일 달력, KRX basDd가 모두 맞아떨어짐).
+#
+# 사용법 (저장소 루트에서):
+#   python -m benchmarks.fixtures synthesize            # 결정적인 합성 데이터 생성 (네트워크 불필요)
+#   python -m benchmarks.fixtures record                # 실제 서비스에서 기록 (KRX_API_KEY, FRED_API_KEY 필요)
+import argparse
+import contextlib
+import gzip
+import json
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from fng.krx_daily import KOSPI200_OPTION_PROD_NM, VKOSPI_IDX_NM
+from fng.ohlcv_cache import DEFAULT_CACHE_DIR
+from fng.report_template import ADVICE_COUNT, LABELS, POINT_COUNT
+from fng.trading_calendar import kst_now
+from fng.us_inputs import FRED_SERIES
+
+DEFAULT_FIXTURE_DIR = os.environ.get("FNG_FIXTURE_DIR", os.path.join(DEFAULT_CACHE_DIR, "fixtures"))
+KRX_ENDPOINTS = ("sto/stk_bydd_trd", "drv/opt_bydd_trd", "idx/drvprod_dd_trd")
+KRX_DAYS = 40 # KRX 응답을 저장할 최근 거래일 수 (ADR 후보 45달력일, VKOSPI 20거래일을 덮음)
+KOSPI_SYMBOL = "^KS11"
+EMPTY_KRX = b'{"OutBlock_1":[]}' # 휴장일/기록 없는 날짜의 KRX 응답
+# 리포트 생성 시 복사해 두는 프롬프트 파일 (작업 디렉터리를 임시 디렉터리로 옮겨 public/를 건드리지 않음)
+PROMPT_FILES = ("advisor_set.txt", "advisor_snp_set.txt", "translate_prompt.txt")
+
+
+def _endpoint_dir(endpoint):
+    return endpoint.replace("/", "_")
+
+
+def _write_json(path, obj):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=1)
+
+
+def _write_krx(root, endpoint, bas_dd, body):
+    path = os.path.join(root, "krx", _endpoint_dir(endpoint), bas_dd + ".json.gz")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "wb") as f:
+        f.write(body)
+
+
+def _narrative(label, lang, indicators):
+    """리포트 서술 JSON (parse_narrative가 요구하는 키/개수, 실제 응답과 비슷한 길이)."""
+    en = lang == "en"
+    sentence = ("Investor sentiment is cautious while foreign flows remain mixed and volatility stays contained. "
+                if en else "외국인 수급이 엇갈리는 가운데 변동성은 안정적으로 유지되며 투자 심리는 신중한 모습입니다. ")
+    narrative = {
+        "summary": f"{label} " + sentence * 2,
+        "indicators": [{"status": "Neutral / Wait-and-see" if en else "중립 / 관망", "analysis": sentence * 2}
+                       for _ in range(indicators)],
+        "analysis_title": "Balanced market awaiting direction" if en else "방향성을 기다리는 균형 장세",
+        "overview": sentence * 3,
+        "points": [{"title": f"Point {i + 1}" if en else f"포인트 {i + 1}", "text": sentence * 2} for i in range(POINT_COUNT)],
+        "advice_title": "Stay disciplined" if en else "원칙을 지키는 투자",
+        "advice": [{"title": f"Advice {i + 1}" if en else f"조언 {i + 1}", "text": sentence * 2} for i in range(ADVICE_COUNT)],
+        "closing": "Patience is a position too." if en else "기다림도 투자입니다.",
+    }
+    return narrative
+
+
+def _write_gemini(root):
+    for name, label, indicators in (("kospi", "KOSPI", len(LABELS["ko"]["indicators"]) - 1), ("snp", "S&P 500", 0)):
+        for lang in ("ko", "en"):
+            path = os.path.join(root, "gemini", f"{name}_{lang}.json")
+            if not os.path.exists(path): # 직접 기록/수정한 응답은 덮어쓰지 않음
+                _write_json(path, _narrative(label, lang, indicators))
+
+
+def synthetic_stk_block(rows, rng, invalid_ratio):
+    """sto/stk_bydd_trd 형태의 합성 응답 (실제 응답과 같은 열 구성, 일부 '-'/비정상 값 포함)."""
+    block = []
+    for i in range(rows):
+        fluc = "%.2f" % rng.uniform(-10, 10)
+        if rng.random() < invalid_ratio:
+            fluc = rng.choice(["-", "", "abc"])
+        close = rng.randint(1000, 900000)
+        item = {"BAS_DD": "20260105", "ISU_CD": "%06d" % i, "ISU_NM": "종목%d" % i,
+                "MKT_NM": rng.choice(["KOSPI", "KOSPI", "KOSDAQ", "KONEX"]), "SECT_TP_NM": "-",
+                "TDD_CLSPRC": str(close), "CMPPREVDD_PRC": str(rng.randint(-5000, 5000)), "FLUC_RT": fluc,
+                "TDD_OPNPRC": str(close), "TDD_HGPRC": str(close), "TDD_LWPRC": str(close),
+                "ACC_TRDVOL": str(rng.randint(0, 10 ** 7)), "ACC_TRDVAL": str(rng.randint(0, 10 ** 11)),
+                "MKTCAP": str(rng.randint(10 ** 9, 10 ** 13)), "LIST_SHRS": str(rng.randint(10 ** 5, 10 ** 9))}
+        if rng.random() < invalid_ratio:
+            del item["FLUC_RT"]
+        block.append(item)
+    return {"OutBlock_1": block}
+
+
+def synthetic_opt_block(rows, rng, invalid_ratio):
+    """drv/opt_bydd_trd 형태의 합성 응답."""
+    block = []
+    for i in range(rows):
+        prod = rng.choice([KOSPI200_OPTION_PROD_NM, KOSPI200_OPTION_PROD_NM, "미니코스피200 옵션", "코스닥150 옵션"])
+        vol = "-" if rng.random() < invalid_ratio else str(rng.randint(0, 500000))
+        block.append({"BAS_DD": "20260105", "PROD_NM": prod, "MKT_NM": "정규", "ISU_CD": "K%07d" % i,
+                      "ISU_NM": "%s %d" % (prod, i), "RGHT_TP_NM": rng.choice(["PUT", "CALL"]),
+                      "TDD_CLSPRC": "%.2f" % rng.uniform(0, 50), "CMPPREVDD_PRC": "%.2f" % rng.uniform(-5, 5),
+                      "TDD_OPNPRC": "1.00", "TDD_HGPRC": "1.00", "TDD_LWPRC": "1.00", "IMP_VOLT": "20.1",
+                      "NXTDD_BAS_PRC": "1.00", "ACC_TRDVOL": vol, "ACC_TRDVAL": str(rng.randint(0, 10 ** 9)),
+                      "ACC_OPNINT_QTY": str(rng.randint(0, 10 ** 5))})
+    return {"OutBlock_1": block}
+
+
+def synthesize(root=DEFAULT_FIXTURE_DIR, days=260, krx_days=KRX_DAYS, end="20260930", seed=0,
+               stock_rows=2500, option_rows=800):
+    """
+    결정적인 합성 fixture를 만듭니다. KRX 응답은 실제 응답과 같은 열 구성이며
+    종목/옵션 행 수는 실제 일별 응답 크기에 가깝게 둡니다.
+    """
+    rng = random.Random(seed)
+    shutil.rmtree(root, ignore_errors=True)
+    index = pd.bdate_range(end=pd.Timestamp(end), periods=days)
+    close, rows = 2500.0, []
+    for _ in index:
+        open_ = close * (1 + rng.gauss(0, 0.003))
+        close *= 1 + rng.gauss(0.0003, 0.011)
+        high = max(open_, close) * (1 + abs(rng.gauss(0, 0.004)))
+        low = min(open_, close) * (1 - abs(rng.gauss(0, 0.004)))
+        rows.append((round(open_, 2), round(high, 2), round(low, 2), round(close, 2), rng.randint(300_000, 900_000)))
+    frame = pd.DataFrame(rows, index=index, columns=["Open", "High", "Low", "Close", "Volume"])
+    frame.index.name = "Date"
+    frame["Change"] = frame["Close"].pct_change().fillna(0.0).round(6)
+    os.makedirs(os.path.join(root, "ohlcv"), exist_ok=True)
+    frame.to_csv(os.path.join(root, "ohlcv", "KS11.csv"))
+
+    trading_days = index.strftime('%Y%m%d').tolist()
+    vkospi = 18.0
+    for bas_dd in trading_days[-krx_days:]:
+        stocks = synthetic_stk_block(stock_rows, rng, 0.002)
+        options = synthetic_opt_block(option_rows, rng, 0.002)
+        for item in stocks["OutBlock_1"] + options["OutBlock_1"]:
+            item["BAS_DD"] = bas_dd
+        vkospi = max(9.0, vkospi + rng.gauss(0, 1.0))
+        indexes = {"OutBlock_1": [
+            {"BAS_DD": bas_dd, "IDX_CLSS": "선물지수", "IDX_NM": name, "CLSPRC_IDX": "%.2f" % value,
+             "CMPPREVDD_IDX": "%.2f" % rng.gauss(0, 1), "FLUC_RT": "%.2f" % rng.gauss(0, 1)}
+            for name, value in (("코스피 200 선물지수", close / 7), (VKOSPI_IDX_NM, vkospi),
+                                ("코스피 200 선물인버스지수", 900 + rng.gauss(0, 10)))]}
+        for endpoint, data in zip(KRX_ENDPOINTS, (stocks, options, indexes)):
+            _write_krx(root, endpoint, bas_dd, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    last = index[-1]
+    for name, series_id in FRED_SERIES.items():
+        base = {"fedfunds": 4.33, "vix": 17.5, "payems": 159000.0, "unrate": 4.2, "dgs10": 4.25, "sp500": 6500.0}[name]
+        observations = [{"realtime_start": last.strftime('%Y-%m-%d'), "realtime_end": last.strftime('%Y-%m-%d'),
+                         "date": (last - pd.Timedelta(days=i)).strftime('%Y-%m-%d'),
+                         "value": "%.2f" % (base * (1 + rng.gauss(0, 0.01)))} for i in range(10)]
+        _write_json(os.path.join(root, "fred", series_id + ".json"),
+                    {"units": "lin", "order_by": "observation_date", "sort_order": "desc", "count": len(observations),
+                     "offset": 0, "limit": len(observations), "observations": observations})
+    _write_json(os.path.join(root, "cnn.json"),
+                {"value": 44.7, "description": "fear", "last_update": last.strftime('%Y-%m-%dT%H:%M:%S+00:00')})
+    _write_gemini(root)
+    _write_json(os.path.join(root, "manifest.json"),
+                {"source": "synthetic", "created_at": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+                 "seed": seed, "trading_days": trading_days})
+    print(f"합성 fixture 생성: {root} (거래일 {len(trading_days)}일, KRX {min(krx_days, days)}일)")
+    return root
+
+
+def record(root=DEFAULT_FIXTURE_DIR, krx_days=KRX_DAYS, lookback_days=400):
+    """
+    실제 서비스 응답을 기록합니다 (KRX_API_KEY, FRED_API_KEY 필요, 인증키는 저장하지 않음).
+    Gemini 응답은 기록하지 않고 gemini/의 서술 JSON을 그대로 사용합니다 (없으면 합성).
+    """
+    import FinanceDataReader as fdr
+    import fear_and_greed
+
+    from fng.http_client import get_client
+    from korea_fear_greed import KRX_BASE_URL
+    from main import FRED_BASE_URL
+
+    client = get_client()
+    frame = fdr.DataReader(KOSPI_SYMBOL, start=datetime.now() - timedelta(days=lookback_days)).sort_index()
+    today = kst_now().strftime('%Y%m%d')
+    frame = frame[frame.index.strftime('%Y%m%d') < today] # 장중 미확정 봉 제외
+    frame.index.name = "Date"
+    os.makedirs(os.path.join(root, "ohlcv"), exist_ok=True)
+    frame.to_csv(os.path.join(root, "ohlcv", "KS11.csv"))
+    trading_days = frame.index.strftime('%Y%m%d').tolist()
+
+    auth_key = os.environ["KRX_API_KEY"]
+    for bas_dd in trading_days[-krx_days:]:
+        for endpoint in KRX_ENDPOINTS:
+            response = client.get(KRX_BASE_URL + endpoint, headers={"AUTH_KEY": auth_key},
+                                  params={"basDd": bas_dd, "AUTH_KEY": auth_key})
+            _write_krx(root, endpoint, bas_dd, response.content)
+        print(f"KRX 기록: {bas_dd}")
+
+    for series_id in FRED_SERIES.values():
+        response = client.get(FRED_BASE_URL + "series/observations",
+                              params={"series_id": series_id, "api_key": os.environ["FRED_API_KEY"],
+                                      "file_type": "json", "sort_order": "desc", "limit": 10})
+        _write_json(os.path.join(root, "fred", series_id + ".json"), response.json())
+    index = fear_and_greed.get()
+    _write_json(os.path.join(root, "cnn.json"), {"value": index.value, "description": index.description,
+                                                  "last_update": index.last_update.isoformat()})
+    _write_gemini(root)
+    _write_json(os.path.join(root, "manifest.json"),
+                {"source": "recorded", "created_at": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+                 "trading_days": trading_days})
+    print(f"fixture 기록 완료: {root} (거래일 {len(trading_days)}일, KRX {krx_days}일)")
+    return root
+
+
+class Fixtures:
+    """
+    fixture 디렉터리를 읽고, 기록된 거래일을 실행 시점의 최근 평일(오늘 제외)로 옮겨 제공합니다.
+    live_to_recorded: 옮겨진 basDd -> 기록된 basDd
+    """
+
+    def __init__(self, root=DEFAULT_FIXTURE_DIR, now=None):
+        self.root = os.path.abspath(root) # OfflineEnvironment가 작업 디렉터리를 옮긴 뒤에도 같은 파일을 읽도록
+        with open(os.path.join(root, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        recorded = self.manifest["trading_days"]
+        today = (now or kst_now()).strftime('%Y%m%d')
+        live = pd.bdate_range(end=pd.Timestamp(today) - pd.Timedelta(days=1), periods=len(recorded))
+        self.live_days = live.strftime('%Y%m%d').tolist()
+        self.live_to_recorded = dict(zip(self.live_days, recorded))
+        frame = pd.read_csv(os.path.join(root, "ohlcv", "KS11.csv"), index_col=0, parse_dates=True)
+        frame.index = live # 행 순서는 그대로, 날짜만 옮김
+        frame.index.name = "Date"
+        self.frame = frame
+        self._gemini = {}
+        for name in ("kospi", "snp"):
+            for lang in ("ko", "en"):
+                with open(os.path.join(root, "gemini", f"{name}_{lang}.json"), encoding="utf-8") as f:
+                    self._gemini[name, lang] = f.read()
+
+    @property
+    def source(self):
+        return self.manifest.get("source", "unknown")
+
+    def read_ohlcv(self, symbol, start=None):
+        """fdr.DataReader와 같은 시그니처 (KospiHistory reader)."""
+        if symbol != KOSPI_SYMBOL:
+            raise ValueError(f"fixture에 없는 심볼: {symbol}")
+        return self.frame if start is None else self.frame[self.frame.index >= pd.Timestamp(start).normalize()].copy()
+
+    def krx_body(self, endpoint, bas_dd):
+        recorded = self.live_to_recorded.get(bas_dd)
+        path = os.path.join(self.root, "krx", _endpoint_dir(endpoint), f"{recorded}.json.gz")
+        if recorded is None or not os.path.exists(path):
+            return EMPTY_KRX
+        with gzip.open(path, "rb") as f:
+            return f.read()
+
+    def fred_body(self, series_id):
+        path = os.path.join(self.root, "fred", series_id + ".json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def cnn_body(self):
+        """CNN graphdata 응답 본문 (fear_and_greed.get()이 읽는 부분만)."""
+        with open(os.path.join(self.root, "cnn.json"), encoding="utf-8") as f:
+            data = json.load(f)
+        return json.dumps({"fear_and_greed": {"score": data["value"], "rating": data["description"],
+                                              "timestamp": data["last_update"]}}).encode()
+
+    def gemini_text(self, contents):
+        """
+        프롬프트로 리포트와 언어를 판단해 서술 JSON을 돌려줍니다.
+        KOSPI: 입력 데이터에 indicator_scores가 있거나, 번역할 JSON에 지표별 status가 있음.
+        영어: report_pipeline의 영어 생성/번역 지침이 붙어 있음.
+        """
+        from fng.report_pipeline import NARRATIVE_ENGLISH_INSTRUCTION, NARRATIVE_TRANSLATE_INSTRUCTION
+
+        name = "kospi" if "indicator_scores" in contents or '"status"' in contents else "snp"
+        english = NARRATIVE_ENGLISH_INSTRUCTION in contents or NARRATIVE_TRANSLATE_INSTRUCTION in contents
+        lang = "en" if english else "ko"
+        return self._gemini[name, lang]
+
+
+class FixtureServer:
+    """
+    KRX Open API(/krx/<endpoint>?basDd=), FRED(/fred/series/observations?series_id=),
+    CNN Fear & Greed(/cnn/graphdata)를 흉내 내는 로컬 HTTP 서버.
+    latency: 요청마다 더하는 지연(초). requests: 경로 종류별 요청 수.
+    """
+
+    def __init__(self, fixtures, latency=0.0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.requests = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # keep-alive (HttpClient 연결 풀 재사용)
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                status, body = server.respond(url.path, query)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = "http://127.0.0.1:%d" % self._httpd.server_address[1]
+
+    def respond(self, path, query):
+        if self.latency:
+            time.sleep(self.latency)
+        if path.startswith("/krx/"):
+            kind, body = "krx", self.fixtures.krx_body(path[len("/krx/"):], query.get("basDd", ""))
+        elif path == "/fred/series/observations":
+            kind, body = "fred", self.fixtures.fred_body(query.get("series_id", ""))
+        elif path == "/cnn/graphdata":
+            kind, body = "cnn", self.fixtures.cnn_body()
+        else:
+            kind, body = "unknown", None
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+        return (200, body) if body is not None else (404, b'{"error":"not found"}')
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class FixtureGemini:
+    """google.genai.Client 대신 쓰는 클라이언트. chunk_size 글자씩 chunk_delay 간격으로 서술 JSON을 스트리밍합니다."""
+
+    def __init__(self, fixtures, chunk_delay=0.0, chunk_size=200):
+        self.fixtures = fixtures
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.requests = 0
+        self.models = SimpleNamespace(list=lambda: [SimpleNamespace(name="models/gemini-fixture-flash")],
+                                      generate_content=self._generate)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content_stream=self._stream))
+
+    def _generate(self, model, contents, **kwargs):
+        self.requests += 1
+        return SimpleNamespace(text=self.fixtures.gemini_text(contents))
+
+    async def _stream(self, model, contents, **kwargs):
+        import asyncio
+
+        self.requests += 1
+        text = self.fixtures.gemini_text(contents)
+
+        async def chunks():
+            for i in range(0, len(text), self.chunk_size):
+                if self.chunk_delay:
+                    await asyncio.sleep(self.chunk_delay)
+                yield SimpleNamespace(text=text[i:i + self.chunk_size])
+        return chunks()
+
+
+class OfflineEnvironment:
+    """
+    fixture 서버/가짜 Gemini/메모리 Firestore로 korea_fear_greed와 main을 실행하는 환경 (with 블록).
+    작업 디렉터리를 workdir로 옮기므로 .cache, public/ 출력은 모두 workdir 아래에 생기고 저장소는 그대로입니다.
+    """
+
+    def __init__(self, fixtures, workdir, latency=0.0, chunk_delay=0.0):
+        self.fixtures = fixtures
+        self.workdir = workdir
+        self.server = FixtureServer(fixtures, latency)
+        self.gemini = FixtureGemini(fixtures, chunk_delay)
+        self._restore = []
+
+    def _patch(self, obj, name, value):
+        self._restore.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def __enter__(self):
+        import functools
+
+        import google.genai
+        import korea_fear_greed
+        import main as us_main
+        from benchmarks.bench_firestore_writer import FakeFirestore
+        from fng import http_client
+        from fng.kospi_history import KospiHistory
+
+        repo = os.getcwd()
+        os.makedirs(self.workdir, exist_ok=True)
+        for name in PROMPT_FILES:
+            if os.path.exists(os.path.join(repo, name)):
+                shutil.copy(os.path.join(repo, name), self.workdir)
+        self._cwd = repo
+        os.chdir(self.workdir)
+        self.server.start()
+        self._env = {k: os.environ.get(k) for k in ("KRX_API_KEY", "FRED_API_KEY", "GEMINI_API_KEY")}
+        os.environ.update(KRX_API_KEY="offline", FRED_API_KEY="offline", GEMINI_API_KEY="offline")
+
+        # fear_and_greed는 임포트될 때 requests_cache.install_cache로 requests.Session 전체를 1분 캐시로 바꿈
+        # -> 같은 URL의 KRX/FRED 요청이 스텁에 닿지 않으므로 이 환경에서는 끄고, HttpClient도 새로 만듦
+        self._stack = contextlib.ExitStack()
+        if "requests_cache" in sys.modules:
+            self._stack.enter_context(sys.modules["requests_cache"].disabled())
+        self._patch(http_client, "_default_client", None)
+
+        self.db = FakeFirestore()
+        self._patch(korea_fear_greed, "KRX_BASE_URL", self.server.url + "/krx/")
+        self._patch(korea_fear_greed, "KospiHistory", functools.partial(KospiHistory, reader=self.fixtures.read_ohlcv))
+        self._patch(korea_fear_greed, "get_firestore", lambda: self.db)
+        self._patch(us_main, "FRED_BASE_URL", self.server.url + "/fred/")
+        self._patch(us_main, "db", self.db)
+        self._patch(us_main.fear_and_greed.cnn, "URL", self.server.url + "/cnn/graphdata")
+        self._patch(google.genai, "Client", lambda *args, **kwargs: self.gemini)
+        return self
+
+    def reset_state(self):
+        """디스크 캐시/상태(.cache)와 열린 SQLite 연결을 지워 다음 실행을 콜드 스타트로 만듭니다."""
+        import korea_fear_greed
+
+        store = korea_fear_greed.krx_daily_store
+        if store._conn is not None:
+            store._conn.close()
+            store._conn = None
+        shutil.rmtree(os.path.join(self.workdir, DEFAULT_CACHE_DIR), ignore_errors=True)
+
+    def __exit__(self, *exc):
+        for obj, name, value in reversed(self._restore):
+            setattr(obj, name, value)
+        self._stack.close()
+        for key, value in self._env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self.server.stop()
+        os.chdir(self._cwd)
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='오프라인 벤치마크 fixture 생성/기록')
+    parser.add_argument('command', choices=['synthesize', 'record'])
+    parser.add_argument('--dir', default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument('--krx-days', type=int, default=KRX_DAYS)
+    parser.add_argument('--seed', type=int, default=0, help='synthesize 난수 시드')
+    args = parser.parse_args()
+    if args.command == 'synthesize':
+        synthesize(args.dir, krx_days=args.krx_days, seed=args.seed)
+    else:
+        record(args.dir, krx_days=args.krx_days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# 공포/탐욕 지수 계산에 쓰이는 공용 모듈 모음
@@ -0,0 +1,142 @@
+# 과거 구간 공포/탐욕 지수 일괄 계산 (백필)
+# 거래일별로 get_scores를 반복하지 않고, 입력 시계열 전체에 rolling 연산을 한 번 적용해
+# 125일 이평선/RSI/ADR 합산/VKOSPI 윈도우를 앞 거래일의 계산에 이어서 구합니다.
+# 긴 구간은 거래일 구간(chunk)으로 나눠 프로세스 풀에서 계산하며, 각 chunk는 rolling 윈도우를
+# 채우기 위한 앞쪽 WARMUP_DAYS 거래일을 함께 받으므로 결과는 한 번에 계산한 것과 같습니다.
+#
+# 기준 시점: 각 거래일의 점수는 그날 장 마감 기준입니다. 모든 지표가 당일 데이터까지 사용합니다
+# (실시간 get_scores는 KRX 일별 데이터가 다음 영업일에 공개되므로 지표 3~5에 전 거래일까지를 사용).
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from fng import scoring
+
+# 입력 프레임 열: ^KS11 종가 + KrxDailyStore 집계
+INPUT_COLUMNS = ("close", "adv", "dec", "put_vol", "call_vol", "vkospi")
+
+# korea_index 문서와 같은 이름의 점수 열
+SCORE_COLUMNS = ("indicator1", "indicator2", "indicator3", "indicator4", "indicator5")
+OUTPUT_COLUMNS = ("score",) + SCORE_COLUMNS + (
+    "kospi_value", "kospi_change_point", "kospi_change_rate",
+    "adr_raw", "vkospi", "put_call_ratio")
+
+# rolling 윈도우 중 가장 긴 것 (지표 1의 125거래일 이평선)
+WARMUP_DAYS = scoring.MA_WINDOW
+
+DEFAULT_CHUNK_DAYS = 250 # 약 1년
+# rolling 연산 자체는 10년치도 수십 ms이므로 기본은 단일 프로세스. 입력이 매우 길거나
+# 지표가 무거워지면 BACKFILL_WORKERS/--workers로 chunk를 프로세스에 나눠 계산합니다.
+DEFAULT_WORKERS = int(os.environ.get("BACKFILL_WORKERS", "1"))
+
+
+def build_inputs(kospi_df, krx_daily):
+    """^KS11 일봉(Close 열)과 KrxDailyStore.frame()을 거래일 인덱스 하나로 합칩니다."""
+    inputs = pd.DataFrame({"close": kospi_df["Close"].astype(float)})
+    inputs.index = pd.DatetimeIndex(inputs.index).normalize()
+    inputs = inputs[~inputs.index.duplicated(keep="last")]
+    krx = krx_daily.reindex(inputs.index)
+    for column in INPUT_COLUMNS[1:]:
+        inputs[column] = krx[column].astype(float) if column in krx else np.nan
+    return inputs
+
+
+def _adr(inputs):
+    """
+    지표 3: 각 거래일 기준 최근 유효 20거래일의 상승/하락 합산 비율.
+    하락 종목이 0인 날(휴장/데이터 이상)은 건너뛰며, 유효 20일이 ADR_CANDIDATE_DAYS 달력일 안에
+    모이지 않으면 NaN (get_scores의 후보 구간과 같은 조건).
+    """
+    valid = inputs[(inputs["dec"] > 0) & inputs["adv"].notna()]
+    sums = valid[["adv", "dec"]].rolling(scoring.ADR_DAYS).sum()
+    first_day = pd.Series(valid.index, index=valid.index).shift(scoring.ADR_DAYS - 1)
+    ratio = scoring.adr_ratio(sums["adv"], sums["dec"])
+    ratio = ratio.reindex(inputs.index).ffill()
+    first_day = first_day.reindex(inputs.index).ffill()
+    in_range = (inputs.index - first_day) < pd.Timedelta(days=scoring.ADR_CANDIDATE_DAYS)
+    return ratio.where(in_range)
+
+
+def _vkospi(inputs):
+    """지표 4: 최근 20거래일 min/max 윈도우 스케일링, 윈도우가 부족하거나 변동이 없으면 고정 범위."""
+    vix = inputs["vkospi"]
+    rolling = vix.rolling(scoring.VKOSPI_WINDOW, min_periods=1)
+    window_min, window_max, count = rolling.min(), rolling.max(), rolling.count()
+    use_window = (count >= scoring.VKOSPI_MIN_WINDOW) & (window_max > window_min)
+    windowed = scoring.vkospi_window_score(vix, window_min, window_max)
+    return windowed.where(use_window, scoring.vkospi_band_score(vix))
+
+
+def compute_scores(inputs):
+    """
+    입력 프레임(build_inputs)의 모든 거래일에 대해 지표 5개와 가중 합산 점수를 계산합니다.
+    계산할 수 없는 지표(데이터 부족)는 get_scores와 같이 DEFAULT_SCORE로 채웁니다.
+    """
+    close = inputs["close"]
+    out = pd.DataFrame(index=inputs.index)
+
+    ma = close.rolling(window=scoring.MA_WINDOW).mean()
+    out["indicator1"] = scoring.ma_gap_score(close, ma)
+    out["indicator2"] = scoring.rsi(close)
+
+    out["adr_raw"] = _adr(inputs)
+    out["indicator3"] = scoring.adr_score(out["adr_raw"])
+
+    out["vkospi"] = inputs["vkospi"]
+    out["indicator4"] = _vkospi(inputs)
+
+    put, call = inputs["put_vol"], inputs["call_vol"]
+    ratio = (put / call * 100).where(call != 0, 200.0)
+    out["put_call_ratio"] = ratio.where(~((put == 0) & (call == 0)) & put.notna() & call.notna())
+    out["indicator5"] = scoring.put_call_score(out["put_call_ratio"])
+
+    scores = out[list(SCORE_COLUMNS)].fillna(scoring.DEFAULT_SCORE)
+    out[list(SCORE_COLUMNS)] = scores
+    # get_scores와 같이 가중 합을 int로 내림
+    out["score"] = scoring.weighted_score([scores[c] for c in SCORE_COLUMNS]).astype(int)
+
+    out["kospi_value"] = close.round(2)
+    out["kospi_change_point"] = close.diff().round(2)
+    out["kospi_change_rate"] = (close.diff() / close.shift(1) * 100).round(2)
+    return out[list(OUTPUT_COLUMNS)]
+
+
+def _compute_chunk(inputs, start, end):
+    return compute_scores(inputs).loc[start:end]
+
+
+def split_chunks(index, start, end, chunk_days=DEFAULT_CHUNK_DAYS, warmup=WARMUP_DAYS):
+    """
+    [start, end] 구간의 거래일을 chunk_days개씩 나눠 (입력 시작, chunk 시작, chunk 끝) 위치로 반환합니다.
+    입력 시작은 chunk 시작보다 warmup 거래일 앞입니다.
+    """
+    positions = np.flatnonzero((index >= start) & (index <= end))
+    chunks = []
+    for i in range(0, len(positions), chunk_days):
+        block = positions[i:i + chunk_days]
+        chunks.append((max(0, block[0] - warmup), block[0], block[-1]))
+    return chunks
+
+
+def backfill_scores(inputs, start, end, workers=DEFAULT_WORKERS, chunk_days=DEFAULT_CHUNK_DAYS):
+    """
+    inputs(build_inputs) 중 start~end 거래일의 점수를 DataFrame(인덱스: 거래일)으로 반환합니다.
+    inputs에는 start 이전 WARMUP_DAYS 거래일 이상이 포함되어 있어야 첫날부터 정확합니다.
+    workers가 1이거나 chunk가 하나면 현재 프로세스에서 계산합니다.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    chunks = split_chunks(inputs.index, start, end, chunk_days)
+    if not chunks:
+        return pd.DataFrame(columns=list(OUTPUT_COLUMNS))
+    tasks = [(inputs.iloc[lo:hi + 1], inputs.index[first], inputs.index[hi]) for lo, first, hi in chunks]
+
+    if workers <= 1 or len(tasks) == 1:
+        parts = [_compute_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            parts = list(executor.map(_compute_chunk, *zip(*tasks)))
+    result = pd.concat(parts)
+    result.index.name = "date"
+    return result
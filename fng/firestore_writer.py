@@ -0,0 +1,86 @@
+# 지수 컬렉션(korea_index, us_index) Firestore 쓰기
+# - 문서 쓰기를 WriteBatch로 모아 최대 500건마다 한 번에 커밋 (백필처럼 많은 문서를 쓸 때 왕복 횟수 감소)
+# - 일별 점수를 월별 요약 문서(<컬렉션>_history/YYYY-MM)에 함께 기록해, 차트는 문서 몇 개만 읽으면 됨
+#
+# 요약 문서 형식: {"month": "2026-10", "days": {"20261016": {...}, "20261017": {...}}}
+# days는 날짜를 키로 하는 맵이며, 월 문서는 필드 경로("days.<날짜>") 단위 merge로 쓰므로 같은 날을 다시 쓰면
+# 그날의 항목 전체가 새 값으로 바뀌고(빠진 필드는 지워짐) 같은 달의 다른 날은 그대로 남습니다.
+# Firestore 에뮬레이터(FIRESTORE_EMULATOR_HOST)나 같은 인터페이스의 가짜 클라이언트에서도 동작합니다.
+
+MAX_BATCH_WRITES = 500 # Firestore WriteBatch 한 번에 쓸 수 있는 최대 문서 수
+HISTORY_SUFFIX = "_history"
+
+
+def month_key(date_str):
+    """'%Y%m%d' 날짜의 월별 요약 문서 ID ('YYYY-MM')."""
+    return "%s-%s" % (date_str[:4], date_str[4:6])
+
+
+class IndexWriter:
+    """
+    with 블록으로 사용하며, 블록이 정상적으로 끝나면 남은 쓰기를 커밋합니다.
+    같은 달의 요약 항목은 모아 두었다가 커밋할 때 월 문서 하나에 한 번만 씁니다.
+    """
+
+    def __init__(self, db, collection, batch_size=MAX_BATCH_WRITES, history_collection=None):
+        self.db = db
+        self.collection = collection
+        self.history_collection = history_collection or collection + HISTORY_SUFFIX
+        self.batch_size = min(batch_size, MAX_BATCH_WRITES)
+        self._docs = [] # (문서 참조, 데이터)
+        self._history = {} # 월 -> {날짜: 요약 항목}
+        self.stats = {"documents": 0, "history_updates": 0, "commits": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def add(self, data, date_str, history=None, doc_id=None):
+        """
+        data를 지수 컬렉션에 씁니다 (doc_id가 없으면 자동 ID). history를 주면 date_str('%Y%m%d')이
+        속한 월 요약 문서의 그날 항목으로 씁니다.
+        """
+        collection = self.db.collection(self.collection)
+        ref = collection.document(doc_id) if doc_id else collection.document()
+        self._docs.append((ref, data))
+        if history is not None:
+            self._history.setdefault(month_key(date_str), {})[date_str] = history
+        if len(self._docs) + len(self._history) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """모아 둔 문서와 월 요약을 batch_size 단위로 커밋합니다."""
+        writes = [(ref, data, False) for ref, data in self._docs]
+        history = self.db.collection(self.history_collection)
+        for month, days in sorted(self._history.items()):
+            # merge=True는 맵을 깊게 합쳐 다시 쓴 날의 이전 필드가 남으므로, 날짜별 필드 경로만 통째로 교체
+            # (숫자로 시작하는 필드 이름은 필드 경로에서 백틱으로 감싸야 함)
+            merge = ["month"] + ["days.`%s`" % date_str for date_str in sorted(days)]
+            writes.append((history.document(month), {"month": month, "days": days}, merge))
+        for start in range(0, len(writes), self.batch_size):
+            batch = self.db.batch()
+            for ref, data, merge in writes[start:start + self.batch_size]:
+                batch.set(ref, data, merge=merge)
+            batch.commit()
+            self.stats["commits"] += 1
+        self.stats["documents"] += len(self._docs)
+        self.stats["history_updates"] += len(self._history)
+        self._docs = []
+        self._history = {}
+
+
+def read_history(db, collection, start_month, end_month):
+    """
+    start_month~end_month('YYYY-MM') 월 요약 문서를 읽어 날짜 오름차순 [(날짜, 항목)]으로 반환합니다.
+    월마다 문서 하나이므로 1년치도 12번 읽으면 됩니다.
+    """
+    history = db.collection(collection + HISTORY_SUFFIX)
+    query = history.where("month", ">=", start_month).where("month", "<=", end_month)
+    days = {}
+    for snapshot in query.stream():
+        days.update((snapshot.to_dict() or {}).get("days", {}))
+    return sorted(days.items())
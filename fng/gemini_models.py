@@ -0,0 +1,114 @@
+# Gemini 모델 선택 (리포트 생성/번역 공용)
+# 매 실행마다 client.models.list()로 전체 모델을 훑지 않고, 고른 모델명을 디스크에 TTL 동안 캐시합니다.
+# - GEMINI_MODEL 환경 변수가 있으면 목록 조회 없이 그 모델을 사용
+# - 캐시된(또는 지정한) 모델이 NOT_FOUND로 실패할 때만 목록을 새로 조회해 한 번 다시 시도
+import json
+import os
+import time
+
+from fng.ohlcv_cache import DEFAULT_CACHE_DIR
+
+MODEL_ENV = "GEMINI_MODEL"
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "gemini_model.json")
+DEFAULT_TTL = float(os.environ.get("GEMINI_MODEL_TTL_HOURS", "24")) * 3600
+
+
+def pick_model(model_names):
+    """이름에 'gemini'가 들어간 모델 중 'flash'를 우선 선택 (없으면 첫 번째 모델)."""
+    capable = [name for name in model_names if 'gemini' in name.lower()]
+    if not capable:
+        raise Exception("사용 가능한 Gemini 모델을 찾을 수 없습니다.")
+    return next((name for name in capable if 'flash' in name.lower()), capable[0])
+
+
+def is_model_not_found(error):
+    """google-genai의 404/NOT_FOUND 오류인지 (모델이 없어졌거나 이름이 바뀐 경우)."""
+    return getattr(error, "code", None) == 404 or "NOT_FOUND" in str(error)
+
+
+class ModelResolver:
+    """
+    client(genai.Client)에 쓸 모델명을 정합니다. 같은 실행 안에서는 한 번 정한 모델을 계속 씁니다.
+    stats: listings(목록 조회 횟수), cache_hits(디스크 캐시 사용), retries(NOT_FOUND 후 재시도)
+    """
+
+    def __init__(self, client, cache_path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, override=None):
+        self.client = client
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.override = override if override is not None else os.environ.get(MODEL_ENV)
+        self._model = None
+        self.stats = {"listings": 0, "cache_hits": 0, "retries": 0}
+
+    def _load_cached(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if time.time() - cached["resolved_at"] < self.ttl:
+                return cached["model"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Gemini 모델 캐시 읽기 실패: {e}")
+        return None
+
+    def _save_cached(self, model):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"model": model, "resolved_at": time.time()}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"Gemini 모델 캐시 저장 실패: {e}")
+
+    def _list(self):
+        self.stats["listings"] += 1
+        model = pick_model([m.name for m in self.client.models.list()])
+        self._save_cached(model)
+        print(f"시스템 자동 감지 모델 사용: {model}")
+        return model
+
+    def resolve(self):
+        if self._model is None:
+            if self.override:
+                self._model = self.override
+                print(f"{MODEL_ENV} 지정 모델 사용: {self._model}")
+            else:
+                cached = self._load_cached()
+                if cached:
+                    self.stats["cache_hits"] += 1
+                    print(f"캐시된 Gemini 모델 사용: {cached}")
+                self._model = cached or self._list()
+        return self._model
+
+    def call(self, func):
+        """
+        func(model)을 실행합니다. 모델이 NOT_FOUND이면 목록을 새로 조회해 고른 모델로 한 번만 다시 시도합니다.
+        """
+        model = self.resolve()
+        try:
+            return func(model)
+        except Exception as e:
+            if not is_model_not_found(e):
+                raise
+            print(f"Gemini 모델 {model}을(를) 찾을 수 없습니다. 모델 목록을 다시 조회합니다.")
+        self.stats["retries"] += 1
+        self._model = self._list()
+        return func(self._model)
+
+    async def call_async(self, func):
+        """call()의 비동기 버전: func(model)은 코루틴을 반환합니다."""
+        model = self.resolve()
+        try:
+            return await func(model)
+        except Exception as e:
+            if not is_model_not_found(e):
+                raise
+            print(f"Gemini 모델 {model}을(를) 찾을 수 없습니다. 모델 목록을 다시 조회합니다.")
+        self.stats["retries"] += 1
+        self._model = self._list()
+        return await func(self._model)
+
+    def generate_content(self, contents, **kwargs):
+        return self.call(lambda model: self.client.models.generate_content(model=model, contents=contents, **kwargs))
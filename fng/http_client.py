@@ -0,0 +1,140 @@
+# 공용 HTTP 클라이언트 (KRX Open API, FRED 등)
+# - requests.Session + 연결 풀로 keep-alive 재사용 (요청마다 TCP/TLS 핸드셰이크를 반복하지 않음)
+# - 호스트별 동시 요청 수 제한
+# - 429/5xx/연결 오류 시 지터를 준 지수 백오프 재시도, Retry-After 헤더 존중
+# - 연결/읽기 타임아웃은 환경 변수로 조정 가능
+# - 요청/재시도/대기/바이트는 stats와 함께 fng.telemetry 카운터(http.*)에도 기록, 호출 하나는 'http:<호스트>' 단계
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fng import telemetry
+
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+DEFAULT_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+DEFAULT_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+DEFAULT_MAX_PER_HOST = int(os.environ.get("HTTP_MAX_PER_HOST", "8"))
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 초로 변환합니다. 해석할 수 없으면 None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """
+    keep-alive 연결 풀을 공유하는 HTTP 클라이언트. 여러 스레드(KrxFetcher 등)에서 동시에 사용해도 됩니다.
+    get()/stream()은 재시도를 모두 소진하면 마지막 예외(HTTPError 포함)를 그대로 던집니다.
+    """
+
+    def __init__(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, max_per_host=DEFAULT_MAX_PER_HOST,
+                 backoff_base=0.5, backoff_max=30.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.max_per_host = max_per_host
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "sleep_seconds": 0.0, "bytes": 0}
+
+    def _slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt))) # full jitter
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+        telemetry.count("http." + key, value)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with telemetry.span("http:" + urlsplit(url).netloc):
+            return self._get(url, params, headers, timeout)
+
+    def stream(self, url, chunk_size, params=None, headers=None, timeout=None):
+        """
+        응답 본문을 chunk_size 바이트씩 내보냅니다. 응답 헤더를 받을 때까지의 재시도/Retry-After/호스트별 제한은
+        get()과 같으며, 본문을 읽기 시작한 뒤의 오류는 이미 내보낸 조각을 되돌릴 수 없으므로 그대로 던집니다.
+        """
+        with telemetry.span("http:" + urlsplit(url).netloc):
+            with self._get(url, params, headers, timeout, stream=True) as response:
+                for chunk in response.iter_content(chunk_size):
+                    self._count("bytes", len(chunk))
+                    yield chunk
+
+    def _get(self, url, params, headers, timeout, stream=False):
+        slot = self._slot(url)
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                with slot:
+                    self._count("requests")
+                    response = self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout,
+                                                stream=stream)
+                if not stream:
+                    self._count("bytes", len(response.content))
+                if response.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    if stream and not response.ok:
+                        response.close()
+                    response.raise_for_status()
+                    return response
+                if stream:
+                    response.close() # 재시도 전 본문을 읽지 않은 연결을 풀에 돌려줌
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                reason = "HTTP %d" % response.status_code
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                reason = type(e).__name__
+
+            delay = self._backoff(attempt, retry_after)
+            print("HTTP 재시도 (%d/%d, %s): %s, %.2f초 대기" % (attempt + 1, self.max_retries, reason, urlsplit(url).netloc, delay))
+            self._count("retries")
+            self._count("sleep_seconds", delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """프로세스 전체에서 공유하는 HttpClient (첫 호출 시 생성)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
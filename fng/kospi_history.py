@@ -0,0 +1,84 @@
+# ^KS11 시세 이력 제공자
+# get_scores의 모든 KOSPI 파생 지표(이격도, RSI, ADR 거래일 달력, 현재가)가
+# 하나의 DataFrame을 공유하도록, 가장 긴 조회 구간을 실행당 한 번만 다운로드합니다.
+import time
+from datetime import datetime, timedelta
+
+from fng import telemetry
+
+KOSPI_SYMBOL = '^KS11' # KRX LOGOUT 오류 회피를 위해 Yahoo Finance 심볼 사용
+
+# 지표 1 (125일 이평선)이 가장 긴 구간을 요구함: 영업일 125일 ≒ 달력일 200일
+DEFAULT_LOOKBACK_DAYS = 200
+
+
+class KospiHistory:
+    """
+    ^KS11 일봉을 한 번만 받아 메모리에 보관하는 제공자.
+    reader는 fdr.DataReader와 같은 시그니처(symbol, start=...)의 함수이며, 벤치마크에서 교체할 수 있습니다.
+    cache(OhlcvCache)를 주면 디스크 캐시에 없는 최신 봉만 요청합니다.
+    """
+
+    def __init__(self, symbol=KOSPI_SYMBOL, lookback_days=DEFAULT_LOOKBACK_DAYS,
+                 max_retries=10, retry_delay=0.5, reader=None, cache=None):
+        self.symbol = symbol
+        self.lookback_days = lookback_days
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._reader = reader
+        self.cache = cache
+        self._df = None
+        self._error = None # 재시도를 모두 소진한 경우, 같은 실행 안에서 다시 다운로드하지 않음
+        self.fetch_count = 0 # 실제 네트워크 호출 횟수
+
+    def _network_read(self, symbol, start):
+        if self._reader is None:
+            import FinanceDataReader as fdr
+            self._reader = fdr.DataReader
+        self.fetch_count += 1
+        telemetry.count("kospi_history.fetches")
+        with telemetry.span("kospi_history.fetch", symbol=symbol):
+            return self._reader(symbol, start=start)
+
+    def _read(self, start):
+        if self.cache is not None:
+            return self.cache.fetch(self.symbol, start, self._network_read)
+        return self._network_read(self.symbol, start)
+
+    def get(self):
+        """가장 긴 조회 구간의 DataFrame을 반환합니다. 최초 호출 시에만 다운로드합니다."""
+        if self._df is not None:
+            return self._df
+        if self._error is not None:
+            raise self._error
+
+        start = datetime.now() - timedelta(days=self.lookback_days)
+        last_error = None
+        for attempt in range(self.max_retries):
+            try:
+                df = self._read(start)
+                if df is not None and not df.empty:
+                    self._df = df.sort_index()
+                    print(f"KOSPI 이력 ({self.symbol}) 조회 성공: {len(self._df)}거래일 "
+                          f"({self._df.index[0].strftime('%Y-%m-%d')} ~ {self._df.index[-1].strftime('%Y-%m-%d')})")
+                    return self._df
+                print(f"KOSPI 이력 ({self.symbol}) 조회 결과가 비어 있습니다. 재시도 ({attempt + 1}/{self.max_retries}).")
+            except Exception as e:
+                last_error = e
+                print(f"KOSPI 이력 ({self.symbol}) 조회 실패. 재시도 ({attempt + 1}/{self.max_retries}). 오류: {e}")
+            telemetry.count("kospi_history.retries")
+            telemetry.count("kospi_history.sleep_seconds", self.retry_delay)
+            time.sleep(self.retry_delay)
+
+        self._error = RuntimeError(f"KOSPI 이력 ({self.symbol})을 {self.max_retries}회 시도했으나 가져오지 못했습니다: {last_error}")
+        raise self._error
+
+    def window(self, days):
+        """최근 days 달력일 구간만 잘라서 반환합니다 (추가 다운로드 없음)."""
+        df = self.get()
+        cutoff = datetime.now() - timedelta(days=days)
+        return df[df.index >= cutoff]
+
+    def trading_days(self, days):
+        """최근 days 달력일 안의 거래일 목록 ('%Y%m%d' 문자열, 오래된 날짜부터)."""
+        return self.window(days).index.strftime('%Y%m%d').tolist()
@@ -0,0 +1,191 @@
+# KRX 일자별 응답을 지표 계산에 필요한 몇 개의 숫자로 줄여 저장하는 집계 저장소
+# sto/stk_bydd_trd (종목별 시세)  -> adv, dec, unchanged
+# drv/opt_bydd_trd (옵션 시리즈별) -> put_vol, call_vol
+# idx/drvprod_dd_trd (파생상품지수) -> vkospi
+# 지표 계산은 수 MB의 OutBlock_1 JSON을 다시 파싱하지 않고 하루 몇 개의 정수만 읽습니다.
+import json
+import os
+import sqlite3
+import threading
+import zlib
+
+import pandas as pd
+
+from fng.ohlcv_cache import DEFAULT_CACHE_DIR
+from fng.trading_calendar import kst_now
+
+KOSPI_MARKET_NAMES = ("KOSPI", "유가증권") # KOSPI 시장 필터링 ("KOSPI" 또는 "유가증권" 대응)
+KOSPI200_OPTION_PROD_NM = "코스피200 옵션"
+VKOSPI_IDX_NM = "코스피 200 변동성지수"
+
+FIELDS = ("adv", "dec", "unchanged", "put_vol", "call_vol", "vkospi")
+
+# 이전 버전이 원본 응답을 저장하던 캐시 파일 (zlib 압축 JSON). 첫 실행에서 집계로 옮긴 뒤 지움
+LEGACY_RESPONSE_CACHE = "krx_responses.sqlite"
+
+
+def is_finalized(bas_dd):
+    """
+    오늘(KST) 이전 날짜만 마감된 거래일로 간주합니다. 당일 데이터는 장중/집계 중일 수 있습니다.
+    마감된 거래일(basDd)의 응답은 바뀌지 않으므로 이런 날의 집계만 저장합니다.
+    """
+    return bool(bas_dd) and bas_dd < kst_now().strftime("%Y%m%d")
+
+
+def reduce_adr(data):
+    """KOSPI 종목의 상승/하락/보합 종목 수. OutBlock_1이 없으면 None."""
+    if not data or not data.get("OutBlock_1"):
+        return None
+    adv = dec = unchanged = 0
+    for item in data["OutBlock_1"]:
+        if item.get("MKT_NM", "") not in KOSPI_MARKET_NAMES:
+            continue
+        fluc_rt_str = item.get("FLUC_RT", "0")
+        try:
+            fluc_rt = 0.0 if fluc_rt_str == "-" else float(fluc_rt_str)
+        except ValueError:
+            fluc_rt = 0.0
+        if fluc_rt > 0:
+            adv += 1
+        elif fluc_rt < 0:
+            dec += 1
+        else:
+            unchanged += 1
+    return {"adv": adv, "dec": dec, "unchanged": unchanged}
+
+
+def reduce_put_call(data):
+    """코스피200 옵션의 풋/콜 누적 거래량 합계. 해당 상품 행이 없으면 None."""
+    if not data or not data.get("OutBlock_1"):
+        return None
+    put_vol = call_vol = 0.0
+    found = False
+    for item in data["OutBlock_1"]:
+        if item.get("PROD_NM", "") != KOSPI200_OPTION_PROD_NM:
+            continue
+        found = True
+        try:
+            acc_trdvol = float(item.get("ACC_TRDVOL").replace('-', '0'))
+        except (AttributeError, ValueError) as ve:
+            print("거래량 변환 오류: %s (item: %s)" % (str(ve), str(item)))
+            continue
+        if item.get("RGHT_TP_NM") == "PUT":
+            put_vol += acc_trdvol
+        elif item.get("RGHT_TP_NM") == "CALL":
+            call_vol += acc_trdvol
+    if not found:
+        return None
+    return {"put_vol": put_vol, "call_vol": call_vol}
+
+
+def reduce_vkospi(data):
+    """코스피 200 변동성지수 종가. 해당 지수가 없으면 None."""
+    if not data or not data.get("OutBlock_1"):
+        return None
+    for item in data["OutBlock_1"]:
+        if item.get("IDX_NM") == VKOSPI_IDX_NM:
+            return {"vkospi": float(item.get("CLSPRC_IDX").replace('-', ''))} # '-' 제거 후 float 변환
+    return None
+
+
+# 원본 응답 캐시의 endpoint -> 집계 함수
+LEGACY_REDUCERS = {
+    "sto/stk_bydd_trd": reduce_adr,
+    "drv/opt_bydd_trd": reduce_put_call,
+    "idx/drvprod_dd_trd": reduce_vkospi,
+}
+
+
+class KrxDailyStore:
+    """
+    basDd 한 행에 adv, dec, unchanged, put_vol, call_vol, vkospi를 담는 SQLite 시계열 테이블.
+    엔드포인트마다 채우는 열이 다르므로 update는 넘겨받은 열만 갱신합니다. 마감된 거래일만 저장합니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "krx_daily.sqlite")
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS krx_daily ("
+                " bas_dd TEXT PRIMARY KEY, adv INTEGER, dec INTEGER, unchanged INTEGER,"
+                " put_vol REAL, call_vol REAL, vkospi REAL)"
+            )
+        return self._conn
+
+    def get(self, bas_dd):
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT %s FROM krx_daily WHERE bas_dd = ?" % ", ".join(FIELDS), (bas_dd,)).fetchone()
+            except Exception as e:
+                print(f"KRX 일별 집계 읽기 실패 ({bas_dd}): {e}")
+                return None
+        return dict(zip(FIELDS, row)) if row else None
+
+    def update(self, bas_dd, **values):
+        if not is_finalized(bas_dd):
+            return False
+        columns = [k for k in values if k in FIELDS]
+        if not columns:
+            return False
+        sql = "INSERT INTO krx_daily (bas_dd, %s) VALUES (?, %s) ON CONFLICT(bas_dd) DO UPDATE SET %s" % (
+            ", ".join(columns), ", ".join("?" for _ in columns), ", ".join("%s = excluded.%s" % (c, c) for c in columns))
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(sql, [bas_dd] + [values[c] for c in columns])
+                conn.commit()
+                return True
+            except Exception as e:
+                print(f"KRX 일별 집계 저장 실패 ({bas_dd}): {e}")
+                return False
+
+    def frame(self, start=None, end=None):
+        """저장된 집계를 basDd 오름차순 DataFrame으로 반환합니다 (인덱스: datetime)."""
+        sql = "SELECT bas_dd, %s FROM krx_daily WHERE bas_dd >= ? AND bas_dd <= ? ORDER BY bas_dd" % ", ".join(FIELDS)
+        with self._lock:
+            rows = self._connect().execute(sql, (start or "00000000", end or "99999999")).fetchall()
+        df = pd.DataFrame(rows, columns=("bas_dd",) + FIELDS)
+        df.index = pd.to_datetime(df.pop("bas_dd"), format="%Y%m%d")
+        return df
+
+    def import_legacy_responses(self, path=None):
+        """
+        이전 버전의 원본 응답 캐시가 있으면 집계로 옮긴 뒤 파일을 지우고, 옮긴 응답 수를 반환합니다.
+        파일이 없으면(이미 옮겼거나 처음부터 없음) 존재 여부만 확인하고 끝납니다.
+        """
+        path = path or os.path.join(os.path.dirname(self.path), LEGACY_RESPONSE_CACHE)
+        if not os.path.exists(path):
+            return 0
+        imported = 0
+        try:
+            conn = sqlite3.connect(path)
+            try:
+                rows = conn.execute("SELECT endpoint, bas_dd, body FROM responses").fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"이전 KRX 응답 캐시 읽기 실패: {e}")
+            rows = []
+        for endpoint, bas_dd, body in rows:
+            reduce = LEGACY_REDUCERS.get(endpoint)
+            try:
+                reduced = reduce(json.loads(zlib.decompress(body).decode("utf-8"))) if reduce else None
+            except Exception as e:
+                print(f"이전 KRX 응답 변환 실패 ({endpoint}, {bas_dd}): {e}")
+                continue
+            # 상승/하락이 모두 0인 응답은 아직 공개되지 않은 날이므로 옮기지 않음 (다음 실행에서 다시 조회)
+            if reduced and not (reduced.get("adv") == 0 and reduced.get("dec") == 0) and self.update(bas_dd, **reduced):
+                imported += 1
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"이전 KRX 응답 캐시 삭제 실패: {e}")
+        print(f"이전 KRX 응답 캐시에서 {imported}건을 일별 집계로 옮겼습니다.")
+        return imported
@@ -0,0 +1,79 @@
+# KRX Open API 동시 조회 엔진
+# 여러 basDd를 스레드 풀로 병렬 요청하되, 결과는 입력 순서대로 돌려주고
+# 호출부가 반복을 멈추면(예: 유효 20거래일 확보) 아직 시작하지 않은 요청은 취소합니다.
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fng import telemetry
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("KRX_MAX_WORKERS", "4"))
+DEFAULT_RATE_LIMIT = float(os.environ.get("KRX_RATE_LIMIT", "5")) # 초당 최대 요청 수 (0 이하면 제한 없음)
+
+
+class RateLimiter:
+    """요청 시작 간격을 1/rate 초 이상으로 유지하는 스레드 안전 제한기."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.interval
+        if start_at > now:
+            telemetry.count("krx.rate_limit_sleep_seconds", start_at - now)
+            time.sleep(start_at - now)
+
+
+class KrxFetcher:
+    """
+    동시성 상한(max_workers)과 속도 제한(rate_limit, 초당 요청 수)을 둔 KRX 조회기.
+    get_adr_counts_from_krx_api, get_vkospi_from_krx_api 등 basDd 하나를 받는 함수라면 모두 사용할 수 있습니다.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, rate_limit=DEFAULT_RATE_LIMIT):
+        self.max_workers = max(1, max_workers)
+        self.limiter = RateLimiter(rate_limit)
+        self.calls = 0 # 실제로 시작된 요청 수
+        self._calls_lock = threading.Lock()
+
+    def _run(self, func, item):
+        self.limiter.wait()
+        with self._calls_lock:
+            self.calls += 1
+        telemetry.count("krx.calls")
+        return func(item)
+
+    def map(self, func, items):
+        """
+        items 순서대로 (item, result, error)를 내보냅니다. func가 예외를 던지면 result는 None, error에 예외가 담깁니다.
+        최대 max_workers개만 미리 요청하므로, 반복을 일찍 멈추면 낭비되는 요청도 그 이하로 제한됩니다.
+        반복을 중간에 멈출 때는 contextlib.closing으로 감싸 남은 요청이 즉시 취소되도록 하세요.
+        """
+        items = list(items)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = []
+        next_index = 0
+        try:
+            while next_index < len(items) or pending:
+                while next_index < len(items) and len(pending) < self.max_workers:
+                    item = items[next_index]
+                    pending.append((item, executor.submit(self._run, func, item)))
+                    next_index += 1
+
+                item, future = pending.pop(0)
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
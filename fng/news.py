@@ -0,0 +1,225 @@
+# 지표 6: 뉴스 헤드라인 심리 (스트리밍 수집 + 일별 누적)
+# - NEWS_FEEDS: 쉼표로 구분한 RSS/Atom 피드 (로컬 파일 경로 또는 http(s) URL)
+# - 피드를 64KB씩 읽어 lxml XMLPullParser로 점진적으로 파싱하고, 처리한 item/entry는 바로 비워 메모리를 일정하게 유지
+# - 정규화한 제목의 해시로 중복 제거 (여러 피드에 같은 기사가 실려도, 다음 실행에서 다시 받아도 한 번만 반영)
+# - 새 헤드라인만 NEWS_BATCH개씩 fng.sentiment로 점수를 매겨 KST 날짜별 합계(개수, compound 합, 긍정/부정 수)에 더함
+# - 날짜별 합계와 본 해시는 .cache/news_state.json에 보관하므로 지난 헤드라인은 다시 점수를 매기지 않음
+# - 지표 값: 최근 NEWS_WINDOW_DAYS일 헤드라인의 평균 compound -> scoring.news_score (NEWS_MIN_HEADLINES개 미만이면 None)
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+import numpy as np
+
+from fng import scoring
+from fng.ohlcv_cache import DEFAULT_CACHE_DIR
+from fng.sentiment import NEUTRAL_BAND, get_model
+
+STATE_VERSION = 1
+DEFAULT_STATE_PATH = os.path.join(DEFAULT_CACHE_DIR, "news_state.json")
+NEWS_FEEDS = [s.strip() for s in os.environ.get("NEWS_FEEDS", "").split(",") if s.strip()]
+NEWS_WINDOW_DAYS = int(os.environ.get("NEWS_WINDOW_DAYS", "3"))
+NEWS_MIN_HEADLINES = int(os.environ.get("NEWS_MIN_HEADLINES", "20"))
+NEWS_BATCH = 500 # 감성 점수를 한 번에 매기는 헤드라인 수
+RETENTION_DAYS = max(NEWS_WINDOW_DAYS, 7) # 이보다 오래된 날짜의 합계/해시는 삭제 (이보다 오래된 기사는 무시)
+READ_SIZE = 64 * 1024
+
+KST = timezone(timedelta(hours=9))
+ITEM_TAGS = ("item", "entry") # RSS 2.0/1.0 item, Atom entry
+DATE_TAGS = ("pubDate", "published", "updated", "date") # date: dc:date
+_SPACES = re.compile(r"\s+")
+
+
+def headline_hash(title):
+    """공백/대소문자를 정규화한 제목의 해시 (16자리)."""
+    return hashlib.sha1(_SPACES.sub(" ", title).strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+def kst_date(value, default):
+    """RSS(RFC 822) 또는 Atom(ISO 8601) 날짜 문자열을 KST 'YYYYMMDD'로. 해석할 수 없으면 default."""
+    if not value:
+        return default
+    value = value.strip()
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return default
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=KST)
+    return moment.astimezone(KST).strftime('%Y%m%d')
+
+
+def read_chunks(source, size=READ_SIZE):
+    """로컬 파일 또는 http(s) URL을 size 바이트씩 읽습니다 (HTTP는 응답을 스트리밍으로 받음)."""
+    if source.startswith(("http://", "https://")):
+        from fng.http_client import get_client
+        yield from get_client().stream(source, size)
+    else:
+        with open(source, "rb") as f:
+            while True:
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+def parse_headlines(chunks, default_date):
+    """
+    피드 바이트 조각을 받는 대로 파싱해 (제목, KST 날짜)를 내보냅니다.
+    깨진 XML은 가능한 데까지 읽고(recover), 처리한 요소는 지워 피드 크기와 무관하게 메모리를 적게 씁니다.
+    """
+    from lxml import etree
+
+    # {*}: 네임스페이스와 무관하게 item/entry가 닫힐 때만 이벤트를 받음
+    parser = etree.XMLPullParser(events=("end",), tag=["{*}" + tag for tag in ITEM_TAGS],
+                                 recover=True, resolve_entities=False, no_network=True)
+
+    def drain():
+        for _, elem in parser.read_events():
+            title, published = None, None
+            for child in elem:
+                if not isinstance(child.tag, str):
+                    continue
+                name = etree.QName(child).localname
+                if name == "title" and title is None:
+                    title = "".join(child.itertext()).strip()
+                elif name in DATE_TAGS and published is None:
+                    published = child.text
+            if title:
+                yield title, kst_date(published, default_date)
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+
+class NewsState:
+    """KST 날짜별 헤드라인 감성 합계와 이미 반영한 헤드라인 해시."""
+
+    def __init__(self, days=None, seen=None):
+        self.days = days or {} # 'YYYYMMDD' -> {"count", "sum", "positive", "negative"}
+        self.seen = seen or {} # 해시 -> 'YYYYMMDD'
+
+    def add(self, date_str, compounds):
+        day = self.days.setdefault(date_str, {"count": 0, "sum": 0.0, "positive": 0, "negative": 0})
+        day["count"] += int(len(compounds))
+        day["sum"] += float(np.sum(compounds))
+        day["positive"] += int(np.count_nonzero(compounds >= NEUTRAL_BAND))
+        day["negative"] += int(np.count_nonzero(compounds <= -NEUTRAL_BAND))
+
+    def prune(self, today):
+        cutoff = (datetime.strptime(today, '%Y%m%d') - timedelta(days=RETENTION_DAYS)).strftime('%Y%m%d')
+        self.days = {d: v for d, v in self.days.items() if d > cutoff}
+        self.seen = {h: d for h, d in self.seen.items() if d > cutoff}
+        return cutoff
+
+    def aggregate(self, today, window=NEWS_WINDOW_DAYS):
+        """최근 window일(오늘 포함)의 (헤드라인 수, 평균 compound, 긍정 수, 부정 수)."""
+        start = (datetime.strptime(today, '%Y%m%d') - timedelta(days=window - 1)).strftime('%Y%m%d')
+        days = [v for d, v in self.days.items() if start <= d <= today]
+        count = sum(v["count"] for v in days)
+        mean = sum(v["sum"] for v in days) / count if count else None
+        return count, mean, sum(v["positive"] for v in days), sum(v["negative"] for v in days)
+
+    def to_dict(self):
+        return {"version": STATE_VERSION, "days": self.days, "seen": self.seen}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != STATE_VERSION:
+            raise ValueError("지원하지 않는 뉴스 상태 버전: %s" % data.get("version"))
+        return cls(data["days"], data["seen"])
+
+    def checkpoint(self, path=DEFAULT_STATE_PATH):
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            print(f"뉴스 상태 저장 실패: {e}")
+            return False
+
+    @classmethod
+    def restore(cls, path=DEFAULT_STATE_PATH):
+        """체크포인트가 없거나 읽을 수 없으면 빈 상태를 반환합니다."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except Exception as e:
+            print(f"뉴스 상태 읽기 실패: {e}. 빈 상태로 시작합니다.")
+            return cls()
+
+
+def ingest(sources, state, today, model=None, batch_size=NEWS_BATCH):
+    """
+    sources의 새 헤드라인을 state에 반영합니다. 피드 하나가 실패해도 나머지는 계속 처리합니다.
+    반환: {"feeds", "errors", "parsed", "duplicates", "stale", "scored"}
+    """
+    model = model or get_model()
+    cutoff = state.prune(today)
+    stats = {"feeds": 0, "errors": 0, "parsed": 0, "duplicates": 0, "stale": 0, "scored": 0}
+    batch = [] # (해시, 제목, 날짜)
+
+    def flush():
+        compounds = model.score_batch([title for _, title, _ in batch])["compound"]
+        dates = np.array([date_str for _, _, date_str in batch])
+        for date_str in np.unique(dates):
+            state.add(str(date_str), compounds[dates == date_str])
+        for digest, _, date_str in batch:
+            state.seen[digest] = date_str
+        stats["scored"] += len(batch)
+        batch.clear()
+
+    for source in sources:
+        stats["feeds"] += 1
+        pending = set()
+        try:
+            for title, date_str in parse_headlines(read_chunks(source), today):
+                stats["parsed"] += 1
+                digest = headline_hash(title)
+                if digest in state.seen or digest in pending:
+                    stats["duplicates"] += 1
+                    continue
+                if date_str <= cutoff:
+                    stats["stale"] += 1
+                    continue
+                pending.add(digest)
+                batch.append((digest, title, min(date_str, today))) # 미래 날짜(시차)는 오늘로
+                if len(batch) >= batch_size:
+                    flush()
+                    pending.clear()
+        except Exception as e:
+            stats["errors"] += 1
+            print(f"뉴스 피드 읽기 실패 ({source}): {e}")
+        if batch:
+            flush()
+    return stats
+
+
+def update_news_indicator(today, sources=None, state_path=DEFAULT_STATE_PATH):
+    """
+    피드를 수집해 상태를 갱신/저장하고 지표 6 정보를 반환합니다.
+    score는 최근 NEWS_WINDOW_DAYS일 헤드라인이 NEWS_MIN_HEADLINES개 미만이면 None입니다.
+    """
+    state = NewsState.restore(state_path)
+    stats = ingest(NEWS_FEEDS if sources is None else sources, state, today)
+    state.checkpoint(state_path)
+    count, mean, positive, negative = state.aggregate(today)
+    score = scoring.news_score(mean) if count >= NEWS_MIN_HEADLINES else None
+    return dict(stats, headlines=count, mean_compound=mean, positive=positive, negative=negative, score=score)
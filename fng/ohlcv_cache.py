@@ -0,0 +1,99 @@
+# FinanceDataReader 일봉용 영구 디스크 캐시
+# 심볼별 Parquet 파일(<cache_dir>/ohlcv/<symbol>.parquet)에 이력을 보관하고,
+# 평상시 실행에서는 마지막으로 캐시된 날짜 이후의 봉만 요청해 병합합니다.
+import os
+import time
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.environ.get("FNG_CACHE_DIR", ".cache")
+
+# 캐시 범위의 첫 거래일이 요청 시작일보다 이만큼 늦으면 (연휴 감안) 구간을 덮지 못한 것으로 보고 전체 재조회
+COVERAGE_TOLERANCE = pd.Timedelta(days=7)
+
+
+def _safe_name(symbol):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+
+
+class OhlcvCache:
+    """
+    심볼별 일봉 캐시.
+    - retain_days: 이보다 오래된 봉은 저장 시 잘라냄 (compaction)
+    - max_idle_days: 이 기간 동안 갱신되지 않은 심볼 파일은 삭제 (eviction)
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, retain_days=3650, max_idle_days=30):
+        self.dir = os.path.join(cache_dir, "ohlcv")
+        self.retain_days = retain_days
+        self.max_idle_days = max_idle_days
+        self.stats = {"hits": 0, "misses": 0, "network_calls": 0, "rows_fetched": 0, "bytes_fetched": 0}
+
+    def _path(self, symbol):
+        return os.path.join(self.dir, _safe_name(symbol) + ".parquet")
+
+    def load(self, symbol):
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"OHLCV 캐시 읽기 실패 ({symbol}): {e}. 캐시 없이 진행합니다.")
+            return None
+
+    def save(self, symbol, df):
+        cutoff = pd.Timestamp.now().normalize() - pd.Timedelta(days=self.retain_days)
+        df = df[df.index >= cutoff]
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            path = self._path(symbol)
+            tmp_path = path + ".tmp"
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, path) # 중간에 실패해도 기존 캐시 파일은 온전하게 유지
+        except Exception as e:
+            print(f"OHLCV 캐시 저장 실패 ({symbol}): {e}")
+        self.evict_idle()
+
+    def evict_idle(self):
+        if not os.path.isdir(self.dir):
+            return
+        threshold = time.time() - self.max_idle_days * 86400
+        for name in os.listdir(self.dir):
+            path = os.path.join(self.dir, name)
+            if os.path.getmtime(path) < threshold:
+                os.remove(path)
+                print(f"OHLCV 캐시 만료 삭제: {name}")
+
+    def _fetch(self, reader, symbol, start):
+        df = reader(symbol, start=start)
+        self.stats["network_calls"] += 1
+        if df is not None and not df.empty:
+            self.stats["rows_fetched"] += len(df)
+            # FinanceDataReader는 원본 응답 크기를 노출하지 않으므로 받은 DataFrame 크기로 근사
+            self.stats["bytes_fetched"] += int(df.memory_usage(index=True, deep=True).sum())
+        return df
+
+    def fetch(self, symbol, start, reader):
+        """
+        start 이후의 일봉을 반환합니다. 캐시가 구간을 덮고 있으면 마지막 캐시 날짜부터만 요청합니다.
+        마지막 봉은 장중에 저장되었을 수 있으므로 다시 받아서 덮어씁니다.
+        """
+        start = pd.Timestamp(start).normalize()
+        cached = self.load(symbol)
+
+        if cached is not None and not cached.empty and cached.index[0] <= start + COVERAGE_TOLERANCE:
+            self.stats["hits"] += 1
+            fetched = self._fetch(reader, symbol, cached.index[-1])
+        else:
+            self.stats["misses"] += 1
+            cached = None
+            fetched = self._fetch(reader, symbol, start)
+
+        frames = [f for f in (cached, fetched) if f is not None and not f.empty]
+        if not frames:
+            return fetched
+        merged = pd.concat(frames)
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self.save(symbol, merged)
+        return merged[merged.index >= start]
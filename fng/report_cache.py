@@ -0,0 +1,122 @@
+# 생성된 Gemini 리포트 캐시 (입력 데이터 + 프롬프트 파일 내용의 해시 기준)
+# 휴장일처럼 모든 수집이 같은 마지막 거래일로 돌아가 입력이 그대로면, Gemini를 다시 호출하지 않고
+# 직전에 만든 한국어(KO) / 한·영(KO/EN) HTML을 그대로 씁니다. 파일 내용이 같으면 다시 쓰지도 않아 커밋할 변경이 생기지 않습니다.
+# - 리포트(label)마다 마지막 결과 하나만 보관 (.cache/report_cache.json)
+# - REPORT_FORCE=1이면 캐시를 무시하고 새로 생성 (결과는 다시 저장)
+# - 적중/미스 횟수는 실행 중 stats와 캐시 파일의 누적 통계로 남김
+import hashlib
+import json
+import os
+import time
+
+from fng.ohlcv_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "report_cache.json")
+FORCE_ENV = "REPORT_FORCE"
+# 렌더링 결과에 영향을 주는 코드도 키에 포함 (템플릿이 바뀌면 다시 생성)
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_template.py")
+
+
+def report_key(data, prompt_paths=()):
+    """입력 데이터(dict)와 프롬프트 파일들의 내용으로 만든 sha256 키. 없는 파일은 빈 내용으로 취급합니다."""
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    for path in list(prompt_paths) + [TEMPLATE_PATH]:
+        digest.update(b"\0" + os.path.basename(path).encode("utf-8") + b"\0")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _write_if_changed(path, text):
+    """내용이 다를 때만 씁니다. 썼으면 True."""
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+
+class ReportCache:
+    """
+    label별 {key, ko, bilingual, created_at}를 보관합니다.
+    stats: hits(캐시 재사용), misses(새로 생성), restored(파일이 달라 캐시 내용으로 되돌려 쓴 횟수)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, force=None):
+        self.path = path
+        self.force = force if force is not None else os.environ.get(FORCE_ENV) == "1"
+        self.stats = {"hits": 0, "misses": 0, "restored": 0}
+        self._data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data.get("reports"), dict):
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"리포트 캐시 읽기 실패: {e}")
+        return {"reports": {}, "totals": {"hits": 0, "misses": 0}}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"리포트 캐시 저장 실패: {e}")
+
+    def _count(self, name):
+        self.stats[name] += 1
+        totals = self._data.setdefault("totals", {})
+        totals[name] = totals.get(name, 0) + 1
+
+    def reuse(self, job):
+        """
+        job.cache_key가 직전 결과와 같으면 그 KO(, KO/EN) HTML을 job의 경로에 두고 True를 반환합니다.
+        영어 버전이 필요한데 캐시에 없으면 미스로 처리합니다.
+        """
+        entry = self._data["reports"].get(job.label)
+        hit = (not self.force and entry is not None and entry.get("key") == job.cache_key
+               and (entry.get("bilingual") is not None or not job.translate_prompt))
+        if not hit:
+            self._count("misses")
+            self._save()
+            return False
+        restored = _write_if_changed(job.ko_path, entry["ko"])
+        if entry.get("bilingual") is not None:
+            restored = _write_if_changed(job.bilingual_path, entry["bilingual"]) or restored
+        self._count("hits")
+        if restored:
+            self.stats["restored"] += 1
+        self._save()
+        print("%s 리포트 입력이 그대로여서 캐시된 리포트를 사용합니다 (%s 생성, 키 %s)%s" % (
+            job.label, time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("created_at", 0))),
+            job.cache_key[:12], ", 파일 복원" if restored else ""))
+        return True
+
+    def store(self, job, ko_html, bilingual_html=None):
+        self._data["reports"][job.label] = {
+            "key": job.cache_key,
+            "ko": ko_html,
+            "bilingual": bilingual_html,
+            "created_at": time.time(),
+        }
+        self._save()
+
+    def summary(self):
+        totals = self._data.get("totals", {})
+        total = totals.get("hits", 0) + totals.get("misses", 0)
+        rate = 100.0 * totals.get("hits", 0) / total if total else 0.0
+        return "리포트 캐시: 이번 실행 적중 %d, 미스 %d (누적 적중 %d/%d, %.0f%%)" % (
+            self.stats["hits"], self.stats["misses"], totals.get("hits", 0), total, rate)
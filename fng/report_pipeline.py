@@ -0,0 +1,195 @@
+# Gemini 리포트 생성 파이프라인 (한국어 + 영어, 스트리밍)
+# - 한국어 리포트는 generate_content_stream으로 받으면서 <파일>.part에 조각 단위로 기록하고,
+#   완료되면 마크다운 기호를 정리해 최종 파일로 교체 (실패 시 기존 리포트는 그대로 유지)
+# - 영어 리포트는 한국어 결과를 기다리지 않고 같은 데이터/프롬프트로 동시에 생성 (REPORT_EN_MODE=parallel)
+#   REPORT_EN_MODE=translate이면 기존처럼 완성된 한국어 HTML을 translate_prompt로 번역
+# - 여러 리포트(KR, US)를 asyncio로 함께 실행할 수 있으며, 리포트마다 단계별 소요 시간을 출력
+# - job.cache_key가 있으면 입력이 같을 때 Gemini 호출 없이 직전 결과를 재사용 (fng.report_cache)
+# - job.render가 있으면 모델은 서술 문장 JSON만 생성하고, HTML은 render(응답, 언어)로 만듭니다 (fng.report_template)
+# - 전체 생성은 fng.telemetry의 'gemini_reports' 단계로 기록 (리포트별 timings는 단계 속성, 캐시/모델 조회 수는 카운터)
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from fng import telemetry
+from fng.report_cache import ReportCache
+
+EN_MODE = os.environ.get("REPORT_EN_MODE", "parallel")
+
+# 병렬 모드에서 한국어 리포트 프롬프트 뒤에 붙이는 영어 출력 지침 (translate_prompt.txt의 규칙과 같은 내용)
+ENGLISH_INSTRUCTION = """
+[출력 언어 (매우 중요)]
+위의 모든 지침, HTML 구조, Tailwind CSS 클래스, 수치를 그대로 따르되 화면에 보이는 모든 텍스트를 자연스러운 영어로 작성하세요.
+의미가 정확하게 전달되도록 전문적인 금융 용어를 사용하세요.
+결과물에는 마크다운 기호(```html)를 절대 포함하지 말고 순수 HTML만 출력하세요.
+"""
+
+# job.render가 있을 때(JSON 서술 문장 모드)의 영어 생성/번역 지침
+NARRATIVE_ENGLISH_INSTRUCTION = """
+[출력 언어 (매우 중요)]
+위의 JSON 형식과 키 이름은 그대로 두고, 모든 문자열 값을 자연스러운 영어로 작성하세요.
+의미가 정확하게 전달되도록 전문적인 금융 용어를 사용하고, JSON 외의 다른 내용은 출력하지 마세요.
+"""
+NARRATIVE_TRANSLATE_INSTRUCTION = """
+[JSON 번역 규칙]
+아래 JSON의 키 이름과 구조는 그대로 두고 문자열 값만 영어로 번역해, 번역된 JSON만 반환하세요.
+"""
+
+
+def clean_html(text):
+    """응답에서 마크다운 코드 블록 기호 제거."""
+    return text.replace('```html', '').replace('```', '').strip()
+
+
+def bilingual_html(ko_html, en_html):
+    # 한국어와 영어를 각각의 div로 감싸서 합치기
+    return f"""
+<div class="lang-ko">
+{ko_html}
+</div>
+<div class="lang-en">
+{en_html}
+</div>
+"""
+
+
+def _write(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class ReportJob:
+    label: str # 로그용 이름 (예: "KOSPI", "S&P 500")
+    models: Any # ModelResolver (client 포함)
+    prompt: str
+    ko_path: str # 한국어 리포트 (public/gemini_adv.html 등)
+    bilingual_path: str # 한국어/영어 리포트 (public/gemini_adv_ko_en.html 등)
+    translate_prompt: str = "" # 비어 있으면 영어 버전을 만들지 않음
+    render: Optional[Callable[[str, str], str]] = None # (모델 응답, 'ko'/'en') -> HTML
+    config: Optional[Dict[str, Any]] = None # generate_content_stream의 config (예: response_mime_type)
+    cache_key: str = "" # report_cache.report_key(입력 데이터, 프롬프트 파일), 비어 있으면 캐시하지 않음
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+async def stream_text(models, contents, part_path=None, config=None):
+    """
+    contents를 스트리밍으로 생성해 (전체 텍스트, 첫 조각까지 걸린 초)를 반환합니다.
+    part_path를 주면 받은 조각을 그 파일에 바로 이어 씁니다.
+    """
+    kwargs = {"config": config} if config is not None else {}
+
+    async def run(model):
+        started = time.perf_counter()
+        first_chunk = None
+        chunks = []
+        f = open(part_path, 'w', encoding='utf-8') if part_path else None
+        try:
+            stream = await models.client.aio.models.generate_content_stream(model=model, contents=contents, **kwargs)
+            async for chunk in stream:
+                text = chunk.text or ""
+                if not text:
+                    continue
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - started
+                chunks.append(text)
+                if f is not None:
+                    f.write(text)
+                    f.flush()
+        finally:
+            if f is not None:
+                f.close()
+        return "".join(chunks), first_chunk
+
+    return await models.call_async(run)
+
+
+async def generate_report(job, cache=None):
+    """한국어/영어 리포트를 생성해 파일로 저장하고 job.timings를 채웁니다. cache가 적중하면 생성하지 않습니다."""
+    started = time.perf_counter()
+    if cache is not None and job.cache_key and cache.reuse(job):
+        job.timings["cache_hit"] = 1.0
+        job.timings["total"] = time.perf_counter() - started
+        return job.timings
+    os.makedirs(os.path.dirname(job.ko_path) or ".", exist_ok=True)
+    en_task = None
+    if job.translate_prompt and EN_MODE == "parallel":
+        instruction = NARRATIVE_ENGLISH_INSTRUCTION if job.render else ENGLISH_INSTRUCTION
+        en_task = asyncio.ensure_future(stream_text(job.models, job.prompt + instruction, config=job.config))
+
+    part_path = job.ko_path + ".part"
+    try:
+        ko_text, first_chunk = await stream_text(job.models, job.prompt, part_path=part_path, config=job.config)
+        html_content = "\n" + (job.render(ko_text, "ko") if job.render else clean_html(ko_text))
+    except BaseException:
+        if en_task is not None:
+            en_task.cancel()
+        raise
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    _write(job.ko_path, html_content)
+    job.timings["ko_first_chunk"] = first_chunk or 0.0
+    job.timings["ko"] = time.perf_counter() - started
+    print(f"Gemini {job.label} 리포트 생성 및 저장 성공: {job.ko_path}")
+
+    bilingual = None
+    if job.translate_prompt:
+        try:
+            if en_task is not None:
+                en_text, _ = await en_task
+            else:
+                print(f"{job.label} 리포트 다국어 번역 요청 중...")
+                if job.render:
+                    en_text, _ = await stream_text(job.models, f"{job.translate_prompt}\n{NARRATIVE_TRANSLATE_INSTRUCTION}\n[번역할 JSON]\n{ko_text}",
+                                                   config=job.config)
+                else:
+                    en_text, _ = await stream_text(job.models, f"{job.translate_prompt}\n\n[번역할 HTML]\n{html_content}")
+            en_html = job.render(en_text, "en") if job.render else clean_html(en_text)
+            bilingual = bilingual_html(html_content, en_html)
+            _write(job.bilingual_path, bilingual)
+            job.timings["en"] = time.perf_counter() - started
+            print(f"다국어 {job.label} 리포트 생성 및 저장 성공: {job.bilingual_path}")
+        except Exception as e:
+            print(f"다국어 리포트 생성 중 에러 발생: {e}")
+
+    # 영어 버전까지 모두 만든 경우에만 캐시 (다음 실행에서 빠진 쪽을 다시 생성하도록)
+    if cache is not None and job.cache_key and (bilingual is not None or not job.translate_prompt):
+        cache.store(job, html_content, bilingual)
+
+    job.timings["total"] = time.perf_counter() - started
+    print("%s 리포트 소요 시간: 한국어 첫 응답 %.1f초, 한국어 완료 %.1f초, 영어 완료 %s, 전체 %.1f초 (영어: %s)" % (
+        job.label, job.timings["ko_first_chunk"], job.timings["ko"],
+        "%.1f초" % job.timings["en"] if "en" in job.timings else "-", job.timings["total"],
+        "동시 생성" if en_task is not None else "번역"))
+    return job.timings
+
+
+async def generate_reports(jobs, cache=None):
+    """여러 리포트를 동시에 생성합니다. 한 리포트의 실패가 다른 리포트를 멈추지 않습니다."""
+    started = time.perf_counter()
+    with telemetry.span("gemini_reports") as stage:
+        results = await asyncio.gather(*(generate_report(job, cache) for job in jobs), return_exceptions=True)
+        for job, result in zip(jobs, results):
+            if isinstance(result, BaseException):
+                print(f"Gemini {job.label} 리포트 생성 중 에러 발생: {result}")
+                telemetry.count("gemini_reports.errors")
+            stage.attrs[job.label] = {k: round(v, 3) for k, v in job.timings.items()}
+            telemetry.add_stats("gemini_models", getattr(job.models, "stats", {}))
+    print("리포트 %d개 전체 소요 시간: %.1f초" % (len(jobs), time.perf_counter() - started))
+    if cache is not None:
+        print(cache.summary())
+        telemetry.add_stats("report_cache", cache.stats)
+    return results
+
+
+def run_reports(jobs, cache=None):
+    """동기 코드(스크립트 main)에서 호출하는 진입점. cache_key가 있는 작업이 있으면 기본 ReportCache를 씁니다."""
+    jobs = [job for job in jobs if job is not None]
+    if cache is None and any(job.cache_key for job in jobs):
+        cache = ReportCache()
+    return asyncio.run(generate_reports(jobs, cache))
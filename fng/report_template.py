@@ -0,0 +1,192 @@
+# Gemini 리포트 HTML 템플릿 (KOSPI / S&P 500)
+# 표, 점수 표기(소수점 둘째 자리), 점수별 색상 클래스, 헤더(지수/업데이트 시간)는 여기서 고정된 마크업으로 렌더링하고,
+# 모델에는 짧은 서술 문장만 JSON으로 요청합니다 (advisor_set.txt / advisor_snp_set.txt).
+# 모델 응답은 parse_narrative로 키/개수만 확인하면 되므로 검증이 간단하고, 문장은 HTML 이스케이프해서 넣습니다.
+import html
+import json
+
+POINT_COUNT = 3 # 종합 분석 핵심 포인트 개수
+ADVICE_COUNT = 3 # 세심한 조언 개수
+
+LABELS = {
+    "ko": {
+        "kospi_title": "KOSPI {value} 장세 종합 보고서",
+        "snp_title": "S&P500 공포·탐욕 : {value} 장세 보고서",
+        "updated": "업데이트",
+        "scan": "현 시장 심리 스캔",
+        "columns": ["지표", "점수", "상태", "분석 내용"],
+        "status": "상태:",
+        "analysis": "전문적인 종합 분석",
+        "advice": "세심한 조언",
+        "ordinals": ["첫째", "둘째", "셋째"],
+        # korea_fear_greed.get_scores의 지표 순서 (indicator1 ~ indicator5, 뉴스 피드를 쓰면 indicator6)
+        "indicators": ["TDI(125일)", "RSI(14일)", "ADR", "VKOSPI", "PCR", "뉴스 심리"],
+    },
+    "en": {
+        "kospi_title": "KOSPI {value} Market Summary Report",
+        "snp_title": "S&P500 Fear & Greed: {value} Market Report",
+        "updated": "Updated",
+        "scan": "Current Market Sentiment Scan",
+        "columns": ["Indicator", "Score", "Status", "Analysis"],
+        "status": "Status:",
+        "analysis": "Professional Comprehensive Analysis",
+        "advice": "Careful Advice",
+        "ordinals": ["First", "Second", "Third"],
+        "indicators": ["TDI(125D)", "RSI(14D)", "ADR", "VKOSPI", "PCR", "News Sentiment"],
+    },
+}
+
+
+def score_color(score):
+    """점수별 색상 클래스 (20/40/60/80 미만 구간, 그 외 text-primary)."""
+    if score < 20:
+        return "text-red-400"
+    if score < 40:
+        return "text-orange-400"
+    if score < 60:
+        return "text-yellow-400"
+    if score < 80:
+        return "text-emerald-500"
+    return "text-primary"
+
+
+def format_score(score):
+    return format(float(score), ".2f")
+
+
+def format_value(value):
+    """지수 값 표시. ^KS11 조회 실패 등으로 값이 없으면 '-'."""
+    return "-" if value is None else format_score(value)
+
+
+def format_updated(now, lang):
+    """업데이트 시간: '2026. 08. 22. 오전 11:19' / '2026. 08. 22. 11:19 AM'."""
+    if lang == "ko":
+        return now.strftime("%Y. %m. %d. %p %I:%M").replace("AM", "오전").replace("PM", "오후")
+    return now.strftime("%Y. %m. %d. %I:%M %p")
+
+
+def _text(value):
+    return html.escape(str(value).strip(), quote=False) # 텍스트 노드에만 넣으므로 따옴표는 그대로
+
+
+def parse_narrative(text, indicators=0):
+    """
+    모델 응답(JSON 문자열)을 dict로 읽고 필요한 키와 항목 개수를 확인합니다.
+    indicators: 지표별 상태/분석 항목 수 (S&P 500 리포트는 0). 형식이 맞지 않으면 ValueError.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("리포트 응답에서 JSON을 찾을 수 없습니다.")
+    narrative = json.loads(text[start:end + 1])
+
+    def require(obj, key, where):
+        value = obj.get(key) if isinstance(obj, dict) else None
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"리포트 응답에 '{where}{key}' 문장이 없습니다.")
+
+    for key in ("summary", "analysis_title", "overview", "advice_title", "closing"):
+        require(narrative, key, "")
+    for key, count, fields in (("indicators", indicators, ("status", "analysis")),
+                               ("points", POINT_COUNT, ("title", "text")),
+                               ("advice", ADVICE_COUNT, ("title", "text"))):
+        if not count:
+            continue
+        items = narrative.get(key)
+        if not isinstance(items, list) or len(items) != count:
+            raise ValueError(f"리포트 응답의 '{key}' 항목은 {count}개여야 합니다.")
+        for i, item in enumerate(items):
+            for field in fields:
+                require(item, field, f"{key}[{i}].")
+    return narrative
+
+
+def _header(title, summary, now, lang):
+    labels = LABELS[lang]
+    return f"""<div class="px-2 py-8 md:px-8 bg-slate-900 text-white">
+    <h1 class="text-2xl md:text-3xl text-white font-bold mb-4">{title}</h1>
+    <p class="text-slate-300 leading-relaxed text-lg">
+        {_text(summary)}<br/>
+        <span class="text-xs text-white/70 mt-2">{labels["updated"]}: {format_updated(now, lang)}</span>
+    </p>
+</div>
+<div class="px-0 py-8 space-y-12 md:px-4">
+"""
+
+
+def _scan_section(names, scores, items, lang):
+    labels = LABELS[lang]
+    columns = "".join(f"""
+                    <th class="p-4 font-bold">{column}</th>""" for column in labels["columns"])
+    rows = []
+    for name, score, item in zip(names, scores, items):
+        color, value = score_color(score), format_score(score)
+        rows.append(f"""
+                <tr class="flex flex-col md:table-row px-2 py-5 md:p-0 border-b md:border-none">
+                    <td class="md:table-cell p-0 md:p-5 font-bold text-slate-800 dark:text-white flex justify-between items-center">
+                        <span class="dark:text-white break-keep">{_text(name)}</span>
+                        <span class="md:hidden {color} font-bold">{value}</span></td>
+                    <td class="hidden md:table-cell p-5 {color} font-bold text-center">{value}</td>
+                    <td class="md:table-cell p-0 py-1 md:p-2  break-keep font-semibold {color}">
+                         <span class="md:hidden text-xs text-slate-400 mr-2">{labels["status"]}</span>{_text(item["status"])}</td>
+                    <td class="md:table-cell p-0 pt-2 md:p-5 text-slate-600 leading-relaxed text-sm dark:text-white border-t border-slate-100 md:border-none mt-2 md:mt-0">{_text(item["analysis"])}</td>
+                </tr>""")
+    return f"""<section>
+    <h2 class="text-xl font-bold mb-6 text-slate-900 border-l-4 border-slate-900 pl-4 dark:text-white">{labels["scan"]}</h2>
+    <div class="overflow-x-auto">
+        <table class="w-full text-left border-collapse border-t border-slate-200">
+             <thead class="hidden md:table-header-group">
+                <tr class="bg-slate-50 text-slate-600 text-sm border-b border-slate-200">{columns}
+                </tr>
+            </thead>
+
+            <tbody class="divide-y divide-slate-100">{"".join(rows)}
+            </tbody>
+        </table>
+    </div>
+</section>
+"""
+
+
+def _narrative_sections(narrative, lang):
+    labels = LABELS[lang]
+    points = "".join(f"""
+            <li class="pl-4 border-l-2 border-slate-300"><strong>{_text(point["title"])}:</strong> {_text(point["text"])}</li>"""
+                     for point in narrative["points"])
+    advice = "".join(f"""
+        <div>
+            <h4 class="text-white font-bold mb-2">{ordinal}, {_text(item["title"])}</h4>
+            <p class="text-white">{_text(item["text"])}</p>
+        </div>""" for ordinal, item in zip(labels["ordinals"], narrative["advice"]))
+    return f"""<section class="space-y-6">
+    <h2 class="text-xl font-bold text-slate-900 border-l-4 border-slate-900 pl-4 dark:text-white">{labels["analysis"]}: {_text(narrative["analysis_title"])}</h2>
+    <div class="bg-slate-50 px-2 py-6 md:px-6 rounded-lg space-y-4 text-slate-700">
+        <p>{_text(narrative["overview"])}</p>
+        <ul class="list-none space-y-4">{points}
+        </ul>
+    </div>
+</section>
+<section class="bg-slate-900 text-white px-2 py-8 md:px-8 rounded-xl shadow-inner">
+    <h2 class="text-xl font-bold mb-6 border-b border-slate-700 pb-2">{labels["advice"]}: {_text(narrative["advice_title"])}</h2>
+    <div class="grid md:grid-cols-3 gap-6 text-sm text-slate-300">{advice}
+    </div>
+</section>
+<div class="text-center py-6 border-t border-slate-100">
+    <p class="text-lg font-bold text-slate-800 italic dark:text-white">"{_text(narrative["closing"])}"</p>
+</div>
+</div>"""
+
+
+def render_kospi_report(data, narrative, now, lang="ko"):
+    """build_index_snapshot() 결과(data)와 서술 문장으로 KOSPI 리포트 HTML을 만듭니다."""
+    title = LABELS[lang]["kospi_title"].format(value=format_value(data.get("kospi_value")))
+    return (_header(title, narrative["summary"], now, lang)
+            + _scan_section(LABELS[lang]["indicators"], data["indicator_scores"], narrative["indicators"], lang)
+            + _narrative_sections(narrative, lang))
+
+
+def render_snp_report(data, narrative, now, lang="ko"):
+    """update_fng()의 report_data와 서술 문장으로 S&P 500 리포트 HTML을 만듭니다."""
+    sp500 = data.get("sp500") if isinstance(data.get("sp500"), dict) else {}
+    title = LABELS[lang]["snp_title"].format(value=sp500.get("value", "N/A"))
+    return _header(title, narrative["summary"], now, lang) + "\n" + _narrative_sections(narrative, lang)
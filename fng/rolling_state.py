@@ -0,0 +1,247 @@
+# 지표 1~3의 증분 rolling 상태 (125일 이평선, 14일 RSI, 20일 ADR)
+# 매 실행마다 전체 이력에 rolling()을 다시 적용하지 않고, 누적 합과 고정 길이 버퍼(ring buffer)를
+# 보관해 거래일 하나가 추가될 때 O(1)로 갱신합니다. 상태는 JSON으로 체크포인트/복원합니다.
+#
+# 마감된 봉만 상태에 반영하고, 장중 미확정 봉(당일)은 pending_close로 넘겨 상태를 바꾸지 않고 계산합니다.
+import json
+import math
+import os
+from collections import deque
+from datetime import datetime, timedelta
+
+from fng import scoring
+from fng.ohlcv_cache import DEFAULT_CACHE_DIR
+
+STATE_VERSION = 1
+DEFAULT_STATE_PATH = os.path.join(DEFAULT_CACHE_DIR, "indicator_state.json")
+
+# 종가가 이보다 크게 다르면 과거 봉이 수정된 것으로 보고 이력으로 상태를 다시 만듦
+REVISION_TOLERANCE = 1e-6
+
+
+class RollingSum:
+    """
+    최근 size개 값과 그 합. push()는 O(1)이며, 부동소수점 오차가 쌓이지 않도록
+    size * RESYNC_FACTOR번마다 버퍼 전체로 합을 다시 구합니다 (분할 상환 O(1)).
+    """
+
+    RESYNC_FACTOR = 8
+
+    def __init__(self, size, values=()):
+        self.size = size
+        self.buffer = deque(values, maxlen=size)
+        self.total = math.fsum(self.buffer)
+        self._pushes = 0
+
+    def __len__(self):
+        return len(self.buffer)
+
+    @property
+    def full(self):
+        return len(self.buffer) == self.size
+
+    def push(self, value):
+        if self.full:
+            self.total -= self.buffer[0]
+        self.buffer.append(value)
+        self.total += value
+        self._pushes += 1
+        if self._pushes % (self.size * self.RESYNC_FACTOR) == 0:
+            self.total = math.fsum(self.buffer)
+
+    def preview(self, value):
+        """value를 push했을 때의 (합, 개수). 상태는 바꾸지 않습니다."""
+        if self.full:
+            return self.total - self.buffer[0] + value, self.size
+        return self.total + value, len(self.buffer) + 1
+
+
+def _rsi_from_sums(gain_total, loss_total):
+    # rs = gain / loss (같은 기간 평균이므로 합의 비율과 같음). pandas와 같이 loss가 0이면 100, 둘 다 0이면 NaN
+    if loss_total == 0:
+        return float("nan") if gain_total == 0 else 100.0
+    return 100 - (100 / (1 + gain_total / loss_total))
+
+
+class IndicatorState:
+    """
+    ^KS11 종가 기반 지표 1, 2와 KRX 상승/하락 종목 수 기반 지표 3의 증분 상태.
+    push_close/push_breadth는 이미 반영한 날짜 이하를 무시하므로 같은 이력을 여러 번 넘겨도 안전합니다.
+    지표 3의 창은 krx_daily_store의 일별 집계로 매 실행 sync_breadth로 다시 만듭니다.
+    """
+
+    def __init__(self):
+        self.closes = RollingSum(scoring.MA_WINDOW)
+        self.gains = RollingSum(scoring.RSI_PERIOD)
+        self.losses = RollingSum(scoring.RSI_PERIOD)
+        self.last_date = None # 마지막으로 반영한 종가의 거래일 ('%Y%m%d')
+        self.last_close = None
+        # 유효한(하락 종목 > 0) 최근 20거래일: 날짜, 상승 합, 하락 합
+        self.breadth_days = deque(maxlen=scoring.ADR_DAYS)
+        self.adv = RollingSum(scoring.ADR_DAYS)
+        self.dec = RollingSum(scoring.ADR_DAYS)
+        self.breadth_last_date = None # 마지막으로 반영한 유효 거래일
+
+    # --- 지표 1, 2: 종가 ---
+
+    def push_close(self, date_str, close):
+        if self.last_date is not None and date_str <= self.last_date:
+            return False
+        close = float(close)
+        if self.last_close is None:
+            # pandas의 delta.where(delta > 0, 0)은 첫 봉(delta NaN)을 0으로 채우므로 같게 맞춤
+            gain = loss = 0.0
+        else:
+            delta = close - self.last_close
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self.gains.push(gain)
+        self.losses.push(loss)
+        self.closes.push(close)
+        self.last_date, self.last_close = date_str, close
+        return True
+
+    def sync_closes(self, close_series, until):
+        """
+        close_series(인덱스: 거래일) 중 until('%Y%m%d') 이전의 마감된 봉을 반영하고 반영한 봉 수를 반환합니다.
+        상태가 이력보다 오래되어 중간 봉이 빠졌거나 마지막 종가가 수정되었으면 이력으로 다시 만듭니다.
+        """
+        dates = close_series.index.strftime('%Y%m%d')
+        if self.last_date is not None:
+            if self.last_date < dates[0]:
+                print("지표 상태가 이력보다 오래되어 다시 계산합니다 (%s < %s)." % (self.last_date, dates[0]))
+                self._reset_closes()
+            elif self.last_date in dates:
+                stored = float(close_series.iloc[dates.get_loc(self.last_date)])
+                if abs(stored - self.last_close) > REVISION_TOLERANCE * abs(stored):
+                    print("지표 상태의 %s 종가가 이력과 달라 다시 계산합니다 (%.2f != %.2f)." % (self.last_date, self.last_close, stored))
+                    self._reset_closes()
+        pushed = 0
+        for date_str, close in zip(dates, close_series.values):
+            if date_str < until and self.push_close(date_str, close):
+                pushed += 1
+        return pushed
+
+    def _reset_closes(self):
+        self.closes = RollingSum(scoring.MA_WINDOW)
+        self.gains = RollingSum(scoring.RSI_PERIOD)
+        self.losses = RollingSum(scoring.RSI_PERIOD)
+        self.last_date = self.last_close = None
+
+    def ma(self, pending_close=None):
+        """125일 이동평균. pending_close(미확정 당일 종가)를 주면 그 봉까지 포함. 데이터가 부족하면 None."""
+        if pending_close is None:
+            total, count = self.closes.total, len(self.closes)
+        else:
+            total, count = self.closes.preview(float(pending_close))
+        return total / count if count == self.closes.size else None
+
+    def rsi(self, pending_close=None):
+        """14일 RSI (scoring.rsi와 같은 단순 평균 방식). 데이터가 부족하면 None."""
+        if pending_close is None:
+            (gain_total, count), loss_total = (self.gains.total, len(self.gains)), self.losses.total
+        else:
+            if self.last_close is None:
+                gain = loss = 0.0
+            else:
+                delta = float(pending_close) - self.last_close
+                gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            gain_total, count = self.gains.preview(gain)
+            loss_total, _ = self.losses.preview(loss)
+        return _rsi_from_sums(gain_total, loss_total) if count == self.gains.size else None
+
+    # --- 지표 3: 상승/하락 종목 수 ---
+
+    def push_breadth(self, date_str, adv, dec):
+        """
+        거래일의 상승/하락 종목 수를 창 끝에 반영합니다. 하락 종목이 없거나 값이 없는 날, 이미 반영한 날짜 이하는
+        반영하지 않습니다. 조회에 실패했던 과거 거래일이 나중에 채워지면 창 중간에 들어가야 하므로,
+        get_scores는 이 메서드 대신 sync_breadth로 매 실행 창을 다시 만듭니다.
+        """
+        if self.breadth_last_date is not None and date_str <= self.breadth_last_date:
+            return False
+        if adv is None or dec is None or dec <= 0:
+            return False
+        self.breadth_last_date = date_str
+        self.breadth_days.append(date_str)
+        self.adv.push(float(adv))
+        self.dec.push(float(dec))
+        return True
+
+    def sync_breadth(self, days):
+        """
+        (날짜, 상승, 하락) 목록(오래된 날짜부터)으로 20거래일 창을 다시 만들고 반영한 날 수를 반환합니다.
+        최대 20일이라 다시 만드는 비용은 무시할 수 있습니다.
+        """
+        self.breadth_days = deque(maxlen=scoring.ADR_DAYS)
+        self.adv = RollingSum(scoring.ADR_DAYS)
+        self.dec = RollingSum(scoring.ADR_DAYS)
+        self.breadth_last_date = None
+        return sum(1 for date_str, adv, dec in days if self.push_breadth(date_str, adv, dec))
+
+    def adr_ratio(self, as_of):
+        """
+        as_of('%Y%m%d') 기준 ADR 원시값. 유효 20거래일이 as_of 이전 ADR_CANDIDATE_DAYS 달력일 안에
+        (as_of와의 차이가 ADR_CANDIDATE_DAYS일 미만) 모두 있어야 하며, 아니면 None
+        (get_scores의 후보 구간, backfill._adr과 같은 조건).
+        """
+        if not self.adv.full or self.dec.total <= 0:
+            return None
+        oldest = datetime.strptime(self.breadth_days[0], '%Y%m%d')
+        if datetime.strptime(as_of, '%Y%m%d') - oldest >= timedelta(days=scoring.ADR_CANDIDATE_DAYS):
+            return None
+        return scoring.adr_ratio(self.adv.total, self.dec.total)
+
+    # --- 체크포인트 ---
+
+    def to_dict(self):
+        return {
+            "version": STATE_VERSION,
+            "last_date": self.last_date,
+            "last_close": self.last_close,
+            "closes": list(self.closes.buffer),
+            "gains": list(self.gains.buffer),
+            "losses": list(self.losses.buffer),
+            "breadth_last_date": self.breadth_last_date,
+            "breadth": [[d, a, b] for d, a, b in zip(self.breadth_days, self.adv.buffer, self.dec.buffer)],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != STATE_VERSION:
+            raise ValueError("지원하지 않는 지표 상태 버전: %s" % data.get("version"))
+        state = cls()
+        state.last_date = data["last_date"]
+        state.last_close = data["last_close"]
+        state.closes = RollingSum(scoring.MA_WINDOW, data["closes"])
+        state.gains = RollingSum(scoring.RSI_PERIOD, data["gains"])
+        state.losses = RollingSum(scoring.RSI_PERIOD, data["losses"])
+        state.breadth_last_date = data["breadth_last_date"]
+        breadth = data["breadth"]
+        state.breadth_days = deque((d for d, _, _ in breadth), maxlen=scoring.ADR_DAYS)
+        state.adv = RollingSum(scoring.ADR_DAYS, [a for _, a, _ in breadth])
+        state.dec = RollingSum(scoring.ADR_DAYS, [b for _, _, b in breadth])
+        return state
+
+    def checkpoint(self, path=DEFAULT_STATE_PATH):
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path) # 중간에 실패해도 기존 체크포인트는 온전하게 유지
+            return True
+        except Exception as e:
+            print(f"지표 상태 저장 실패: {e}")
+            return False
+
+    @classmethod
+    def restore(cls, path=DEFAULT_STATE_PATH):
+        """체크포인트가 없거나 읽을 수 없으면 빈 상태를 반환합니다."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path) as f:
+                return cls.from_dict(json.load(f))
+        except Exception as e:
+            print(f"지표 상태 읽기 실패: {e}. 이력으로 다시 계산합니다.")
+            return cls()
@@ -0,0 +1,85 @@
+# 공포/탐욕 지표 점수 환산식
+# get_scores(당일 계산)와 fng.backfill(과거 구간 일괄 계산)이 같은 식을 쓰도록 한곳에 모았습니다.
+# 모든 함수는 스칼라와 pandas Series/numpy 배열을 모두 받습니다.
+import os
+
+import numpy as np
+
+DEFAULT_SCORE = 50 # 지표를 계산하지 못했을 때 사용하는 중립 점수
+
+# 가중치: 지표 1: 25%, 지표 2,3,4: 20%, 지표 5: 15%
+WEIGHTS = (0.25, 0.20, 0.20, 0.20, 0.15)
+# 지표 6 (뉴스 헤드라인 심리)이 있을 때: 뉴스에 NEWS_WEIGHT를 주고 기존 5개는 비율을 유지한 채 줄임
+NEWS_WEIGHT = float(os.environ.get("NEWS_WEIGHT", "0.10"))
+WEIGHTS_WITH_NEWS = tuple(w * (1 - NEWS_WEIGHT) for w in WEIGHTS) + (NEWS_WEIGHT,)
+NEWS_COMPOUND_RANGE = 0.5 # 헤드라인 평균 compound -0.5(0점) ~ +0.5(100점)
+
+MA_WINDOW = 125 # 지표 1 이동평균 (거래일)
+RSI_PERIOD = 14 # 지표 2
+ADR_DAYS = 20 # 지표 3 합산 일수 (유효 거래일)
+ADR_CANDIDATE_DAYS = 45 # 지표 3 유효 20일을 찾는 후보 구간 (달력일)
+VKOSPI_WINDOW = 20 # 지표 4 min/max 스케일링 윈도우 (거래일)
+VKOSPI_MIN_WINDOW = 10 # 이보다 적게 모이면 고정 범위(10~40) 스케일링 사용
+
+
+def _clip(value):
+    return np.clip(value, 0, 100)
+
+
+def ma_gap_score(close, ma):
+    """지표 1: 종가/이동평균 0.9~1.1을 0~100으로."""
+    return _clip((close / ma - 0.9) / 0.2 * 100)
+
+
+def rsi(close, period=RSI_PERIOD):
+    """지표 2: 단순 이동평균 방식 RSI 시계열 (close는 Series)."""
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def adr_ratio(total_adv, total_dec):
+    """지표 3 원시값: 합산 상승 종목 수 / 합산 하락 종목 수 * 100."""
+    return total_adv / total_dec * 100
+
+
+def adr_score(raw):
+    """지표 3: ADR 70~120을 0~100으로."""
+    return _clip((raw - 70) / (120 - 70) * 100)
+
+
+def vkospi_band_score(vix):
+    """지표 4 (윈도우 부족 시): VKOSPI의 일반적인 범위 10(100점)~40(0점)으로 선형 스케일링."""
+    return _clip(100 - (vix - 10) / (40 - 10) * 100)
+
+
+def vkospi_window_score(vix, window_min, window_max):
+    """지표 4: 윈도우 최저(안정)면 100점, 최고(불안)면 0점."""
+    return (window_max - vix) / (window_max - window_min) * 100
+
+
+def put_call_ratio(put_volume, call_volume):
+    """지표 5 원시값 (%). 거래량이 모두 0이면 None, 콜 거래량만 0이면 200 (극심한 공포)."""
+    if put_volume == 0 and call_volume == 0:
+        return None
+    if call_volume == 0:
+        return 200
+    return (put_volume / call_volume) * 100
+
+
+def put_call_score(ratio):
+    """지표 5: PCR 60(탐욕)~180(공포)을 100~0으로 (낮을수록 점수 높음)."""
+    return _clip(100 - (ratio - 60) / (180 - 60) * 100)
+
+
+def news_score(mean_compound):
+    """지표 6: 헤드라인 감성 평균(compound, -1~1)을 -0.5~+0.5 범위로 0~100에 매핑."""
+    return _clip(50 + mean_compound / NEWS_COMPOUND_RANGE * 50)
+
+
+def weighted_score(scores):
+    """지표 점수 5개(리스트 또는 열 5개)의 가중 합. 6개면 뉴스 심리를 포함한 WEIGHTS_WITH_NEWS 사용."""
+    weights = WEIGHTS_WITH_NEWS if len(scores) == len(WEIGHTS_WITH_NEWS) else WEIGHTS
+    return sum(w * s for w, s in zip(weights, scores))
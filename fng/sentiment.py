@@ -0,0 +1,212 @@
+# 한국어/영어 금융 뉴스 감성 점수 (사전 + 구문 n-gram, CPU 전용)
+# - 단어/구문 사전을 프로세스당 한 번 조회용 dict로 만들어 두고, 배치 단위로 매칭 -> np.bincount로 문서별 합산
+# - 긴 구문이 먼저 매칭되므로 '금리 인하'(+), '우려 완화'(+)처럼 구문 가중치가 단어 가중치보다 우선
+# - 부정 표현: 영어는 앞 3단어 안의 not/no/never/n't, 한국어는 뒤따르는 '~지 않/못' 이면 극성을 반대로(0.8배)
+# - compound = tanh(합계 / 2) (-1 ~ 1), score = (compound + 1) / 2 (0 ~ 1, 0.5가 중립)
+# SENTIMENT_LEXICON에 'term<TAB>weight' 형식 파일을 주면 기본 사전에 더하거나 덮어씁니다.
+import os
+import re
+import threading
+
+import numpy as np
+
+LEXICON_ENV = "SENTIMENT_LEXICON"
+NEUTRAL_BAND = 0.1 # |compound|가 이보다 작으면 neutral
+NEGATION_FACTOR = -0.8
+
+KO_LEXICON = {
+    # 긍정
+    "상승": 1.0, "상승세": 1.2, "오름세": 1.0, "급등": 2.0, "반등": 1.2, "급반등": 2.0, "강세": 1.2, "호재": 1.5,
+    "호조": 1.2, "호황": 1.5, "훈풍": 1.5, "랠리": 1.5, "최고치": 1.5, "사상 최고": 2.0, "신고가": 1.8, "돌파": 0.8,
+    "회복": 1.0, "개선": 1.0, "실적 개선": 1.5, "성장": 0.8, "흑자": 1.2, "흑자 전환": 1.8, "최대 실적": 1.8,
+    "어닝 서프라이즈": 2.0, "순매수": 1.0, "매수세": 0.8, "낙관": 1.2, "기대감": 0.8, "상향": 1.0, "목표가 상향": 1.5,
+    "금리 인하": 1.2, "수혜": 1.0, "안정": 0.6, "완화": 0.6, "우려 완화": 1.2, "불안 해소": 1.2, "리스크 해소": 1.2,
+    "증가": 0.5, "확대": 0.5, "플러스": 0.6, "외국인 순매수": 1.5,
+    # 부정
+    "하락": -1.0, "하락세": -1.2, "내림세": -1.0, "급락": -2.0, "폭락": -2.5, "반락": -1.0, "약세": -1.2, "악재": -1.5,
+    "부진": -1.2, "우려": -1.0, "공포": -1.5, "패닉": -2.0, "투매": -2.0, "침체": -1.5, "경기 침체": -1.8, "위기": -1.5,
+    "적자": -1.2, "적자 전환": -1.8, "어닝 쇼크": -2.0, "쇼크": -1.5, "충격": -1.2, "순매도": -1.0, "매도세": -0.8,
+    "외국인 순매도": -1.5, "비관": -1.2, "불안": -1.0, "하향": -1.0, "목표가 하향": -1.5, "금리 인상": -1.0, "긴축": -0.8,
+    "손실": -1.2, "감소": -0.5, "급감": -1.5, "축소": -0.5, "둔화": -0.8, "리스크": -0.6, "변동성": -0.5, "경고": -1.0,
+    "부도": -2.0, "파산": -2.5, "디폴트": -2.0, "관세": -0.6, "전쟁": -1.2, "제재": -0.8, "최저치": -1.5,
+    "신저가": -1.8, "마이너스": -0.6, "조정": -0.5,
+}
+
+EN_LEXICON = {
+    # 긍정
+    "gain": 1.0, "rise": 1.0, "rally": 1.5, "surge": 2.0, "soar": 2.0, "jump": 1.5, "climb": 1.0, "rebound": 1.2,
+    "recover": 1.0, "recovery": 1.0, "beat": 1.2, "beat expectations": 2.0, "strong": 1.0, "bullish": 1.5,
+    "upgrade": 1.2, "record high": 2.0, "all-time high": 2.0, "optimism": 1.2, "optimistic": 1.2, "boom": 1.5,
+    "growth": 0.8, "profit": 0.8, "outperform": 1.2, "rate cut": 1.2, "easing": 0.6, "bull market": 1.5,
+    "upbeat": 1.2, "robust": 1.0, "positive": 0.8, "good": 0.8, "great": 1.0, "happy": 0.8,
+    # 부정
+    "fall": -1.0, "drop": -1.0, "decline": -1.0, "slump": -1.8, "plunge": -2.0, "tumble": -1.8, "crash": -2.5,
+    "sink": -1.5, "slide": -1.2, "loss": -1.2, "weak": -1.0, "bearish": -1.5, "downgrade": -1.2, "miss": -1.0,
+    "miss expectations": -2.0, "record low": -1.5, "fear": -1.5, "worry": -1.0, "concern": -0.8,
+    "recession": -1.8, "crisis": -1.8, "default": -1.8, "bankruptcy": -2.5, "sell-off": -1.8, "selloff": -1.8,
+    "rate hike": -1.0, "inflation": -0.6, "volatility": -0.5, "bear market": -1.5, "pessimism": -1.2,
+    "warning": -1.0, "profit warning": -2.0, "layoff": -1.2, "job cuts": -1.2, "tariff": -0.6, "war": -1.2,
+    "sanction": -0.8, "panic": -2.0, "bad": -0.8, "sad": -0.8, "risk": -0.5, "uncertainty": -0.8,
+    "underperform": -1.2,
+}
+
+EN_NEGATORS = {"not", "no", "never", "without", "hardly", "nor"}
+# 한국어는 띄어쓰기를 지운 문자열에서 매칭하므로 '상승하지 않았다' -> '상승' 뒤 '하지않'
+KO_NEGATION = re.compile(r"[가-힣]{0,3}?지는?(?:않|못)")
+_EN_TOKEN = re.compile(r"[a-z][a-z'\-]*")
+_HANGUL_RUN = re.compile(r"[가-힣]+")
+_HANGUL = re.compile(r"[가-힣]")
+EN_MAX_WORDS = 3
+
+
+def _english_forms(term):
+    """영어 단어의 활용형 (gain -> gains, gained, gaining / rally -> rallies, rallied)."""
+    head, _, last = term.rpartition(" ")
+    prefix = head + " " if head else ""
+    forms = {last, last + "s", last + "es", last + "ed", last + "ing"}
+    if last.endswith("e"):
+        forms |= {last + "d", last[:-1] + "ing"}
+    if last.endswith("y"):
+        forms |= {last[:-1] + "ies", last[:-1] + "ied"}
+    if re.search(r"[^aeiou][aeiou][bdgmpt]$", last): # drop -> dropped, slip -> slipping
+        forms |= {last + last[-1] + "ed", last + last[-1] + "ing"}
+    return {prefix + form for form in forms}
+
+
+def load_lexicon_file(path):
+    """'term<TAB>weight' 줄로 된 사전 파일을 dict로 읽습니다 (#으로 시작하는 줄은 무시)."""
+    lexicon = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            term, weight = line.rsplit("\t", 1)
+            lexicon[term.strip().lower()] = float(weight)
+    return lexicon
+
+
+class SentimentModel:
+    """
+    사전 기반 감성 모델. 매칭은 dict 조회만 하므로 사전 크기와 무관하게 빠르고, 상태가 없어 스레드 간 공유해도 안전합니다.
+    - 영어: 단어 토큰의 3/2/1-gram 순으로 조회 (긴 구문 우선)
+    - 한국어: 띄어쓰기를 지운 한글 문자열에서 위치마다 가장 긴 표현을 조회 ('외인순매수', '금리 인하' 모두 매칭)
+    """
+
+    def __init__(self, ko_lexicon=KO_LEXICON, en_lexicon=EN_LEXICON, extra=None):
+        weights = []
+        self.ko, self.en = {}, {}
+
+        def add(table, key, weight, override):
+            if key in table:
+                if override:
+                    weights[table[key]] = weight
+                return
+            table[key] = len(weights)
+            weights.append(weight)
+
+        for term, weight in ko_lexicon.items():
+            add(self.ko, term.replace(" ", ""), weight, True)
+        for term, weight in en_lexicon.items():
+            for form in _english_forms(term):
+                add(self.en, form, weight, False)
+        for term, weight in (extra or {}).items():
+            if _HANGUL.search(term):
+                add(self.ko, term.replace(" ", ""), weight, True)
+            else:
+                add(self.en, " ".join(_EN_TOKEN.findall(term)), weight, True)
+        self.weights = np.array(weights, dtype=np.float64)
+        self.ko_max = max(map(len, self.ko), default=1)
+
+    @property
+    def size(self):
+        return len(self.ko) + len(self.en)
+
+    @classmethod
+    def load(cls, path=None):
+        path = path if path is not None else os.environ.get(LEXICON_ENV)
+        extra = load_lexicon_file(path) if path else None
+        model = cls(extra=extra)
+        print("감성 사전 로드: %d개 표현%s" % (model.size, f" (+{path})" if path else ""))
+        return model
+
+    def _matches(self, text):
+        """(사전 인덱스, 부호) 목록. 부정 표현이 걸리면 부호가 NEGATION_FACTOR."""
+        lowered = text.lower()
+        words = _EN_TOKEN.findall(lowered)
+        i = 0
+        while i < len(words):
+            for n in range(min(EN_MAX_WORDS, len(words) - i), 0, -1):
+                idx = self.en.get(" ".join(words[i:i + n]) if n > 1 else words[i])
+                if idx is not None:
+                    negated = any(w in EN_NEGATORS or w.endswith("n't") for w in words[max(0, i - 3):i])
+                    yield idx, NEGATION_FACTOR if negated else 1.0
+                    i += n
+                    break
+            else:
+                i += 1
+
+        hangul = "".join(_HANGUL_RUN.findall(lowered))
+        pos, end = 0, len(hangul)
+        while pos < end:
+            for n in range(min(self.ko_max, end - pos), 1, -1):
+                idx = self.ko.get(hangul[pos:pos + n])
+                if idx is not None:
+                    negated = KO_NEGATION.match(hangul, pos + n) is not None
+                    yield idx, NEGATION_FACTOR if negated else 1.0
+                    pos += n
+                    break
+            else:
+                pos += 1
+
+    def score_batch(self, texts):
+        """
+        texts(문자열 목록)의 감성을 한 번에 계산합니다. 사전 매칭은 문장마다 파이썬 dict 조회로 하고,
+        매칭 결과를 모은 뒤 문서별 합산과 점수 변환만 numpy 배열 연산(np.bincount, np.tanh)으로 합니다.
+        반환: compound(-1~1), score(0~1), matches(매칭된 표현 수) numpy 배열
+        """
+        docs, term_ids, signs = [], [], []
+        for doc, text in enumerate(texts):
+            for i, sign in self._matches(text):
+                docs.append(doc)
+                term_ids.append(i)
+                signs.append(sign)
+        n = len(texts)
+        docs = np.asarray(docs, dtype=np.int64)
+        contributions = self.weights[np.asarray(term_ids, dtype=np.int64)] * np.asarray(signs, dtype=np.float64)
+        raw = np.bincount(docs, weights=contributions, minlength=n)
+        matches = np.bincount(docs, minlength=n)
+        compound = np.tanh(raw / 2.0)
+        return {"compound": compound, "score": (compound + 1.0) / 2.0, "matches": matches}
+
+    def analyze(self, texts):
+        """score_batch 결과를 /analyze 응답 형식의 dict 목록으로 만듭니다."""
+        result = self.score_batch(texts)
+        labels = np.where(result["compound"] >= NEUTRAL_BAND, "positive",
+                          np.where(result["compound"] <= -NEUTRAL_BAND, "negative", "neutral"))
+        return [
+            {
+                "text": text,
+                "sentiment": str(label),
+                "score": round(float(score), 4),
+                "compound": round(float(compound), 4),
+                "language": "ko" if _HANGUL.search(text) else "en",
+                "matches": int(matches),
+            }
+            for text, label, score, compound, matches in zip(
+                texts, labels, result["score"], result["compound"], result["matches"])
+        ]
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """프로세스 공용 SentimentModel (처음 호출할 때 한 번 로드)."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = SentimentModel.load()
+    return _model
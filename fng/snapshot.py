@@ -0,0 +1,62 @@
+# 최신 지수 스냅샷을 메모리에 보관하고 백그라운드에서 주기적으로 갱신
+# JSON 본문, ETag, Last-Modified를 갱신 시점에 한 번만 만들어 두므로 요청 처리는 참조 복사뿐입니다.
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate
+
+
+class Snapshot:
+    __slots__ = ("data", "body", "etag", "last_modified", "last_modified_http")
+
+    def __init__(self, data, updated_at=None):
+        self.data = data
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"%s"' % hashlib.sha1(self.body).hexdigest()
+        # HTTP 날짜는 초 단위이므로 비교가 일관되도록 초 단위로 내림
+        self.last_modified = int(updated_at if updated_at is not None else time.time())
+        self.last_modified_http = formatdate(self.last_modified, usegmt=True)
+
+
+class SnapshotStore:
+    """최신 Snapshot 하나를 보관. 내용이 같으면 교체하지 않아 ETag/Last-Modified가 유지됩니다."""
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        return self._snapshot
+
+    def update(self, data):
+        snapshot = Snapshot(data)
+        with self._lock:
+            if self._snapshot is not None and self._snapshot.etag == snapshot.etag:
+                return False
+            self._snapshot = snapshot
+        return True
+
+
+class SnapshotRefresher(threading.Thread):
+    """interval초마다 compute()를 호출해 store를 갱신하는 데몬 스레드. 시작하자마자 한 번 계산합니다."""
+
+    def __init__(self, store, compute, interval, name="snapshot-refresher"):
+        super().__init__(name=name, daemon=True)
+        self.store = store
+        self.compute = compute
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.perf_counter()
+            try:
+                changed = self.store.update(self.compute())
+                print("%s 갱신 완료 (%.1f초, %s)" % (self.name, time.perf_counter() - started, "변경됨" if changed else "변경 없음"))
+            except Exception as e:
+                print("%s 갱신 실패: %s. 기존 스냅샷을 유지합니다." % (self.name, e))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,123 @@
+# Firebase Hosting(CDN)에서 바로 내려줄 정적 지수 데이터 생성
+# public/data/<이름>/ 아래에 다음 파일을 내용 해시가 붙은 이름으로 씁니다 (같은 이름의 내용은 바뀌지 않음).
+#   latest.<해시>.json       최신 지수 (Firestore 문서와 같은 필드, timestamp는 ISO 8601 문자열)
+#   history-1y.<해시>.json   최근 1년 일별 이력 (JSON 배열, 차트용)
+#   history.<해시>.ndjson    전체 일별 이력 (한 줄에 하루)
+# 압축본은 따로 만들지 않습니다. Firebase Hosting이 요청의 Accept-Encoding에 맞춰 gzip/brotli로 압축해 보냅니다.
+# manifest.json(이름 고정, 짧은 캐시)이 현재 파일명을 가리키므로, 페이지는 manifest 하나만 새로 받으면 됩니다.
+# 해시가 붙은 파일은 firebase.json에서 1년 immutable 캐시로 제공합니다.
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+
+DEFAULT_OUT_DIR = os.path.join("public", "data")
+HISTORY_1Y_DAYS = 366
+# 배포 직후 이전 manifest를 받은 페이지도 파일을 찾을 수 있도록 직전 버전 파일까지 유지
+KEEP_PREVIOUS = True
+
+
+def _encode_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _encode_ndjson(rows):
+    return b"".join(_encode_json(row) + b"\n" for row in rows)
+
+
+def _write(path, body):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+class StaticExporter:
+    """지수 하나(korea_index, us_index)의 정적 데이터 디렉터리."""
+
+    def __init__(self, name, out_dir=DEFAULT_OUT_DIR):
+        self.name = name
+        self.dir = os.path.join(out_dir, name)
+        self.manifest_path = os.path.join(self.dir, "manifest.json")
+
+    def manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"정적 데이터 manifest 읽기 실패 ({self.name}): {e}")
+            return {}
+
+    def load_history(self):
+        """현재 전체 이력 파일을 {날짜: 항목}으로 읽습니다. 없으면 빈 dict."""
+        filename = self.manifest().get("files", {}).get("history")
+        if not filename or not os.path.exists(os.path.join(self.dir, filename)):
+            return {}
+        history = {}
+        with open(os.path.join(self.dir, filename), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    history[row.pop("date")] = row
+        return history
+
+    def _put(self, base, ext, body):
+        """내용 해시가 붙은 파일을 쓰고 파일명을 반환합니다. 같은 내용이면 다시 쓰지 않습니다."""
+        filename = "%s.%s.%s" % (base, hashlib.sha1(body).hexdigest()[:12], ext)
+        path = os.path.join(self.dir, filename)
+        if not os.path.exists(path):
+            _write(path, body)
+        return filename
+
+    def publish(self, latest, history, now=None):
+        """
+        latest(dict)와 history({'%Y%m%d': 항목})로 정적 파일과 manifest를 씁니다.
+        내용이 바뀐 파일만 새 이름으로 생기며, 현재/직전 manifest가 가리키지 않는 파일은 삭제합니다.
+        """
+        os.makedirs(self.dir, exist_ok=True)
+        now = now or datetime.utcnow()
+        rows = [dict(date=date_str, **entry) for date_str, entry in sorted(history.items())]
+        cutoff = (now - timedelta(days=HISTORY_1Y_DAYS)).strftime('%Y%m%d')
+        files = {
+            "latest": self._put("latest", "json", _encode_json(latest)),
+            "history_1y": self._put("history-1y", "json", _encode_json([r for r in rows if r["date"] >= cutoff])),
+            "history": self._put("history", "ndjson", _encode_ndjson(rows)),
+        }
+
+        previous = self.manifest()
+        if previous.get("files") == files:
+            return previous
+        manifest = {
+            "name": self.name,
+            "updated_at": now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "days": len(rows),
+            "files": files,
+            "previous": previous.get("files", {}) if KEEP_PREVIOUS else {},
+        }
+        _write(self.manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+        self._prune(set(files.values()) | set(manifest["previous"].values()))
+        print("정적 데이터 갱신 (%s): %s" % (self.name, ", ".join(files.values())))
+        return manifest
+
+    def _prune(self, keep):
+        for filename in os.listdir(self.dir):
+            # 이전 버전이 함께 쓰던 .gz/.br 압축본도 여기서 지워짐
+            if filename != "manifest.json" and filename not in keep:
+                os.remove(os.path.join(self.dir, filename))
+
+    def update(self, latest, date_str, entry, seed=None):
+        """
+        기존 전체 이력에 date_str의 항목을 더해(같은 날이면 교체) 다시 씁니다.
+        이력 파일이 아직 없으면 seed()가 돌려준 [(날짜, 항목)]으로 시작합니다 (예: Firestore 월별 요약).
+        """
+        history = self.load_history()
+        if not history and seed is not None:
+            try:
+                history = dict(seed())
+                print("정적 데이터 이력 초기화 (%s): %d일" % (self.name, len(history)))
+            except Exception as e:
+                print(f"정적 데이터 이력 초기화 실패 ({self.name}): {e}")
+        history[date_str] = entry
+        return self.publish(latest, history)
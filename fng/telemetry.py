@@ -0,0 +1,201 @@
+# 실행 단위 계측 (단계별 소요 시간 + 카운터) 및 JSON 실행 요약
+# - span(name): with 블록 하나를 단계로 기록 (이름, 시작 시각, 소요 시간, 예외, 속성)
+#   열려 있는 동안 count()된 값은 그 단계의 counters에도 더해져, 느린 실행이 어디서 요청/재시도/대기가 많았는지 보임
+# - count(name, value): 요청 수, 재시도, 대기 초, 바이트, 캐시 적중 등 실행 전체 카운터
+# - add_stats(prefix, stats): 이미 stats dict를 가진 구성요소(OhlcvCache, ReportCache 등)를 카운터로 합침
+# - write(): .cache/run_summary.json(RUN_SUMMARY_PATH)에 전체 요약, GITHUB_OUTPUT에는 run_summary=<단계/카운터 JSON>
+# - profiled(label): FNG_PROFILE=cprofile|pyinstrument이면 블록을 프로파일링해 .cache/profile/에 저장 (기본은 아무것도 안 함)
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# fng.ohlcv_cache.DEFAULT_CACHE_DIR와 같은 값 (http_client가 가볍게 임포트할 수 있도록 pandas를 끌어오지 않음)
+DEFAULT_CACHE_DIR = os.environ.get("FNG_CACHE_DIR", ".cache")
+RUN_SUMMARY_PATH = os.environ.get("RUN_SUMMARY_PATH", os.path.join(DEFAULT_CACHE_DIR, "run_summary.json"))
+PROFILE_ENV = "FNG_PROFILE"
+PROFILE_DIR = os.path.join(DEFAULT_CACHE_DIR, "profile")
+MAX_SPANS = 500 # 요약에 개별로 남길 단계 수 (단계별 합계는 그 이상도 모두 집계)
+
+
+def _round(value):
+    return round(value, 4) if isinstance(value, float) else value
+
+
+class Span:
+    """완료된(또는 진행 중인) 단계 하나. attrs는 with 블록 안에서 자유롭게 채울 수 있습니다."""
+
+    def __init__(self, name, offset, attrs):
+        self.name = name
+        self.offset = offset # 실행 시작부터 단계 시작까지 초
+        self.seconds = None
+        self.error = None
+        self.attrs = attrs
+        self.counters = {}
+
+    def to_dict(self):
+        item = {"name": self.name, "start": round(self.offset, 4), "seconds": round(self.seconds or 0.0, 4)}
+        if self.error:
+            item["error"] = self.error
+        if self.attrs:
+            item["attrs"] = self.attrs
+        if self.counters:
+            item["counters"] = {k: _round(v) for k, v in self.counters.items()}
+        return item
+
+
+class Telemetry:
+    """스레드 안전한 실행 계측기. KrxFetcher 작업 스레드에서 센 HTTP 요청도 열려 있는 단계에 반영됩니다."""
+
+    def __init__(self):
+        self.started_at = datetime.utcnow()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._open = []
+        self.spans = []
+        self.dropped = 0
+        self.stages = {} # 이름 -> {"count", "seconds", "max_seconds", "errors"}
+        self.counters = {}
+
+    @contextmanager
+    def span(self, name, **attrs):
+        item = Span(name, time.perf_counter() - self._t0, attrs)
+        with self._lock:
+            self._open.append(item)
+        try:
+            yield item
+        except BaseException as e:
+            item.error = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            item.seconds = time.perf_counter() - self._t0 - item.offset
+            with self._lock:
+                self._open.remove(item)
+                stage = self.stages.setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "errors": 0})
+                stage["count"] += 1
+                stage["seconds"] += item.seconds
+                stage["max_seconds"] = max(stage["max_seconds"], item.seconds)
+                stage["errors"] += item.error is not None
+                if len(self.spans) < MAX_SPANS:
+                    self.spans.append(item)
+                else:
+                    self.dropped += 1
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            for item in self._open:
+                item.counters[name] = item.counters.get(name, 0) + value
+
+    def add_stats(self, prefix, stats):
+        """구성요소의 stats dict를 '<prefix>.<키>' 카운터로 더합니다 (숫자 값만)."""
+        for key, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.count(f"{prefix}.{key}", value)
+
+    def summary(self):
+        with self._lock:
+            return {
+                "started_at": self.started_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                "total_seconds": round(time.perf_counter() - self._t0, 4),
+                "stages": {name: {k: _round(v) for k, v in stage.items()} for name, stage in self.stages.items()},
+                "counters": {k: _round(v) for k, v in sorted(self.counters.items())},
+                "spans": [item.to_dict() for item in self.spans],
+                "dropped_spans": self.dropped,
+            }
+
+    def write(self, path=RUN_SUMMARY_PATH, output_name="run_summary"):
+        """요약을 path(JSON)에 쓰고, GitHub Actions에서는 단계/카운터만 GITHUB_OUTPUT에 한 줄로 남깁니다."""
+        summary = self.summary()
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"실행 요약 저장 실패: {e}")
+        if 'GITHUB_OUTPUT' in os.environ:
+            compact = {k: summary[k] for k in ("started_at", "total_seconds", "stages", "counters")}
+            with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+                f.write(f"{output_name}={json.dumps(compact, ensure_ascii=False, separators=(',', ':'))}\n")
+        print("실행 요약 (%s, 전체 %.1f초):" % (path, summary["total_seconds"]))
+        for name, stage in sorted(summary["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+            print("  %-28s %3d회 %8.2f초 (최대 %.2f초)%s" % (
+                name, stage["count"], stage["seconds"], stage["max_seconds"],
+                ", 실패 %d" % stage["errors"] if stage["errors"] else ""))
+        return summary
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry():
+    """프로세스 공용 Telemetry."""
+    return _telemetry
+
+
+def reset():
+    """새 실행을 시작합니다 (반복 실행하는 서비스용). 새 Telemetry를 반환합니다."""
+    global _telemetry
+    _telemetry = Telemetry()
+    return _telemetry
+
+
+def span(name, **attrs):
+    return _telemetry.span(name, **attrs)
+
+
+def count(name, value=1):
+    _telemetry.count(name, value)
+
+
+def add_stats(prefix, stats):
+    _telemetry.add_stats(prefix, stats)
+
+
+@contextmanager
+def profiled(label, mode=None):
+    """
+    FNG_PROFILE(또는 mode)에 따라 블록을 프로파일링합니다.
+    - cprofile (또는 1): .cache/profile/<label>.pstats 저장 + 누적 시간 상위 25개 출력
+    - pyinstrument: .cache/profile/<label>.html 저장 + 텍스트 출력 (설치되지 않았으면 cProfile 사용)
+    """
+    mode = (mode if mode is not None else os.environ.get(PROFILE_ENV, "")).strip().lower()
+    if not mode or mode == "0":
+        yield
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, label)
+
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument가 설치되지 않아 cProfile로 프로파일링합니다.")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(base + ".html", "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html())
+                print(profiler.output_text(unicode=True, color=False))
+                print(f"프로파일 저장: {base}.html")
+            return
+
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(base + ".pstats")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        print(f"프로파일 저장: {base}.pstats")
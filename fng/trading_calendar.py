@@ -0,0 +1,84 @@
+# KRX 거래일 달력
+# ^KS11 일봉 인덱스(KospiHistory/OhlcvCache)로 한 번 만들어 두고 "오늘 이전 최근 거래일"을 로컬에서 계산합니다.
+# 주말/휴장일마다 KRX를 호출해 보고 1초씩 쉬던 탐색을 대체합니다.
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+# KRX 유가증권시장 정규장 (KST, 'HHMM'). 종가 확정(단일가 매매) 직후 봉까지 받도록 마감 후 여유를 둠
+MARKET_OPEN = "0900"
+MARKET_CLOSE = "1530"
+MARKET_CLOSE_GRACE_MINUTES = 10
+
+
+def kst_now():
+    return datetime.utcnow() + timedelta(hours=9)
+
+
+def is_market_hours(now=None, calendar=None):
+    """
+    now(KST)가 거래일의 정규장 시간(마감 후 MARKET_CLOSE_GRACE_MINUTES분 포함)인지.
+    calendar(TradingCalendar)가 없으면 평일을 거래일로 간주합니다.
+    """
+    now = now or kst_now()
+    today = now.strftime('%Y%m%d')
+    if calendar is not None:
+        if not calendar.is_trading_day(today):
+            return False
+    elif now.weekday() >= 5:
+        return False
+    close = datetime.strptime(today + MARKET_CLOSE, '%Y%m%d%H%M') + timedelta(minutes=MARKET_CLOSE_GRACE_MINUTES)
+    return MARKET_OPEN <= now.strftime('%H%M') and now <= close
+
+
+class TradingCalendar:
+    """
+    정렬된 거래일('%Y%m%d') 목록 위의 조회.
+    달력의 마지막 거래일 이후(^KS11이 아직 반영하지 않은 최근 며칠)는 평일을 거래일로 간주합니다.
+    목록이 비어 있으면 최근 3주의 평일을 거래일로 간주합니다.
+    """
+
+    def __init__(self, trading_days):
+        self.days = sorted(set(trading_days))
+
+    @classmethod
+    def from_kospi_history(cls, kospi_history):
+        return cls(kospi_history.get().index.strftime('%Y%m%d'))
+
+    def _extended(self, until):
+        if self.days and self.days[-1] >= until:
+            return self.days
+        extra = []
+        if self.days:
+            day = datetime.strptime(self.days[-1], '%Y%m%d') + timedelta(days=1)
+        else: # ^KS11 이력을 못 받은 경우: 최근 3주의 평일만으로 추정
+            day = datetime.strptime(until, '%Y%m%d') - timedelta(days=21)
+        while day.strftime('%Y%m%d') <= until:
+            if day.weekday() < 5:
+                extra.append(day.strftime('%Y%m%d'))
+            day += timedelta(days=1)
+        return self.days + extra
+
+    def is_trading_day(self, date_str):
+        days = self._extended(date_str)
+        i = bisect_left(days, date_str)
+        return i < len(days) and days[i] == date_str
+
+    def latest_before(self, date_str, count=1):
+        """date_str보다 이전인 최근 거래일 count개 (최신 날짜부터)."""
+        days = self._extended(date_str)
+        i = bisect_left(days, date_str)
+        return list(reversed(days[max(0, i - count):i]))
+
+    def latest_on_or_before(self, date_str, count=1):
+        """date_str 당일을 포함해 최근 거래일 count개 (최신 날짜부터)."""
+        days = self._extended(date_str)
+        i = bisect_right(days, date_str)
+        return list(reversed(days[max(0, i - count):i]))
+
+    def latest_published(self, count=1, now=None):
+        """
+        KRX Open API 일별 데이터가 공개된 최근 거래일 count개 (최신 날짜부터).
+        일별 데이터는 다음 영업일 아침에 제공되므로 오늘(KST)은 제외합니다.
+        """
+        today = (now or kst_now()).strftime('%Y%m%d')
+        return self.latest_before(today, count)
@@ -0,0 +1,69 @@
+# 미국 시장 리포트 입력값(CNN Fear & Greed + FRED 경제 지표) 동시 수집
+# 모든 외부 호출을 한꺼번에 시작하고 하나의 전체 마감 시간(deadline) 안에 끝난 결과만 사용합니다.
+# 느리거나 실패한 항목은 None이 되며 다른 항목을 기다리게 하지 않습니다.
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+
+DEFAULT_DEADLINE = float(os.environ.get("US_FETCH_DEADLINE", "30"))
+
+# UsMarketInputs 필드명 -> FRED series_id
+FRED_SERIES = {
+    'fedfunds': 'FEDFUNDS',
+    'vix': 'VIXCLS',
+    'payems': 'PAYEMS',
+    'unrate': 'UNRATE',
+    'dgs10': 'DGS10',
+    'sp500': 'SP500',
+}
+
+
+@dataclass
+class UsMarketInputs:
+    fng: Any = None # fear_and_greed.get() 결과 (value, description, last_update)
+    fedfunds: Optional[Dict[str, str]] = None # FRED 항목: {'value': ..., 'date': ...}
+    vix: Optional[Dict[str, str]] = None
+    payems: Optional[Dict[str, str]] = None
+    unrate: Optional[Dict[str, str]] = None
+    dgs10: Optional[Dict[str, str]] = None
+    sp500: Optional[Dict[str, str]] = None
+    elapsed: float = 0.0
+
+    def fred_indicators(self):
+        return {name: getattr(self, name) for name in FRED_SERIES}
+
+    def missing(self):
+        return [f.name for f in fields(self) if f.name != "elapsed" and getattr(self, f.name) is None]
+
+
+def fetch_us_inputs(fetch_fng, fetch_fred, deadline=DEFAULT_DEADLINE):
+    """
+    fetch_fng()와 fetch_fred(series_id)를 동시에 호출해 UsMarketInputs로 반환합니다.
+    deadline(초) 안에 끝나지 않았거나 예외가 난 항목은 None으로 둡니다.
+    """
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=len(FRED_SERIES) + 1)
+    futures = {executor.submit(fetch_fng): 'fng'}
+    for name, series_id in FRED_SERIES.items():
+        futures[executor.submit(fetch_fred, series_id)] = name
+
+    done, not_done = wait(futures, timeout=deadline)
+    results = {}
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            print(f"{name} 수집 실패: {e}")
+    for future in not_done:
+        future.cancel()
+        print(f"{futures[future]} 수집 시간 초과 ({deadline:.0f}초). None으로 처리합니다.")
+    # 마감 시간이 지난 호출의 결과는 쓰지 않음. 이미 시작된 스레드는 멈출 수 없어 인터프리터 종료 시 합류(join)하므로,
+    # fetch_fng/fetch_fred는 각자 HTTP 타임아웃을 가져야 함 (main.py는 공용 HttpClient로 호출)
+    executor.shutdown(wait=False)
+
+    inputs = UsMarketInputs(**results)
+    inputs.elapsed = time.perf_counter() - started
+    return inputs
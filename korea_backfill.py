@@ -0,0 +1,151 @@
+# 한국 공포/탐욕 지수 과거 구간 백필
+# 지정한 기간의 모든 거래일에 대해 지표 5개와 가중 합산 점수를 다시 계산해 Parquet 파일로 저장하고,
+# 선택적으로 Firestore korea_index 컬렉션에 일괄 적재합니다.
+#
+# 사용법 (저장소 루트에서):
+#   python korea_backfill.py --start 2023-01-01 --end 2025-12-31 --out korea_index_backfill.parquet
+#   python korea_backfill.py --start 2023-01-01 --firestore   # Firestore에도 적재
+#   python korea_backfill.py --start 2023-01-01 --no-fetch    # KRX 조회 없이 저장된 집계만 사용
+#
+# KRX 일별 집계(ADR, 풋콜, VKOSPI)는 krx_daily_store에 없는 거래일만 조회하며, 한 번 받은 날짜는
+# 다음 실행과 일일 get_scores에서 재사용됩니다.
+import argparse
+import os
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from fng.firestore_writer import IndexWriter
+from fng.backfill import WARMUP_DAYS, DEFAULT_WORKERS, DEFAULT_CHUNK_DAYS, SCORE_COLUMNS, build_inputs, backfill_scores
+from fng.kospi_history import KospiHistory, DEFAULT_LOOKBACK_DAYS
+from fng.krx_fetcher import KrxFetcher
+from fng.ohlcv_cache import OhlcvCache
+from fng.trading_calendar import kst_now
+from korea_fear_greed import (
+    krx_daily_store, get_firestore,
+    get_adr_counts_from_krx_api, get_put_call_ratio_from_krx_api, get_vkospi_from_krx_api,
+)
+
+KST = timezone(timedelta(hours=9))
+
+# krx_daily_store 열 -> 해당 열을 채우는 조회 함수 (조회 결과는 각 함수가 저장소에 기록)
+KRX_FETCHERS = (
+    ("adv", "ADR", get_adr_counts_from_krx_api),
+    ("put_vol", "풋콜", get_put_call_ratio_from_krx_api),
+    ("vkospi", "VKOSPI", get_vkospi_from_krx_api),
+)
+
+def load_kospi(start):
+    """start 이전 워밍업 구간까지 포함한 ^KS11 일봉 (디스크 캐시 사용)."""
+    lookback_days = (datetime.now() - start).days + DEFAULT_LOOKBACK_DAYS
+    history = KospiHistory(lookback_days=lookback_days, cache=OhlcvCache(retain_days=max(3650, lookback_days)))
+    return history.get()
+
+
+def fill_krx_daily(days):
+    """krx_daily_store에 없는 (거래일, 항목)만 KRX에서 조회해 저장합니다. 항목별 (조회, 실패) 수를 출력합니다."""
+    if not os.environ.get("KRX_API_KEY"):
+        print("KRX_API_KEY가 없어 KRX 조회를 건너뜁니다. 저장된 집계만 사용합니다.")
+        return
+    stored = krx_daily_store.frame(start=days[0], end=days[-1])
+    stored.index = stored.index.strftime('%Y%m%d')
+    for column, label, fetch in KRX_FETCHERS:
+        present = set(stored.index[stored[column].notna()])
+        missing = [d for d in days if d not in present]
+        if not missing:
+            continue
+        started = time.perf_counter()
+        failed = 0
+        fetcher = KrxFetcher()
+        with closing(fetcher.map(fetch, missing)) as results:
+            for date_str, value, error in results:
+                if error is not None or value is None or value == (None, None):
+                    failed += 1
+        print("KRX %s: %d거래일 조회, 실패/데이터 없음 %d일 (%.1f초)" % (label, len(missing), failed, time.perf_counter() - started))
+
+
+def _timestamp(date):
+    # 백필 문서의 timestamp는 해당 거래일 장 마감(15:30 KST)
+    return datetime(date.year, date.month, date.day, 15, 30, tzinfo=KST)
+
+
+def bulk_load_firestore(result):
+    """
+    백필 결과를 korea_index에 WriteBatch로 적재하고 월별 요약 문서(korea_index_history)도 채웁니다.
+    문서 ID는 backfill_YYYYMMDD이므로 같은 구간을 다시 적재하면 덮어씁니다 (중복 문서 없음).
+    """
+    db = get_firestore()
+    if db is None:
+        print("Firestore가 초기화되지 않아 적재를 건너뜁니다.")
+        return 0
+    with IndexWriter(db, 'korea_index') as writer:
+        for date, row in result.iterrows():
+            _add_row(writer, date, row)
+    print("Firestore korea_index에 %d건 적재 완료 (월별 요약 %d건, 커밋 %d회)." % (
+        writer.stats["documents"], writer.stats["history_updates"], writer.stats["commits"]))
+    return writer.stats["documents"]
+
+
+def _add_row(writer, date, row):
+    data_to_save = dict(
+        score=int(row["score"]),
+        kospi_value=None if pd.isna(row["kospi_value"]) else float(row["kospi_value"]),
+        kospi_change_point=None if pd.isna(row["kospi_change_point"]) else float(row["kospi_change_point"]),
+        kospi_change_rate=None if pd.isna(row["kospi_change_rate"]) else float(row["kospi_change_rate"]),
+    )
+    for key_name in SCORE_COLUMNS:
+        data_to_save[key_name] = float(row[key_name])
+    date_str = date.strftime('%Y%m%d')
+    history_entry = dict(data_to_save)
+    data_to_save.update(timestamp=_timestamp(date), backfill=True)
+    writer.add(data_to_save, date_str, history=history_entry, doc_id="backfill_" + date_str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='한국 공포/탐욕 지수 과거 구간 백필')
+    parser.add_argument('--start', required=True, help='시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end', help='종료일 (YYYY-MM-DD, 기본: KRX 데이터가 공개된 최근 거래일)')
+    parser.add_argument('--out', default='korea_index_backfill.parquet', help='결과 Parquet 파일 경로')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='계산 프로세스 수')
+    parser.add_argument('--chunk-days', type=int, default=DEFAULT_CHUNK_DAYS, help='프로세스당 거래일 수')
+    parser.add_argument('--no-fetch', action='store_true', help='KRX 조회 없이 저장된 집계만 사용')
+    parser.add_argument('--firestore', action='store_true', help='Firestore korea_index에 적재')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    start = datetime.strptime(args.start, '%Y-%m-%d')
+    # KRX 일별 데이터는 다음 영업일에 공개되므로 오늘(KST)은 포함하지 않음
+    yesterday = (kst_now() - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    end = min(datetime.strptime(args.end, '%Y-%m-%d'), yesterday) if args.end else yesterday
+
+    kospi_df = load_kospi(start)
+    index = pd.DatetimeIndex(kospi_df.index).normalize()
+    kospi_df = kospi_df[index <= end]
+    index = index[index <= end]
+    first = max(0, int((index < start).sum()) - WARMUP_DAYS) # 워밍업 거래일 포함
+    days = index[first:].strftime('%Y%m%d').tolist()
+    if not days or index[-1] < start:
+        print("백필 구간에 거래일이 없습니다: %s ~ %s" % (start.date(), end.date()))
+        return
+    print("백필 구간: %s ~ %s (워밍업 포함 %d거래일)" % (start.date(), end.date(), len(days)))
+
+    if not args.no_fetch:
+        fill_krx_daily(days)
+
+    inputs = build_inputs(kospi_df, krx_daily_store.frame(start=days[0], end=days[-1]))
+    compute_started = time.perf_counter()
+    result = backfill_scores(inputs, start, end, workers=args.workers, chunk_days=args.chunk_days)
+    print("점수 계산: %d거래일, %.2f초 (프로세스 %d개)" % (len(result), time.perf_counter() - compute_started, args.workers))
+
+    result.to_parquet(args.out)
+    print("저장 완료: %s" % args.out)
+
+    if args.firestore:
+        bulk_load_firestore(result)
+    print("백필 완료 (%.1f초)" % (time.perf_counter() - started))
+
+
+if __name__ == "__main__":
+    main()
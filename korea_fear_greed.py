@@ -1,49 +1,77 @@
 # Last updated: 2026-03-03 - Fixed KRX API endpoint and strengthened authentication.
+# 모듈 임포트만으로는 네트워크/Firestore/Gemini 호출이 일어나지 않습니다. 실행은 main()에서 합니다.
+# (Firebase, google-genai는 실제로 필요할 때 임포트/초기화)
 import os
 import json
-import pandas as pd
-import FinanceDataReader as fdr # 지표 1, 2에 필요
-from pykrx import stock # pykrx는 더 이상 사용하지 않지만 FinanceDataReader가 의존할 수 있으므로 남겨둠
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta # Add datetime import for use in generate_gemini_report
-import firebase_admin
-from firebase_admin import credentials, firestore
-import time # 재시도를 위한 시간 지연
-# [수정] 기존 'import google.generativeai' 대신 최신 SDK 임포트
-from google import genai 
-from google.genai import types
-
-# 1. Firebase 초기화
-firestore_initialized = False
-db = None
-if not firebase_admin._apps:
-    try:
-        firebase_key = os.environ.get('FIREBASE_KEY')
-        
-        if firebase_key:
-            key_dict = json.loads(firebase_key)
-            cred = credentials.Certificate(key_dict)
-            firebase_admin.initialize_app(cred)
-            print("GitHub Secrets 키를 사용하여 인증되었습니다.")
-        else:
-            cred = credentials.ApplicationDefault() 
-            firebase_admin.initialize_app(cred)
-            print("기존 ApplicationDefault 방식을 사용하여 인증되었습니다.")
-        
-        db = firestore.client()
-        firestore_initialized = True
-    except Exception as e:
-        print(f"Firebase 초기화 중 오류 발생: {e}. Firestore에 데이터를 저장할 수 없습니다.")
-else: # Already initialized, likely in a testing environment or subsequent call
-    try:
-        db = firestore.client()
-        firestore_initialized = True
-    except Exception as e:
-        print(f"이미 초기화된 Firebase 앱에서 Firestore 클라이언트 가져오기 오류: {e}. Firestore에 데이터를 저장할 수 없습니다.")
+from contextlib import closing
+from fng.kospi_history import KospiHistory # ^KS11 이력 공유 (지표 1, 2, 3 및 KOSPI 현재가)
+from fng.ohlcv_cache import OhlcvCache # ^KS11 일봉 디스크 캐시 (최신 봉만 증분 조회)
+from fng.krx_fetcher import KrxFetcher # KRX 일자별 API 병렬 조회 (동시성/속도 제한)
+from fng.krx_daily import KrxDailyStore, reduce_adr, reduce_put_call, reduce_vkospi # KRX 일별 집계 저장소
+from fng.http_client import get_client # 공용 HTTP 클라이언트 (연결 풀, 재시도/백오프)
+from fng.trading_calendar import TradingCalendar, is_market_hours, kst_now # ^KS11 기반 거래일 달력, 정규장 시간
+from fng import scoring # 지표 점수 환산식 (백필과 공유)
+from fng.scoring import VKOSPI_WINDOW, VKOSPI_MIN_WINDOW
+from fng.rolling_state import IndicatorState # 지표 1~3 증분 rolling 상태 (체크포인트)
+from fng.news import NEWS_FEEDS, NEWS_MIN_HEADLINES, NEWS_WINDOW_DAYS, update_news_indicator # 지표 6 뉴스 헤드라인 심리
+from fng.firestore_writer import IndexWriter, read_history # 일괄 쓰기 + 월별 요약 문서
+from fng.static_export import StaticExporter # CDN용 정적 JSON/NDJSON (public/data)
+from fng.gemini_models import ModelResolver # Gemini 모델 선택 캐시
+from fng.report_pipeline import ReportJob, run_reports # 스트리밍 + 한/영 동시 생성
+from fng.report_template import format_updated, parse_narrative, render_kospi_report # 리포트 HTML 템플릿
+from fng.report_cache import report_key # 입력 해시 기반 리포트 캐시
+from fng import telemetry # 단계별 소요 시간/카운터, 실행 요약 (.cache/run_summary.json)
+
+# 1. Firebase 초기화 (get_firestore() 첫 호출 시)
+_db = None
+_firestore_checked = False
+
+
+def get_firestore():
+    """Firestore 클라이언트를 처음 필요할 때 초기화해 반환합니다. 초기화에 실패하면 None."""
+    global _db, _firestore_checked
+    if _firestore_checked:
+        return _db
+    _firestore_checked = True
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    if not firebase_admin._apps:
+        try:
+            firebase_key = os.environ.get('FIREBASE_KEY')
+            
+            if firebase_key:
+                key_dict = json.loads(firebase_key)
+                cred = credentials.Certificate(key_dict)
+                firebase_admin.initialize_app(cred)
+                print("GitHub Secrets 키를 사용하여 인증되었습니다.")
+            else:
+                cred = credentials.ApplicationDefault() 
+                firebase_admin.initialize_app(cred)
+                print("기존 ApplicationDefault 방식을 사용하여 인증되었습니다.")
+            
+            _db = firestore.client()
+        except Exception as e:
+            print(f"Firebase 초기화 중 오류 발생: {e}. Firestore에 데이터를 저장할 수 없습니다.")
+    else: # Already initialized, likely in a testing environment or subsequent call
+        try:
+            _db = firestore.client()
+        except Exception as e:
+            print(f"이미 초기화된 Firebase 앱에서 Firestore 클라이언트 가져오기 오류: {e}. Firestore에 데이터를 저장할 수 없습니다.")
+    return _db
+
+# KRX Open API의 엔드포인트는 data-dbg.krx.co.kr을 사용합니다. (KRX_BASE_URL: 오프라인 벤치마크의 로컬 스텁 등)
+KRX_BASE_URL = os.environ.get("KRX_BASE_URL", "https://data-dbg.krx.co.kr/svc/apis/")
+
+# 지표 계산에 필요한 일별 집계(상승/하락 종목 수, 풋/콜 거래량, VKOSPI)만 보관하는 시계열 저장소
+krx_daily_store = KrxDailyStore()
 
 
 def _call_krx_api(endpoint, params, auth_key_env_var="KRX_API_KEY"):
+    # 마감된 거래일은 호출부가 줄인 집계를 krx_daily_store에 저장하므로 원본 응답은 캐시하지 않음
     auth_key = os.environ.get(auth_key_env_var)
     if not auth_key:
         print(f"경고: 환경 변수 '{auth_key_env_var}'가 KRX API 키로 설정되지 않았습니다. KRX API 호출을 건너뜝니다.")
@@ -53,9 +81,7 @@ def _call_krx_api(endpoint, params, auth_key_env_var="KRX_API_KEY"):
         "AUTH_KEY": auth_key,
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
-    # KRX Open API의 엔드포인트는 data-dbg.krx.co.kr을 사용합니다.
-    base_url = "https://data-dbg.krx.co.kr/svc/apis/"
-    full_url = base_url + endpoint
+    full_url = KRX_BASE_URL + endpoint
     
     # [보완] 인증키를 쿼리 파라미터에도 추가하여 인증 성공률을 높임
     if params is None:
@@ -63,365 +89,430 @@ def _call_krx_api(endpoint, params, auth_key_env_var="KRX_API_KEY"):
     params["AUTH_KEY"] = auth_key
     
     try:
-        response = requests.get(full_url, headers=headers, params=params, timeout=30)
-        response.raise_for_status()
+        # 공용 HTTP 클라이언트: keep-alive 연결 재사용, 429/5xx 재시도 (읽기 타임아웃 기본 30초)
+        response = get_client().get(full_url, headers=headers, params=params)
         return response.json()
     except requests.exceptions.HTTPError as http_err:
         print("HTTP 오류 발생: %s" % http_err)
         # 401/403 등 인증 오류 시 응답 내용 확인을 위해 추가
-        if response.text:
-            print("응답 내용 요약: %s" % response.text[:200])
+        if http_err.response is not None and http_err.response.text:
+            print("응답 내용 요약: %s" % http_err.response.text[:200])
         raise
     except Exception as e:
         print("API 호출 중 예외 발생: %s" % str(e))
         raise
 
 def get_vkospi_from_krx_api(date_str):
+    record = krx_daily_store.get(date_str)
+    if record and record["vkospi"] is not None:
+        return record["vkospi"]
+
     endpoint = "idx/drvprod_dd_trd" # 파생상품지수 시세정보
     params = {"basDd": date_str}
     
     data = _call_krx_api(endpoint, params)
     
-    vkospi_value = None
-    if "OutBlock_1" in data:
-        for item in data["OutBlock_1"]:
-            # VKOSPI의 지수명을 정확히 확인해야 함. "VKOSPI" 또는 "코스피200 변동성지수" 등이 될 수 있음.
-            # 일단 "VKOSPI"로 가정하고, 없으면 로그로 모든 지수명 출력하여 디버깅.
-            if item.get("IDX_NM") == "코스피 200 변동성지수": 
-                vkospi_value = float(item.get("CLSPRC_IDX").replace('-', '')) # '-' 제거 후 float 변환
-                break
-        if vkospi_value is None:
-            all_idx_names = [item.get("IDX_NM") for item in data["OutBlock_1"]]
-            print("KRX API에서 VKOSPI를 찾지 못했습니다. 확인된 지수명: %s" % str(all_idx_names))
-            raise ValueError("VKOSPI 데이터를 찾을 수 없습니다 (IDX_NM not 'VKOSPI').")
-    else:
+    if data is None or "OutBlock_1" not in data:
         raise ValueError("KRX API 응답에 OutBlock_1이 없습니다.")
-        
-    return vkospi_value 
+
+    reduced = reduce_vkospi(data)
+    if reduced is None:
+        # VKOSPI의 지수명을 정확히 확인해야 함. 없으면 로그로 모든 지수명 출력하여 디버깅.
+        all_idx_names = [item.get("IDX_NM") for item in data["OutBlock_1"]]
+        print("KRX API에서 VKOSPI를 찾지 못했습니다. 확인된 지수명: %s" % str(all_idx_names))
+        raise ValueError("VKOSPI 데이터를 찾을 수 없습니다 (IDX_NM not 'VKOSPI').")
+
+    krx_daily_store.update(date_str, **reduced)
+    return reduced["vkospi"]
 
 def get_adr_counts_from_krx_api(date_str):
     """
     KRX sto/stk_bydd_trd API로부터 상승/하락 종목 수를 가져옵니다.
     NOTE: 이 API는 SECT_TP_NM(소속부)을 '-'로 반환하는 경우가 많아 주권/ETF 구분이 불가능합니다.
     따라서 KOSPI 시장의 모든 상장 종목을 대상으로 ADR을 계산합니다.
+    마감된 거래일은 원본 대신 상승/하락/보합 종목 수만 krx_daily_store에 저장해 재사용합니다.
     """
     endpoint = "sto/stk_bydd_trd" # 유가증권 일별매매정보
     params = {"basDd": date_str}
 
     try:
-        data = _call_krx_api(endpoint, params)
-        if data is None or "OutBlock_1" not in data or not data["OutBlock_1"]:
-            return None, None
-        
-        advancing_count = 0
-        declining_count = 0
-        
-        for item in data["OutBlock_1"]:
-            # KOSPI 시장 필터링 ("KOSPI" 또는 "유가증권" 대응)
-            mkt_nm = item.get("MKT_NM", "")
-            if mkt_nm in ["KOSPI", "유가증권"]:
-                fluc_rt_str = item.get("FLUC_RT", "0")
-                if fluc_rt_str == "-":
-                    fluc_rt = 0.0
-                else:
-                    try:
-                        fluc_rt = float(fluc_rt_str)
-                    except ValueError:
-                        fluc_rt = 0.0
-
-                if fluc_rt > 0:
-                    advancing_count += 1
-                elif fluc_rt < 0:
-                    declining_count += 1
+        record = krx_daily_store.get(date_str)
+        if record and _has_breadth(record):
+            reduced = record
+        else:
+            data = _call_krx_api(endpoint, params)
+            reduced = reduce_adr(data)
+            if reduced is None:
+                return None, None
+            if _has_breadth(reduced): # 아직 공개되지 않아 모두 0인 날은 저장하지 않고 다음 실행에서 다시 조회
+                krx_daily_store.update(date_str, **reduced)
         
         # 유효한 종목 데이터가 하나도 없는 날은 None 반환 (휴장일 등)
-        if advancing_count == 0 and declining_count == 0:
+        if reduced["adv"] == 0 and reduced["dec"] == 0:
             return None, None
             
-        return advancing_count, declining_count
+        return reduced["adv"], reduced["dec"]
     except Exception as e:
         print(f"ADR 데이터 추출 중 오류 ({date_str}): {e}")
         return None, None
 
-def get_put_call_ratio_from_krx_api(date_str):
-    endpoint = "drv/opt_bydd_trd" # 옵션 일별매매정보 (주식옵션外)
-    params = {"basDd": date_str}
+def _has_breadth(record):
+    return record["adv"] is not None and (record["adv"] > 0 or record["dec"] > 0)
 
-    data = _call_krx_api(endpoint, params)
-    
-    # _call_krx_api에서 None을 반환한 경우 (예: KRX_API_KEY 없음)
-    if data is None:
-        # print(f"지표 5 (코스피200 옵션 풋콜 비율) KRX API 호출 실패로 None 반환 for {date_str}.") # Keep critical warnings
-        return None
 
-    # print(f"지표 5 (코스피200 옵션 풋콜 비율) KRX API raw response for {date_str} (from drv/opt_bydd_trd): {json.dumps(data, indent=2)}") # Removed verbose logging
+def _chain_fetches(fetcher, fetch, batches):
+    # 묶음마다 fetcher.map 결과를 순서대로 이어서 내보냄 (닫히면 진행 중인 묶음의 남은 요청 취소)
+    for batch in batches:
+        with closing(fetcher.map(fetch, batch)) as fetched:
+            yield from fetched
 
-    if "OutBlock_1" not in data or not data["OutBlock_1"]:
-        # print(f"지표 5 (코스피200 옵션 풋콜 비율) OutBlock_1 없음 또는 비어있음 for {date_str}. Response keys: {data.keys()}. None을 반환합니다.") # Keep critical warnings
-        return None
-    
-    put_volume = 0
-    call_volume = 0
-    
-    # '코스피200 옵션' 상품만 필터링
-    target_prod_nm = "코스피200 옵션"
-    filtered_items = []
-    
-    # all_prod_names_in_block = [item.get("PROD_NM", "") for item in data["OutBlock_1"]]
-    # print(f"지표 5 (코스피200 옵션 풋콜 비율) OutBlock_1 모든 PROD_NM for {date_str} (drv/opt_bydd_trd): {all_prod_names_in_block}") # Removed verbose logging
 
-    for item in data["OutBlock_1"]:
-        prod_nm = item.get("PROD_NM", "")
-        if prod_nm == target_prod_nm:
-            filtered_items.append(item)
-            
-    # print(f"지표 5 (코스피200 옵션 풋콜 비율) 필터링된 OutBlock_1 내용 for {date_str}: {json.dumps(filtered_items, indent=2)}") # Removed verbose logging
+def collect_adr_window(candidates, fetch=get_adr_counts_from_krx_api, store=None):
+    """
+    candidates(최신 거래일부터) 중 하락 종목이 있는 최근 ADR_DAYS거래일을 모아
+    ([(날짜, 상승, 하락), ...] 최신부터, KRX 요청 수)로 반환합니다.
+    store(기본 krx_daily_store)에 집계가 있는 날은 저장값을 쓰고, 없는 날(이전 실행에서 조회에 실패한 과거
+    거래일 포함)만 fetch로 조회하므로, 매 실행 후보 구간 전체를 다시 조회하던 방식과 같은 20일을 합산합니다.
+    """
+    store = store or krx_daily_store
+    counts = {}
+    if candidates:
+        stored = store.frame(candidates[-1], candidates[0])[["adv", "dec"]].dropna()
+        for bas_dd, adv, dec in zip(stored.index.strftime('%Y%m%d'), stored["adv"], stored["dec"]):
+            if adv > 0 or dec > 0:
+                counts[bas_dd] = (int(adv), int(dec))
+    missing = [d for d in candidates if d not in counts]
+    # 저장된 날과 합쳐 20일을 채울 만큼만 먼저 요청하고, 그중 실패한 날이 있을 때만 더 오래된 날을 요청
+    # (매일 실행에서는 새 거래일 하나만 요청되고, 창 밖의 오래된 날을 미리 요청하지 않음)
+    first = filled = 0
+    for t_date in candidates:
+        if filled == scoring.ADR_DAYS:
+            break
+        if t_date not in counts:
+            first += 1
+            filled += 1
+        elif counts[t_date][1] > 0:
+            filled += 1
+
+    window = []
+    # 저장되지 않은 날만 병렬로 조회하되 결과는 최신 날짜부터 순서대로 소비 (직렬 조회와 같은 20일을 합산)
+    fetcher = KrxFetcher()
+    with closing(_chain_fetches(fetcher, fetch, [missing[:first], missing[first:]])) as fetched:
+        for t_date in candidates:
+            if t_date in counts:
+                adv, dec = counts[t_date]
+            else:
+                _, result, error = next(fetched)
+                adv, dec = result if error is None else (None, None)
 
-    if not filtered_items:
-        # print(f"지표 5 (코스피200 옵션 풋콜 비율) '{target_prod_nm}' 데이터 없음 for {date_str}. OutBlock_1은 있었으나 관련 상품 없음. None을 반환합니다.") # Keep critical warnings
-        return None
+            # 데이터가 존재하고 하락 종목이 0보다 큰 정상적인 데이터만 합산
+            if adv is not None and dec is not None and dec > 0:
+                window.append((t_date, adv, dec))
+            else:
+                # 데이터 이상일 경우 로그 출력하여 추적 가능하게 함
+                print(f"[ADR SKIP] {t_date}: adv={adv}, dec={dec}")
 
-    for item in filtered_items:
-        try:
-            acc_trdvol = float(item.get("ACC_TRDVOL").replace('-', '0'))
-            if item.get("RGHT_TP_NM") == "PUT":
-                put_volume += acc_trdvol
-            elif item.get("RGHT_TP_NM") == "CALL":
-                call_volume += acc_trdvol
-        except ValueError as ve:
-            print("거래량 변환 오류: %s (item: %s)" % (str(ve), str(item)))
-            continue
-
-    if put_volume == 0 and call_volume == 0:
-        # print(f"지표 5 (코스피200 옵션 풋콜 비율) Put/Call 거래량 모두 0 for {date_str}. None을 반환합니다.") # Keep critical warnings
-        return None # Return None if no volume to signify no meaningful data
-    elif call_volume == 0:
-        # print(f"지표 5 (코스피200 옵션 풋콜 비율) Call 거래량 0, Put 거래량 있음. Put/Call 비율 200으로 처리 for {date_str}.") # Keep critical warnings
-        put_call_ratio = 200 # Put volume exists, Call volume is zero (extreme fear)
+            # 정확히 20일치가 모이면 중단 (그보다 오래된 날은 윈도우에 남지 않음, 아직 시작하지 않은 요청은 취소됨)
+            if len(window) == scoring.ADR_DAYS:
+                break
+    return window, fetcher.calls
+
+
+def get_put_call_ratio_from_krx_api(date_str):
+    record = krx_daily_store.get(date_str)
+    if record and record["put_vol"] is not None and record["call_vol"] is not None:
+        reduced = record
     else:
-        put_call_ratio = (put_volume / call_volume) * 100
-    
-    return put_call_ratio
+        endpoint = "drv/opt_bydd_trd" # 옵션 일별매매정보 (주식옵션外)
+        params = {"basDd": date_str}
+
+        data = _call_krx_api(endpoint, params)
+        
+        # _call_krx_api에서 None을 반환한 경우 (예: KRX_API_KEY 없음)
+        # 또는 OutBlock_1 없음, '코스피200 옵션' 상품 없음
+        reduced = reduce_put_call(data)
+        if reduced is None:
+            return None
+        krx_daily_store.update(date_str, **reduced)
+
+    # 거래량이 모두 0이면 None (의미 있는 데이터 없음), 콜 거래량만 0이면 200 (극심한 공포)
+    return scoring.put_call_ratio(reduced["put_vol"], reduced["call_vol"])
+
+# 최근 거래일 데이터가 아직 없을 때(공개 지연 등) 추가로 시도할 이전 거래일 수
+KRX_FALLBACK_DAYS = 2
+
+
+def _fetch_on_latest_trading_day(label, fetch, candidates, metrics):
+    """
+    candidates(최신 거래일부터)에 한 번씩 요청해 처음 얻은 값을 (날짜, 값)으로 반환합니다.
+    정상적인 경우 첫 후보 한 번으로 끝나며, 그 이후의 요청은 metrics['wasted']에 집계합니다.
+    """
+    for date_str in candidates:
+        metrics["requests"] += 1
+        try:
+            value = fetch(date_str)
+            if value is not None:
+                print("%s: %s 데이터 사용." % (label, date_str))
+                return date_str, value
+            print("%s: %s 데이터 없음." % (label, date_str))
+        except Exception as e:
+            print("%s: %s 데이터 조회 실패. 오류: %s" % (label, date_str, str(e)))
+        metrics["wasted"] += 1
+    return None, None
+
+
+def _load_vkospi_window(trading_calendar, metrics):
+    """
+    KRX 데이터가 공개된 최근 VKOSPI_WINDOW 거래일의 (날짜, VKOSPI)를 최신 날짜부터 반환합니다.
+    krx_daily_store에 이미 있는 날짜는 그대로 쓰고, 없는 날짜만 KrxFetcher로 병렬 조회합니다.
+    """
+    window_days = trading_calendar.latest_published(count=VKOSPI_WINDOW)
+    if not window_days:
+        return []
+    stored = krx_daily_store.frame(start=window_days[-1], end=window_days[0])["vkospi"].dropna()
+    values = {d.strftime('%Y%m%d'): v for d, v in stored.items()}
+
+    missing = [d for d in window_days if d not in values]
+    if missing:
+        print("지표 4 (VKOSPI): 저장된 %d거래일 외 %d거래일 조회" % (len(values), len(missing)))
+        with closing(KrxFetcher().map(get_vkospi_from_krx_api, missing)) as results:
+            for date_str, value, error in results:
+                metrics["requests"] += 1
+                if error is None and value is not None:
+                    values[date_str] = value
+                else:
+                    metrics["wasted"] += 1
+                    print("지표 4 (VKOSPI): %s 데이터 조회 실패. 오류: %s" % (date_str, error))
+    return [(d, values[d]) for d in window_days if d in values]
+
 
-def get_scores():
+def _closes_fallback(close):
+    """
+    증분 상태를 만들 수 없을 때 종가 이력 전체로 (125일 이평선, 14일 RSI)를 계산합니다.
+    마지막 봉(미확정 당일 봉 포함)까지 반영하며, 데이터가 부족한 값은 None입니다.
+    """
+    ma125 = close.rolling(window=scoring.MA_WINDOW).mean().iloc[-1:].dropna()
+    rsi_value = scoring.rsi(close).iloc[-1:].dropna()
+    return (float(ma125.iloc[0]) if len(ma125) else None), (float(rsi_value.iloc[0]) if len(rsi_value) else None)
+
+
+def get_scores(kospi_history=None):
     scores = []
+    telemetry.count("krx_daily.legacy_imported", krx_daily_store.import_legacy_responses()) # 이전 원본 응답 캐시 (한 번만)
+
+    # ^KS11 이력은 가장 긴 구간(125일 이평선용)을 한 번만 받아 모든 KOSPI 파생 지표가 공유
+    if kospi_history is None:
+        kospi_history = KospiHistory(cache=OhlcvCache())
+    with telemetry.span("kospi_history"):
+        try:
+            df = kospi_history.get()
+        except Exception as e:
+            print(f"KOSPI 이력 조회 최종 오류: {e}")
+            df = None
+
+    # 지표 1~3은 체크포인트에서 복원한 증분 상태에 마감된 새 봉/거래일만 반영해 계산
+    # 당일(KST) 봉은 장중 미확정이므로 상태에 넣지 않고 pending_close로만 사용
+    today_kst = kst_now().strftime('%Y%m%d')
+    with telemetry.span("indicator_state.sync"):
+        indicator_state = IndicatorState.restore()
+        pending_close = None
+        fallback = None # 증분 상태를 쓸 수 없을 때 이력 전체로 계산한 (ma125, rsi)
+        if df is not None and not df.empty:
+            if df.index[-1].strftime('%Y%m%d') >= today_kst:
+                pending_close = df['Close'].iloc[-1]
+            try:
+                pushed = indicator_state.sync_closes(df['Close'], until=today_kst)
+                print(f"지표 상태: 마감 봉 {pushed}개 반영 (마지막 {indicator_state.last_date})")
+            except Exception as e:
+                print(f"지표 상태 갱신 실패 (이력으로 다시 계산): {e}")
+                indicator_state = IndicatorState()
+                try:
+                    indicator_state.sync_closes(df['Close'], until=today_kst)
+                except Exception as e:
+                    print(f"지표 상태 재계산 실패 (이력 전체로 직접 계산): {e}")
+                    indicator_state = IndicatorState() # 지표 3 및 체크포인트용 (다음 실행에서 이력으로 다시 만듦)
+                    fallback = _closes_fallback(df['Close'])
     
     # 지표 1: KOSPI vs 125일 이평선 이격도
-    try:
-        score1 = 50 # 기본값 설정
-        for i in range(10): # 오늘부터 10일 전까지 시도
-            target_date = datetime.now() - timedelta(days=i)
-            try:
-                # [변경] 'KS11' 대신 Yahoo Finance 심볼 '^KS11' 사용하여 KRX LOGOUT 오류 회피
-                df = fdr.DataReader('^KS11', start=target_date - timedelta(days=200))
-                if not df.empty and len(df) >= 125: # 최소 125일 데이터 필요
-                    ma125 = df['Close'].rolling(window=125).mean().iloc[-1]
-                    curr = df['Close'].iloc[-1]
-                    score1 = min(max((curr/ma125 - 0.9) / 0.2 * 100, 0), 100)
-                    print(f"지표 1 (KOSPI vs 125일 이평선 이격도) 성공: {target_date.strftime('%Y%m%d')} 데이터 사용, 점수: {score1:.2f}")
-                    break
-                else:
-                    print(f"지표 1 (KOSPI vs 125일 이평선 이격도): {target_date.strftime('%Y%m%d')} 데이터 부족. 재시도.")
-            except Exception as e_inner:
-                print(f"지표 1 (KOSPI vs 125일 이평선 이격도): {target_date.strftime('%Y%m%d')} 데이터 조회 실패. 재시도. 오류: {e_inner}")
-            time.sleep(0.5) # 짧은 지연
-        scores.append(score1)
-        if score1 == 50: # 여전히 기본값이면 10일 동안 데이터를 찾지 못한 것
-             print("지표 1 (KOSPI vs 125일 이평선 이격도) 최종 오류: 10일 동안 유효한 데이터를 찾지 못했습니다. 기본값 50 사용.")
-    except Exception as e:
-        print("지표 1 (KOSPI vs 125일 이평선 이격도) 최종 오류: %s" % str(e))
-        scores.append(50)
+    with telemetry.span("indicator1.ma_gap"):
+        try:
+            score1 = 50 # 기본값 설정
+            if fallback is not None:
+                ma125 = fallback[0]
+            else:
+                ma125 = indicator_state.ma(pending_close) if df is not None else None
+            if ma125 is not None: # 최소 125일 데이터 필요
+                curr = df['Close'].iloc[-1]
+                score1 = scoring.ma_gap_score(curr, ma125)
+                print(f"지표 1 (KOSPI vs 125일 이평선 이격도) 성공: {df.index[-1].strftime('%Y%m%d')} 데이터 사용, 점수: {score1:.2f}")
+            else:
+                print("지표 1 (KOSPI vs 125일 이평선 이격도) 최종 오류: 125거래일 데이터를 확보하지 못했습니다. 기본값 50 사용.")
+            scores.append(score1)
+        except Exception as e:
+            print("지표 1 (KOSPI vs 125일 이평선 이격도) 최종 오류: %s" % str(e))
+            scores.append(50)
 
     # 지표 2: KOSPI 14일 RSI (대체 지표)
-    try:
-        rsi_score = 50 # 기본값 설정
-        for i in range(10): # 오늘부터 10일 전까지 시도
-            target_date = datetime.now() - timedelta(days=i)
-            try:
-                # [변경] '^KS11' 사용
-                df_rsi = fdr.DataReader('^KS11', start=target_date - timedelta(days=40)) 
-                if not df_rsi.empty and len(df_rsi) > 14: # 최소 14일 데이터 필요
-                    delta = df_rsi['Close'].diff()
-                    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                    rs = gain / loss
-                    rsi = 100 - (100 / (1 + rs))
-                    rsi_score = rsi.iloc[-1]
-                    print(f"지표 2 (RSI) 성공: {target_date.strftime('%Y%m%d')} 데이터 사용, 점수: {rsi_score:.2f}")
-                    break
-                else:
-                    print(f"지표 2 (RSI): {target_date.strftime('%Y%m%d')} 데이터 부족. 재시도.")
-            except Exception as e_inner:
-                print(f"지표 2 (RSI): {target_date.strftime('%Y%m%d')} 데이터 조회 실패. 재시도. 오류: {e_inner}")
-            time.sleep(0.5) # 짧은 지연
-        scores.append(rsi_score)
-        if rsi_score == 50: # 여전히 기본값이면 10일 동안 데이터를 찾지 못한 것
-             print("지표 2 (RSI) 최종 오류: 10일 동안 유효한 데이터를 찾지 못했습니다. 기본값 50 사용.")
-    except Exception as e:
-        print("지표 2 (RSI) 최종 오류: %s" % str(e))
-        scores.append(50)
+    with telemetry.span("indicator2.rsi"):
+        try:
+            rsi_score = 50 # 기본값 설정
+            if fallback is not None:
+                rsi_value = fallback[1]
+            else:
+                rsi_value = indicator_state.rsi(pending_close) if df is not None else None
+            if rsi_value is not None: # 최소 14일 데이터 필요
+                rsi_score = rsi_value
+                print(f"지표 2 (RSI) 성공: {df.index[-1].strftime('%Y%m%d')} 데이터 사용, 점수: {rsi_score:.2f}")
+            else:
+                print("지표 2 (RSI) 최종 오류: 14거래일 데이터를 확보하지 못했습니다. 기본값 50 사용.")
+            scores.append(rsi_score)
+        except Exception as e:
+            print("지표 2 (RSI) 최종 오류: %s" % str(e))
+            scores.append(50)
 
     # 지표 3: ADR (상승/하락 비율) - 20일 이동평균 (신뢰성 강화 버전)
-    try:
-        # [변경] '^KS11' 사용
-        df_ks = fdr.DataReader('^KS11', start=datetime.now() - timedelta(days=45))
-        all_trading_days = df_ks.index.strftime('%Y%m%d').tolist()
-        all_trading_days.reverse() # 최신 날짜부터 역순으로 검사
-        
-        total_adv = 0
-        total_dec = 0
-        days_found = 0
-        
-        print(f"지표 3 (ADR): 유효 20거래일 데이터 보장 수집 시작 (후보군 {len(all_trading_days)}일)...")
-        for t_date in all_trading_days:
-            adv, dec = get_adr_counts_from_krx_api(t_date)
-            
-            # 데이터가 존재하고 하락 종목이 0보다 큰 정상적인 데이터만 합산
-            if adv is not None and dec is not None and dec > 0:
-                total_adv += adv
-                total_dec += dec
-                days_found += 1
-            else:
-                # 데이터 이상일 경우 로그 출력하여 추적 가능하게 함
-                print(f"[ADR SKIP] {t_date}: adv={adv}, dec={dec}")
-            
-            # 정확히 20일치가 모이면 중단
-            if days_found == 20:
-                break
-            time.sleep(0.1) # API 부하 방지
+    with telemetry.span("indicator3.adr"):
+        try:
+            # 공유 ^KS11 이력에서 최근 45일 거래일 달력을 추출 (추가 다운로드 없음)
+            # KRX 일별 데이터가 아직 공개되지 않은 오늘(KST)은 후보에서 제외
+            all_trading_days = [d for d in kospi_history.trading_days(scoring.ADR_CANDIDATE_DAYS) if d < today_kst]
+            all_trading_days.reverse() # 최신 날짜부터 역순으로 검사
+
+            print(f"지표 3 (ADR): 20거래일 데이터 수집 시작 (후보군 {len(all_trading_days)}일)...")
+            # 저장된 일별 집계로 창을 다시 만들고, 저장되지 않은 거래일(새 거래일, 이전에 실패한 날)만 KRX에 요청
+            window, krx_calls = collect_adr_window(all_trading_days)
+            indicator_state.sync_breadth(reversed(window)) # 오래된 날짜부터 반영
+            print(f"지표 3 (ADR): 유효 거래일 {len(window)}일, KRX 요청 {krx_calls}회")
+            days_found = len(indicator_state.adv)
+            adr_score_raw = indicator_state.adr_ratio(today_kst)
         
-        if days_found == 20 and total_dec > 0:
-            adr_score_raw = (total_adv / total_dec) * 100
+            if adr_score_raw is not None:
+                # ADR 값을 0~100 스케일로 변환 (70~120 범위 사용)
+                adr_score_scaled = scoring.adr_score(adr_score_raw)
             
-            # ADR 값을 0~100 스케일로 변환 (70~120 범위 사용)
-            if adr_score_raw <= 70:
-                adr_score_scaled = 0
-            elif adr_score_raw >= 120:
-                adr_score_scaled = 100
+                scores.append(adr_score_scaled)
+                print("지표 3 (ADR) 성공: %.2f (원시값), %.2f (스케일된 값) [정확히 %d일 데이터 합산]" % (adr_score_raw, adr_score_scaled, days_found))
             else:
-                adr_score_scaled = (adr_score_raw - 70) / (120 - 70) * 100
-            
-            scores.append(adr_score_scaled)
-            print("지표 3 (ADR) 성공: %.2f (원시값), %.2f (스케일된 값) [정확히 %d일 데이터 합산]" % (adr_score_raw, adr_score_scaled, days_found))
-        else:
-            print("지표 3 (ADR) 최종 오류: 유효한 20거래일 데이터를 확보하지 못했습니다. (확보된 일수: %d일) 기본값 50 사용." % days_found)
+                print("지표 3 (ADR) 최종 오류: 유효한 20거래일 데이터를 확보하지 못했습니다. (확보된 일수: %d일) 기본값 50 사용." % days_found)
+                scores.append(50)
+        except Exception as e:
+            print("지표 3 (ADR) 최종 오류: %s" % str(e))
             scores.append(50)
-    except Exception as e:
-        print("지표 3 (ADR) 최종 오류: %s" % str(e))
-        scores.append(50)
 
-    # 지표 4: VKOSPI (변동성) - KRX API 사용
+    with telemetry.span("indicator_state.checkpoint"):
+        indicator_state.checkpoint() # 다음 실행은 새로 마감된 봉/거래일만 반영
+
+    # 지표 4, 5는 거래일 달력으로 KRX 데이터가 공개된 최근 거래일을 로컬에서 결정해 그 날짜만 요청
+    # (주말/휴장일을 하루씩 거슬러 올라가며 요청하고 1초씩 쉬던 탐색 제거)
     try:
-        vkospi_value = None
-        for i in range(10): # 지난 10일간 데이터를 시도
-            target_date = (datetime.now() - timedelta(days=i)).strftime("%Y%m%d")
-            try:
-                vkospi_value = get_vkospi_from_krx_api(target_date)
-                if vkospi_value is not None:
-                    print("지표 4 (VKOSPI): %s 데이터 사용." % target_date)
-                    break
-            except Exception as e_inner:
-                print("지표 4 (VKOSPI): %s 데이터 조회 실패. 재시도. 오류: %s" % (target_date, str(e_inner)))
-                time.sleep(1) # 짧은 지연
-
-        if vkospi_value is None:
-            print("지표 4 (VKOSPI) 최종 오류: 10일 동안 데이터를 찾지 못했습니다. 기본값 50 사용.")
-            scores.append(50)
-        else:
-            vix = vkospi_value
-            
-            # 20일 윈도우 min/max 기반 스케일링 
-            # KRX API는 일별 데이터만 제공하므로, 20일치 데이터를 얻으려면 여러 번 호출 필요
-            # 아니면 한 번에 긴 기간을 요청하는 API를 찾아야 함.
-            # 일단은 현재 가져온 1일치 VKOSPI 값으로 직접 스케일링
-            # VKOSPI의 일반적인 범위는 10~40.
-            # 10 이하: 극심한 탐욕 (100점), 40 이상: 극심한 공포 (0점)
-            if vix <= 10:
-                v_score = 100
-            elif vix >= 40:
-                v_score = 0
+        trading_calendar = TradingCalendar.from_kospi_history(kospi_history)
+    except Exception as e:
+        print(f"거래일 달력 생성 실패 (평일 기준으로 추정): {e}")
+        trading_calendar = TradingCalendar([])
+    krx_candidates = trading_calendar.latest_published(count=1 + KRX_FALLBACK_DAYS)
+    probe_metrics = {"requests": 0, "wasted": 0}
+
+    # 지표 4: VKOSPI (변동성) - 최근 20거래일 min/max 윈도우 스케일링
+    # 과거 VKOSPI는 krx_daily_store에 쌓아 두고, 저장소에 없는 날짜만 병렬로 조회
+    with telemetry.span("indicator4.vkospi"):
+        try:
+            vkospi_window = _load_vkospi_window(trading_calendar, probe_metrics)
+
+            if not vkospi_window:
+                print("지표 4 (VKOSPI) 최종 오류: 최근 거래일 %s의 데이터를 찾지 못했습니다. 기본값 50 사용." % krx_candidates)
+                scores.append(50)
             else:
-                v_score = 100 - (vix - 10) / (40 - 10) * 100 # 선형 스케일링
+                vkospi_date, vix = vkospi_window[0]
+                print("지표 4 (VKOSPI): %s 데이터 사용." % vkospi_date)
+                window_values = [v for _, v in vkospi_window]
+                window_min, window_max = min(window_values), max(window_values)
             
-            scores.append(v_score)
-            print("지표 4 (VKOSPI) 성공: %.2f (원시값), %.2f (스케일된 값)" % (vix, v_score))
-    except Exception as e:
-        print("지표 4 (VKOSPI) 오류: %s" % str(e))
-        scores.append(50)
+                if len(window_values) >= VKOSPI_MIN_WINDOW and window_max > window_min:
+                    # 20일 윈도우 min/max 기반 스케일링: 윈도우 최저(안정)면 100점, 최고(불안)면 0점
+                    v_score = scoring.vkospi_window_score(vix, window_min, window_max)
+                    print("지표 4 (VKOSPI): %d거래일 윈도우 min %.2f / max %.2f" % (len(window_values), window_min, window_max))
+                else:
+                    # 윈도우가 부족하면 VKOSPI의 일반적인 범위(10~40)로 직접 스케일링
+                    # 10 이하: 극심한 탐욕 (100점), 40 이상: 극심한 공포 (0점)
+                    print("지표 4 (VKOSPI): 윈도우 데이터 부족 또는 변동 없음 (%d거래일). 고정 범위 10~40으로 스케일링." % len(window_values))
+                    v_score = scoring.vkospi_band_score(vix)
+            
+                scores.append(v_score)
+                print("지표 4 (VKOSPI) 성공: %.2f (원시값), %.2f (스케일된 값)" % (vix, v_score))
+        except Exception as e:
+            print("지표 4 (VKOSPI) 오류: %s" % str(e))
+            scores.append(50)
     
     # 지표 5: 코스피200 옵션 풋콜 비율 - KRX API 사용
-    try:
-        put_call_ratio_raw = None
-        for i in range(10): # 지난 10일간 데이터를 시도
-            target_date = datetime.now() - timedelta(days=i)
-            target_date_str = target_date.strftime("%Y%m%d") # API 호출 및 프린트용 문자열 날짜
-            try:
-                temp_put_call_ratio_raw = get_put_call_ratio_from_krx_api(target_date_str)
-                if temp_put_call_ratio_raw is not None: 
-                    put_call_ratio_raw = temp_put_call_ratio_raw
-                    print(f"지표 5 (코스피200 옵션 풋콜 비율): {target_date_str} 데이터 사용.")
-                    break
-            except Exception as e_inner:
-                print(f"지표 5 (코스피200 옵션 풋콜 비율): {target_date_str} 데이터 조회 실패. 재시도. 오류: {e_inner}")
-                time.sleep(1)
+    with telemetry.span("indicator5.pcr"):
+        try:
+            _, put_call_ratio_raw = _fetch_on_latest_trading_day("지표 5 (코스피200 옵션 풋콜 비율)", get_put_call_ratio_from_krx_api, krx_candidates, probe_metrics)
         
-        if put_call_ratio_raw is None:
-            print("지표 5 (코스피200 옵션 풋콜 비율) 최종 오류: 10일 동안 데이터를 찾지 못했습니다. 기본값 50 사용.")
-            scores.append(50)
-        else:
-            # PCR이 100(1.0)을 기준으로 어떻게 변하는지 매핑
-            # 보통 70(탐욕) ~ 130(공포) 범위를 많이 사용하지만, 조금 더 넓은 범위를 사용합니다.
-            # 제안 (조금 더 넓은 범위): 60(탐욕) ~ 180(공포)
-            if put_call_ratio_raw <= 60:
-                put_call_score = 100
-            elif put_call_ratio_raw >= 180:
-                put_call_score = 0
+            if put_call_ratio_raw is None:
+                print("지표 5 (코스피200 옵션 풋콜 비율) 최종 오류: 최근 거래일 %s의 데이터를 찾지 못했습니다. 기본값 50 사용." % krx_candidates)
+                scores.append(50)
             else:
-                # 역비례 계산 (낮을수록 점수 높음)
-                put_call_score = 100 - (put_call_ratio_raw - 60) / (180 - 60) * 100
+                # PCR이 100(1.0)을 기준으로 어떻게 변하는지 매핑
+                # 보통 70(탐욕) ~ 130(공포) 범위를 많이 사용하지만, 조금 더 넓은 범위를 사용합니다.
+                # 제안 (조금 더 넓은 범위): 60(탐욕) ~ 180(공포), 역비례 (낮을수록 점수 높음)
+                put_call_score = scoring.put_call_score(put_call_ratio_raw)
             
-            scores.append(put_call_score)
-            print("지표 5 (코스피200 옵션 풋콜 비율) 성공: %.2f (원시값), %.2f (스케일된 값)" % (put_call_ratio_raw, put_call_score))
-    except Exception as e:
-        print("지표 5 (코스피200 옵션 풋콜 비율) 오류: %s" % str(e))
-        scores.append(50)
+                scores.append(put_call_score)
+                print("지표 5 (코스피200 옵션 풋콜 비율) 성공: %.2f (원시값), %.2f (스케일된 값)" % (put_call_ratio_raw, put_call_score))
+        except Exception as e:
+            print("지표 5 (코스피200 옵션 풋콜 비율) 오류: %s" % str(e))
+            scores.append(50)
     
+    print("지표 4, 5 KRX 조회: %d회 (불필요한 조회 %d회)" % (probe_metrics["requests"], probe_metrics["wasted"]))
+
+    # 지표 6 (선택): 뉴스 헤드라인 심리 - NEWS_FEEDS가 설정되고 최근 헤드라인이 충분할 때만 포함
+    # 새 헤드라인만 점수를 매겨 일별 합계에 더하므로 지난 헤드라인은 다시 계산하지 않음
+    if NEWS_FEEDS:
+        with telemetry.span("indicator6.news"):
+            try:
+                news = update_news_indicator(today_kst)
+                telemetry.add_stats("news", {k: news[k] for k in ("feeds", "errors", "parsed", "duplicates", "stale", "scored")})
+                print("지표 6 (뉴스 심리): 피드 %d개, 새 헤드라인 %d개 (중복 %d, 오래됨 %d, 실패 피드 %d)" % (
+                    news["feeds"], news["scored"], news["duplicates"], news["stale"], news["errors"]))
+                if news["score"] is not None:
+                    scores.append(news["score"])
+                    print("지표 6 (뉴스 심리) 성공: 최근 %d일 헤드라인 %d개, 평균 %.3f, %.2f (스케일된 값)" % (
+                        NEWS_WINDOW_DAYS, news["headlines"], news["mean_compound"], news["score"]))
+                else:
+                    print("지표 6 (뉴스 심리): 최근 %d일 헤드라인 %d개 (최소 %d개). 이번 계산에서 제외." % (
+                        NEWS_WINDOW_DAYS, news["headlines"], NEWS_MIN_HEADLINES))
+            except Exception as e:
+                print("지표 6 (뉴스 심리) 오류: %s. 이번 계산에서 제외." % str(e))
+
     # final_score = sum(scores) / len(scores) if scores else 50
-    # 가중치 적용: 지표 1: 25%, 지표 2,3,4: 20%, 지표 5: 15%
-    if len(scores) == 5:
-        final_score = (scores[0] * 0.25 + scores[1] * 0.20 + scores[2] * 0.20 + scores[3] * 0.20 + scores[4] * 0.15)
+    # 가중치 적용: 지표 1: 25%, 지표 2,3,4: 20%, 지표 5: 15% (지표 6이 있으면 scoring.WEIGHTS_WITH_NEWS)
+    if len(scores) in (len(scoring.WEIGHTS), len(scoring.WEIGHTS_WITH_NEWS)):
+        final_score = scoring.weighted_score(scores)
     else:
-        # scores 리스트의 길이가 5가 아닌 경우 (예외 발생 시) 기본값 50을 사용하거나 다른 처리 로직 추가
+        # scores 리스트의 길이가 5(또는 6)가 아닌 경우 (예외 발생 시) 기본값 50을 사용하거나 다른 처리 로직 추가
         # 현재 코드에서는 각 지표 계산 실패 시 50을 append하므로 이 else 블록에 도달할 일은 거의 없음.
-        print("경고: scores 리스트의 길이가 5가 아닙니다. 가중치 계산 대신 기본값 50을 사용합니다.")
+        print("경고: scores 리스트의 길이가 5(또는 6)가 아닙니다. 가중치 계산 대신 기본값 50을 사용합니다.")
         final_score = 50
 
     kospi_value = None
     kospi_change_rate = None
     kospi_change_point = None
     
-    for i in range(10): # 오늘부터 10일 전까지 시도
-        target_date = datetime.now() - timedelta(days=i)
-        try:
-            # [변경] '^KS11' 사용
-            df_kospi = fdr.DataReader('^KS11', start=target_date - timedelta(days=5)) # 넉넉한 과거 데이터 확보
-            if not df_kospi.empty and len(df_kospi) >= 2: # 최소 2일 데이터 필요 (현재, 이전 종가)
-                curr_close = df_kospi['Close'].iloc[-1]
-                prev_close = df_kospi['Close'].iloc[-2]
-                
-                kospi_value = round(curr_close, 2)
-                kospi_change_point = round(curr_close - prev_close, 2)
-                kospi_change_rate = round((kospi_change_point / prev_close) * 100, 2)
-                print(f"KOSPI 현재가: {kospi_value}, 등락포인트: {kospi_change_point}, 등락률: {kospi_change_rate}% (데이터 날짜: {df_kospi.index[-1].strftime('%Y-%m-%d')})")
-                break # 데이터 찾으면 루프 종료
-            else:
-                print(f"KOSPI 데이터 (KS11) {target_date.strftime('%Y%m%d')} 조회 실패: 데이터 부족. 재시도.")
-        except Exception as e:
-            print(f"KOSPI 데이터 (KS11) {target_date.strftime('%Y%m%d')} 조회 오류: {e}. 재시도.")
-        time.sleep(0.5) # 짧은 지연
+    if df is not None and len(df) >= 2: # 최소 2일 데이터 필요 (현재, 이전 종가)
+        curr_close = df['Close'].iloc[-1]
+        prev_close = df['Close'].iloc[-2]
+        
+        kospi_value = round(curr_close, 2)
+        kospi_change_point = round(curr_close - prev_close, 2)
+        kospi_change_rate = round((kospi_change_point / prev_close) * 100, 2)
+        print(f"KOSPI 현재가: {kospi_value}, 등락포인트: {kospi_change_point}, 등락률: {kospi_change_rate}% (데이터 날짜: {df.index[-1].strftime('%Y-%m-%d')})")
     
     if kospi_value is None:
-        print("KOSPI 데이터 최종 오류: 10일 동안 유효한 데이터를 찾지 못했습니다. KOSPI 값은 None으로 유지됩니다.")
+        print("KOSPI 데이터 최종 오류: 유효한 데이터를 찾지 못했습니다. KOSPI 값은 None으로 유지됩니다.")
+
+    telemetry.add_stats("krx_probe", probe_metrics)
+    if kospi_history.cache is not None:
+        telemetry.add_stats("ohlcv_cache", kospi_history.cache.stats)
 
     return int(final_score), scores, kospi_value, kospi_change_point, kospi_change_rate
 
@@ -447,182 +538,314 @@ def get_status(score):
 
 # [추가] 제미나이 리포트 생성 함수 (이름/정책 변화에 무관한 자동화 버전)
 # [교체할 부분] 제미나이 리포트 생성 함수
-def generate_gemini_report(data):
+def build_gemini_report_job(data):
+    """KOSPI 리포트 생성 작업(ReportJob)을 만듭니다. GEMINI_API_KEY가 없으면 None."""
     from google import genai 
     from google.genai import types
     
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         print("에러: GEMINI_API_KEY 환경변수가 없습니다.")
-        return
-
-    try:
-        # 1. 클라이언트 설정 (사용자님이 찾으신 문서 방식)
-        client = genai.Client(
-            api_key=api_key,
-            http_options=types.HttpOptions(api_version='v1beta') # 버전 명시로 404 방지
-        )
-        
-        # 2. [자동화] 내 계정에서 사용 가능한 모델 목록 확인
-        all_models = client.models.list()
-        capable_models = [m for m in all_models if 'gemini' in m.name.lower()]
-        
-        if not capable_models:
-            raise Exception("사용 가능한 Gemini 모델을 찾을 수 없습니다.")
-
-        # 이름에 'flash'가 포함된 모델을 우선 선택 (없으면 첫 번째 모델)
-        target_model = next((m.name for m in capable_models if 'flash' in m.name.lower()), capable_models[0].name)
-        print(f"시스템 자동 감지 모델 사용: {target_model}")
-
-        # 3. 프롬프트 준비 (기존 파일 읽기)
-        prompt_template = ""
-        if os.path.exists('advisor_set.txt'):
-            with open('advisor_set.txt', 'r', encoding='utf-8') as f:
-                prompt_template = f.read()
-        
-        # 한국 시간 생성
-        now = datetime.utcnow() + timedelta(hours=9)
-        now_str = now.strftime("%Y. %m. %d. %p %I:%M").replace("AM", "오전").replace("PM", "오후")
-
-        # 최종 프롬프트 구성 (JSON 통째로 전달)
-        final_prompt = f"""
-        {prompt_template}
-
-        [분석할 실시간 데이터]
-        {json.dumps(data, ensure_ascii=False, indent=2)}
-
-        [기준 시간]
-        {now_str}
-
-        [데이터 매칭 지침]
-        1. 헤더 섹션의 KOSPI {{지수}} 위치에는 JSON의 'kospi_value'를 사용합니다.
-        2. {{현재시간}} 위치에는 '{now_str}'을 기입하세요.
-        3 테이블의 5개 지표는 JSON의 'individual_scores' 배열 순서와 같습니다:
-            - score[0]: 1. TDI(125일)
-            - score[1]: 2. RSI(14일)
-            - score[2]: 3. ADR
-            - score[3]: 4. VKOSPI
-            - score[4]: 5. PCR
-        4. **숫자 표기 (매우 중요)**: 
-            - 모든 점수는 JSON에 제공된 그대로 **소수점 둘째 자리까지(예: 45.20, 80.00)** 하나도 빠짐없이 표기하세요.
-            - 점수가 정수(예: 80)로 되어 있더라도 반드시 '80.00'과 같은 형식으로 출력해야 합니다.
-        5. **색상 클래스 지정 (중요)**:
-            - 점수가 20점을 미만이면, 해당 행의 점수와 상태에 'text-red-400' 클래스를 부여하세요.
-            - 점수가 40점 미만이면, 'text-orange-400' 클래스를 부여하세요.
-            - 점수가 60점 미만이면, 'text-yellow-400' 클래스를 부여하세요.
-            - 점수가 80점 미만이면, 'text-emerald-500' 클래스를 부여하세요.
-            - 그 외 구간은 'text-primary' 클래스를 부여하세요.
-        6. **심리 상태 키워드 생성**:
-            - 각 지표의 '상태' 칸에 단순히 '극단적 공포', '공포', '중립', '극심한 탐욕'만 적어도 되지만, 점수를 해석하여 [상태/심리] 형식으로 풍성하게 표현하세요.
-            - 0에 가까울수록 극단적 공포, 100에 가까울수록 극심한 탐욕인 점은 참고하세요.
-            - 각 지표의 특성(RSI는 과매수/과매도, VKOSPI는 불안/안정 등)에 맞게 창의적으로 짧게 적어주세요.    
-        7. 디자인 유지: 원본 디자인의 모든 Tailwind CSS 클래스를 절대 생략하지 마세요.
-        8. **수치와 설명이 논리적으로 일치하는지 마지막으로 한 번 더 검토하고 출력해줘. (매우 중요)**
-        """
-        
-        # 4. 결정된 모델로 콘텐츠 생성
-        response = client.models.generate_content(
-            model=target_model, 
-            contents=final_prompt
-        )
-        
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # 결과에서 불필요한 마크다운 제거
-        html_content = f"\n" + response.text.replace('```html', '').replace('```', '').strip()
+        return None
 
-        # 5. 파일 저장 (public/gemini_adv.html)
-        public_dir = os.path.join(os.getcwd(), 'public')
-        if not os.path.exists(public_dir): os.makedirs(public_dir)
-        
-        file_path = os.path.join(public_dir, 'gemini_adv.html')
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"Gemini 리포트 생성 및 저장 성공: {file_path}")
+    # 1. 클라이언트 설정 (사용자님이 찾으신 문서 방식)
+    client = genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(api_version='v1beta') # 버전 명시로 404 방지
+    )
+    
+    # 2. 사용할 모델 결정 (GEMINI_MODEL 지정 > 디스크 캐시 > 모델 목록에서 'flash' 우선 선택)
+    # 모델 목록은 캐시가 없거나 만료됐을 때, 또는 캐시된 모델이 NOT_FOUND일 때만 조회
+    models = ModelResolver(client)
+
+    # 3. 프롬프트 준비 (기존 파일 읽기)
+    prompt_template = ""
+    if os.path.exists('advisor_set.txt'):
+        with open('advisor_set.txt', 'r', encoding='utf-8') as f:
+            prompt_template = f.read()
+    
+    # 한국 시간 생성
+    now = datetime.utcnow() + timedelta(hours=9)
+    now_str = format_updated(now, "ko")
+
+    # 최종 프롬프트 구성 (JSON 통째로 전달, 모델은 서술 문장 JSON만 생성)
+    final_prompt = f"""
+    {prompt_template}
+
+    [분석할 실시간 데이터]
+    {json.dumps(data, ensure_ascii=False, indent=2)}
+
+    [기준 시간]
+    {now_str}
+
+    [서술 지침]
+    1. 'indicator_scores'는 순서대로 TDI(125일), RSI(14일), ADR, VKOSPI, PCR 점수이며 (6번째 값이 있으면 뉴스 헤드라인 심리), indicators 항목도 같은 개수와 순서로 작성하세요.
+    2. **심리 상태 키워드 생성**:
+        - 각 지표의 status에 단순히 '극단적 공포', '공포', '중립', '극심한 탐욕'만 적어도 되지만, 점수를 해석하여 [상태/심리] 형식으로 풍성하게 표현하세요.
+        - 0에 가까울수록 극단적 공포, 100에 가까울수록 극심한 탐욕인 점은 참고하세요.
+        - 각 지표의 특성(RSI는 과매수/과매도, VKOSPI는 불안/안정 등)에 맞게 창의적으로 짧게 적어주세요.
+    3. 점수와 지수 값은 표와 헤더에 자동으로 표시되므로, 문장에서 언급할 때는 데이터의 값과 정확히 일치해야 합니다.
+    4. **수치와 설명이 논리적으로 일치하는지 마지막으로 한 번 더 검토하고 출력해줘. (매우 중요)**
+    """
+    
+    # 4. 저장 경로 (public/gemini_adv.html, public/gemini_adv_ko_en.html)와 번역 프롬프트
+    public_dir = os.path.join(os.getcwd(), 'public')
+    translate_prompt = ""
+    if os.path.exists('translate_prompt.txt'):
+        with open('translate_prompt.txt', 'r', encoding='utf-8') as f:
+            translate_prompt = f.read()
+
+    return ReportJob(
+        label="KOSPI",
+        models=models,
+        prompt=final_prompt,
+        ko_path=os.path.join(public_dir, 'gemini_adv.html'),
+        bilingual_path=os.path.join(public_dir, 'gemini_adv_ko_en.html'),
+        translate_prompt=translate_prompt,
+        # 표/점수/색상/헤더는 fng.report_template에서 렌더링
+        render=lambda text, lang: render_kospi_report(data, parse_narrative(text, len(data["indicator_scores"])), now, lang),
+        config={"response_mime_type": "application/json"},
+        # 입력 데이터와 프롬프트 파일이 그대로면 직전 리포트 재사용 (휴장일 등)
+        cache_key=report_key(data, ['advisor_set.txt', 'translate_prompt.txt']),
+    )
 
-        # [추가] 다국어 버전(KO/EN) 생성 로직
-        try:
-            translate_prompt = ""
-            if os.path.exists('translate_prompt.txt'):
-                with open('translate_prompt.txt', 'r', encoding='utf-8') as f:
-                    translate_prompt = f.read()
-            
-            if translate_prompt:
-                print("다국어 버전 생성을 위한 번역 요청 중...")
-                # 제미나이에게 번역 요청
-                translation_response = client.models.generate_content(
-                    model=target_model,
-                    contents=f"{translate_prompt}\n\n[번역할 HTML]\n{html_content}"
-                )
-                english_html = translation_response.text.replace('```html', '').replace('```', '').strip()
-                
-                # 한국어와 영어를 각각의 div로 감싸서 합치기
-                bilingual_content = f"""
-<div class="lang-ko">
-{html_content}
-</div>
-<div class="lang-en">
-{english_html}
-</div>
-"""
-                bilingual_file_path = os.path.join(public_dir, 'gemini_adv_ko_en.html')
-                with open(bilingual_file_path, 'w', encoding='utf-8') as f:
-                    f.write(bilingual_content)
-                print(f"다국어 리포트 생성 및 저장 성공: {bilingual_file_path}")
-        except Exception as e:
-            print(f"다국어 리포트 생성 중 에러 발생: {e}")
 
+def generate_gemini_report(data):
+    """
+    한국어 리포트를 스트리밍으로 생성해 저장하고, 영어 버전은 동시에 생성해 다국어 파일로 저장합니다.
+    (fng.report_pipeline 참고, 단계별 소요 시간 출력)
+    """
+    try:
+        run_reports([build_gemini_report_job(data)])
     except Exception as e:
         print(f"Gemini 리포트 생성 중 에러 발생: {e}")
 
 
-# 실행 및 Firestore 저장
-score, individual_scores, kospi_value, kospi_change_point, kospi_change_rate = get_scores()
-status_obj = get_status(score) # Changed to status_obj
+def _as_float(value):
+    return None if value is None else float(value)
+
+
+def build_index_snapshot(kospi_history=None):
+    """
+    get_scores 결과를 리포트 생성, GITHUB_OUTPUT, /kr/index 서비스가 공통으로 쓰는 dict로 만듭니다.
+    numpy 실수는 JSON 직렬화를 위해 float로 변환합니다.
+    """
+    return _index_snapshot(*get_scores(kospi_history))
+
+
+def _index_snapshot(score, individual_scores, kospi_value, kospi_change_point, kospi_change_rate):
+    status_obj = get_status(score)
+    return {
+        "final_score": score,
+        "status_phase": status_obj["phase"],
+        "status_description": status_obj["description"],
+        "kospi_value": _as_float(kospi_value),
+        "kospi_change_point": _as_float(kospi_change_point),
+        "kospi_change_rate": _as_float(kospi_change_rate),
+        "indicator_scores": [float(s) for s in individual_scores] # individual_scores로 변경하여 프롬프트와 맞춤
+    }
 
-# 중괄호를 피하기 위해 dict() 생성자 사용
-data_to_save = dict(
-    score=score,
-    timestamp=firestore.SERVER_TIMESTAMP,
-    kospi_value=kospi_value,
-    kospi_change_point=kospi_change_point,
-    kospi_change_rate=kospi_change_rate
-)
 
-for i, s in enumerate(individual_scores):
-    # f-string 대신 문자열 결합 사용
-    key_name = "indicator" + str(i + 1)
-    data_to_save[key_name] = s
+# 장중 갱신: KRX 정규장 동안 N분마다 지수를 다시 계산 (main.py의 /kr/index 서비스, KR_INDEX_REFRESH_MINUTES)
+# - 날짜가 바뀌면 한 번 전체 get_scores로 기준값을 만들고, 지표 3~6과 마감된 봉까지의 rolling 상태를 보관
+# - 장중에는 ^KS11 최근 봉만 다시 받아 당일 미확정 종가로 지표 1, 2와 KOSPI 현재가만 다시 계산
+# - KRX 일별 데이터(ADR, VKOSPI, 풋콜)는 다음 영업일 아침에 공개되므로 장중 값이 없음.
+#   기준값을 만들 때 최근 공개 거래일 데이터가 아직 없으면 INTRADAY_KRX_RETRY_MINUTES 뒤에 기준값을 다시 만듦
+# - Firestore에는 직전에 쓴 값과 달라진 필드만 korea_index_live/latest 문서에 병합해서 씀
+INTRADAY_LOOKBACK_DAYS = 10 # 장중 갱신에서 받는 ^KS11 구간 (당일 봉 + 연휴를 넘는 직전 거래일)
+INTRADAY_KRX_RETRY_MINUTES = float(os.environ.get("INTRADAY_KRX_RETRY_MINUTES", "30"))
+LIVE_COLLECTION = 'korea_index_live'
+LIVE_DOCUMENT = 'latest'
 
 
-print("저장 완료: %d점 (%s)" % (score, status_obj["phase"])) # Print phase
-formatted_scores = [format(s, ".2f") for s in individual_scores]
-print("개별 지표: %s" % formatted_scores)
+class IntradayIndex:
+    """
+    refresh()를 주기적으로 호출하면 build_index_snapshot()과 같은 형식의 dict를 반환합니다.
+    장 시간이 아니면 네트워크 요청 없이 직전 스냅샷을 그대로 반환합니다.
+    db: Firestore 클라이언트 (None이면 쓰지 않음), reader: ^KS11 조회 함수 (KospiHistory의 reader)
+    stats: baselines(전체 계산), live_updates(장중 재계산), writes(Firestore 쓰기), fields_written
+    """
 
-if firestore_initialized:
+    def __init__(self, db=None, reader=None):
+        self.db = db
+        self.reader = reader
+        self.snapshot = None
+        self.stats = {"baselines": 0, "live_updates": 0, "writes": 0, "fields_written": 0}
+        self._day = None
+        self._state = None
+        self._calendar = None
+        self._krx_retry_at = None # 최근 공개 거래일의 KRX 데이터가 빠져 있으면 기준값을 다시 만들 시각
+        self._written = {}
+
+    def _history(self, **kwargs):
+        if self.reader is not None:
+            kwargs["reader"] = self.reader
+        return KospiHistory(**kwargs)
+
+    def _prepare(self, now):
+        """전체 get_scores로 기준 스냅샷과 rolling 상태를 만듭니다."""
+        with telemetry.span("intraday.baseline"):
+            kospi_history = self._history(cache=OhlcvCache())
+            self.snapshot = build_index_snapshot(kospi_history)
+            self._state = IndicatorState.restore() # get_scores가 마감된 봉/거래일까지 반영해 저장한 상태
+            try:
+                self._calendar = TradingCalendar.from_kospi_history(kospi_history)
+            except Exception as e:
+                print(f"거래일 달력 생성 실패 (평일 기준으로 추정): {e}")
+                self._calendar = TradingCalendar([])
+        self._day = now.strftime('%Y%m%d')
+        self.stats["baselines"] += 1
+
+        published = self._calendar.latest_published(count=1, now=now)
+        record = krx_daily_store.get(published[0]) if published else None
+        complete = (record is not None and record["vkospi"] is not None and record["put_vol"] is not None
+                    and self._state.breadth_last_date == published[0])
+        self._krx_retry_at = None if complete else now + timedelta(minutes=INTRADAY_KRX_RETRY_MINUTES)
+        if not complete:
+            print("장중 갱신: 최근 공개 거래일 %s의 KRX 데이터가 없어 %s에 기준값을 다시 계산합니다." % (
+                published[0] if published else None, self._krx_retry_at.strftime('%H:%M')))
+
+    def _live(self):
+        """^KS11 최근 봉만 받아 당일 종가로 지표 1, 2와 KOSPI 현재가를 다시 계산합니다 (지표 3~6은 기준값 유지)."""
+        with telemetry.span("intraday.live"):
+            try:
+                df = self._history(lookback_days=INTRADAY_LOOKBACK_DAYS, max_retries=2).get()
+            except Exception as e:
+                print(f"장중 갱신: KOSPI 최근 봉 조회 오류 ({e}). 직전 스냅샷을 유지합니다.")
+                df = None
+        if df is None or df.empty:
+            return
+        if df.index[-1].strftime('%Y%m%d') != self._day or self._state.last_close is None:
+            return # 당일 봉이 아직 없음 (장 시작 직후, 임시 휴장 등)
+
+        curr_close = df['Close'].iloc[-1]
+        scores = list(self.snapshot["indicator_scores"])
+        ma125 = self._state.ma(curr_close)
+        if ma125 is not None:
+            scores[0] = scoring.ma_gap_score(curr_close, ma125)
+        rsi_value = self._state.rsi(curr_close)
+        if rsi_value is not None:
+            scores[1] = rsi_value
+        if len(scores) in (len(scoring.WEIGHTS), len(scoring.WEIGHTS_WITH_NEWS)):
+            final_score = scoring.weighted_score(scores)
+        else:
+            final_score = 50
+
+        # get_scores와 같은 반올림 (등락률은 반올림한 등락포인트로 계산)
+        prev_close = self._state.last_close
+        kospi_value = round(curr_close, 2)
+        kospi_change_point = round(curr_close - prev_close, 2)
+        kospi_change_rate = round((kospi_change_point / prev_close) * 100, 2)
+        self.snapshot = _index_snapshot(int(final_score), scores, kospi_value, kospi_change_point, kospi_change_rate)
+        self.stats["live_updates"] += 1
+
+    def _write(self, now):
+        """직전에 쓴 값과 달라진 필드만 Firestore 실시간 문서에 병합합니다."""
+        if self.db is None or self.snapshot is None:
+            return
+        fields = {
+            "score": self.snapshot["final_score"],
+            "status_phase": self.snapshot["status_phase"],
+            "kospi_value": self.snapshot["kospi_value"],
+            "kospi_change_point": self.snapshot["kospi_change_point"],
+            "kospi_change_rate": self.snapshot["kospi_change_rate"],
+        }
+        for i, s in enumerate(self.snapshot["indicator_scores"]):
+            fields["indicator" + str(i + 1)] = round(s, 4)
+        for key in self._written:
+            fields.setdefault(key, None) # 빠진 지표(예: 뉴스 심리 제외)는 None으로
+        changed = {k: v for k, v in fields.items() if k not in self._written or self._written[k] != v}
+        if not changed:
+            return
+        with telemetry.span("intraday.write", fields=len(changed)):
+            try:
+                doc = dict(changed, date=self._day, updated_at=now.strftime('%Y-%m-%dT%H:%M:%S+09:00'))
+                self.db.collection(LIVE_COLLECTION).document(LIVE_DOCUMENT).set(doc, merge=True)
+            except Exception as e:
+                print(f"장중 지수 Firestore 저장 중 오류 발생: {e}")
+                return
+        self._written.update(changed)
+        self.stats["writes"] += 1
+        self.stats["fields_written"] += len(changed)
+
+    def refresh(self, now=None):
+        now = now or kst_now()
+        if self._day != now.strftime('%Y%m%d') or (self._krx_retry_at is not None and now >= self._krx_retry_at):
+            self._prepare(now)
+        elif is_market_hours(now, self._calendar):
+            self._live()
+        self._write(now)
+        return self.snapshot
+
+
+def main():
+    """실행 및 Firestore 저장 (GitHub Actions: python korea_fear_greed.py)"""
+    from firebase_admin import firestore
+
+    with telemetry.span("get_scores"):
+        output_data = build_index_snapshot()
+    score = output_data["final_score"]
+    individual_scores = output_data["indicator_scores"]
+
+    # 중괄호를 피하기 위해 dict() 생성자 사용
+    data_to_save = dict(
+        score=score,
+        timestamp=firestore.SERVER_TIMESTAMP,
+        kospi_value=output_data["kospi_value"],
+        kospi_change_point=output_data["kospi_change_point"],
+        kospi_change_rate=output_data["kospi_change_rate"]
+    )
+
+    for i, s in enumerate(individual_scores):
+        # f-string 대신 문자열 결합 사용
+        key_name = "indicator" + str(i + 1)
+        data_to_save[key_name] = s
+
+
+    print("저장 완료: %d점 (%s)" % (score, output_data["status_phase"])) # Print phase
+    formatted_scores = [format(s, ".2f") for s in individual_scores]
+    print("개별 지표: %s" % formatted_scores)
+
+    # 월별 요약 문서(korea_index_history)와 정적 이력에는 서버 타임스탬프 대신 KST 날짜를 키로 기록
+    date_str = kst_now().strftime('%Y%m%d')
+    history_entry = {k: v for k, v in data_to_save.items() if k != 'timestamp'}
+
+    with telemetry.span("firestore"):
+        db = get_firestore()
+        if db is not None:
+            try:
+                with IndexWriter(db, 'korea_index') as writer:
+                    writer.add(data_to_save, date_str, history=history_entry)
+                print("Firestore에 데이터 저장 완료.")
+                telemetry.add_stats("firestore", writer.stats)
+            except Exception as e:
+                print(f"Firestore에 데이터 저장 중 오류 발생: {e}")
+        else:
+            print("Firestore가 초기화되지 않아 데이터 저장을 건너뜁니다.")
+
+    # 정적 데이터 갱신 (워크플로가 public/에 커밋 -> Firebase Hosting CDN에서 제공)
+    # 이력 파일이 아직 없으면 Firestore 월별 요약 문서로 시작
+    with telemetry.span("static_export"):
+        try:
+            latest = dict(history_entry, timestamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'))
+            seed = (lambda: read_history(db, 'korea_index', '0000-00', '9999-99')) if db is not None else None
+            StaticExporter('korea_index').update(latest, date_str, history_entry, seed=seed)
+        except Exception as e:
+            print(f"정적 데이터 갱신 중 오류 발생: {e}")
+
+    # [추가] 제미나이 리포트 생성 실행
+    generate_gemini_report(output_data)
+
+    # Print data in JSON format for GitHub Actions
+    if 'GITHUB_OUTPUT' in os.environ:
+        with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+            f.write(f"advisor_data={json.dumps(output_data)}\n")
+
+
+if __name__ == "__main__":
+    # FNG_PROFILE=cprofile|pyinstrument이면 전체 실행을 프로파일링 (.cache/profile/)
     try:
-        db.collection('korea_index').add(data_to_save)
-        print("Firestore에 데이터 저장 완료.")
-    except Exception as e:
-        print(f"Firestore에 데이터 저장 중 오류 발생: {e}")
-else:
-    print("Firestore가 초기화되지 않아 데이터 저장을 건너뜁니다.")
-
-
-# Print data in JSON format for GitHub Actions
-output_data = {
-    "final_score": score,
-    "status_phase": status_obj["phase"],
-    "status_description": status_obj["description"],
-    "kospi_value": kospi_value,
-    "kospi_change_point": kospi_change_point,
-    "kospi_change_rate": kospi_change_rate,
-    "indicator_scores": individual_scores # individual_scores로 변경하여 프롬프트와 맞춤
-}
-
-# [추가] 제미나이 리포트 생성 실행
-generate_gemini_report(output_data)
-
-if 'GITHUB_OUTPUT' in os.environ:
-    with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
-        f.write(f"advisor_data={json.dumps(output_data)}\n")
\ No newline at end of file
+        with telemetry.profiled("korea_fear_greed"):
+            main()
+    finally:
+        telemetry.get_telemetry().write() # 성공/실패와 관계없이 단계별 시간/카운터 요약 저장
@@ -1,12 +1,25 @@
 import os
 import json
+import random
 import firebase_admin
 from firebase_admin import credentials, firestore
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 import fear_and_greed
 from google import genai 
 from google.genai import types
+from fng.http_client import get_client
+from fng.us_inputs import fetch_us_inputs
+from fng.snapshot import SnapshotStore, SnapshotRefresher
+from fng.firestore_writer import IndexWriter, read_history
+from fng.static_export import StaticExporter
+from fng.gemini_models import ModelResolver
+from fng.report_pipeline import ReportJob, run_reports
+from fng.report_template import format_updated, parse_narrative, render_snp_report
+from fng.report_cache import report_key
+from fng.sentiment import get_model as get_sentiment_model
+from fng import telemetry
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -26,16 +39,36 @@ if key_dict:
 else:
     db = None 
 
+US_EASTERN = ZoneInfo("America/New_York")
+
+# FRED API 주소 (FRED_BASE_URL: 오프라인 벤치마크의 로컬 스텁 등)
+FRED_BASE_URL = os.environ.get("FRED_BASE_URL", "https://api.stlouisfed.org/fred/")
+
+def _fetch_cnn_graphdata():
+    # fear_and_greed 기본 Fetcher는 타임아웃 없이 requests.get을 호출하므로, 공용 HTTP 클라이언트(타임아웃, 재시도)로 받음
+    headers = {"User-Agent": random.choice(fear_and_greed.cnn.USER_AGENTS)}
+    return get_client().get(fear_and_greed.cnn.URL, headers=headers).json()
+
+def get_cnn_fng():
+    return fear_and_greed.get(fetcher=_fetch_cnn_graphdata)
+
 def get_fred_data(series_id):
     api_key = os.environ.get("FRED_API_KEY")
     if not api_key:
         print(f"Warning: FRED_API_KEY not set. Cannot fetch {series_id}")
         return None
     
-    url = f"https://api.stlouisfed.org/fred/series/observations?series_id={series_id}&api_key={api_key}&file_type=json&sort_order=desc&limit=1"
+    url = FRED_BASE_URL + "series/observations"
+    params = {
+        "series_id": series_id,
+        "api_key": api_key,
+        "file_type": "json",
+        "sort_order": "desc",
+        "limit": 1
+    }
     try:
-        import requests
-        response = requests.get(url)
+        # 공용 HTTP 클라이언트: keep-alive 연결 재사용, 타임아웃, 429/5xx 재시도
+        response = get_client().get(url, params=params)
         data = response.json()
         if 'observations' in data and data['observations']:
             obs = data['observations'][0]
@@ -47,139 +80,103 @@ def get_fred_data(series_id):
         print(f"Error fetching FRED data for {series_id}: {e}")
     return None
 
-def generate_gemini_snp_report(data):
+def build_gemini_snp_report_job(data):
+    """S&P 500 리포트 생성 작업(ReportJob)을 만듭니다. GEMINI_API_KEY가 없으면 None."""
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         print("에러: GEMINI_API_KEY 환경변수가 없습니다.")
-        return
+        return None
 
-    try:
-        # 1. 클라이언트 설정
-        client = genai.Client(
-            api_key=api_key,
-            http_options=types.HttpOptions(api_version='v1beta')
-        )
-        
-        # 2. 모델 감지
-        all_models = client.models.list()
-        capable_models = [m for m in all_models if 'gemini' in m.name.lower()]
-        if not capable_models:
-            raise Exception("사용 가능한 Gemini 모델을 찾을 수 없습니다.")
-
-        target_model = next((m.name for m in capable_models if 'flash' in m.name.lower()), capable_models[0].name)
-        print(f"S&P 500 분석 시스템 자동 감지 모델 사용: {target_model}")
-
-        # 3. 프롬프트 준비
-        prompt_template = ""
-        if os.path.exists('advisor_snp_set.txt'):
-            with open('advisor_snp_set.txt', 'r', encoding='utf-8') as f:
-                prompt_template = f.read()
-        
-        now = datetime.utcnow() + timedelta(hours=9)
-        now_str = now.strftime("%Y. %m. %d. %p %I:%M").replace("AM", "오전").replace("PM", "오후")
-
-        # 안전하게 데이터를 가져오기 위한 헬퍼
-        def safe_get(key):
-            val = data.get(key)
-            return val if isinstance(val, dict) else {}
-
-        # 최종 프롬프트 구성 (FRED 지표 포함)
-        final_prompt = f"""
-        {prompt_template}
-
-        [분석할 실시간 데이터]
-        - CNN Fear & Greed: {data.get('fng_score', 'N/A')} ({data.get('fng_description', 'N/A')})
-        - Economic Indicators (FRED):
-          * FED FUNDS RATE: {safe_get('fedfunds').get('value', 'N/A')}% (as of {safe_get('fedfunds').get('date', 'N/A')})
-          * VIX: {safe_get('vix').get('value', 'N/A')} (as of {safe_get('vix').get('date', 'N/A')})
-          * Non-farm Payrolls: {safe_get('payems').get('value', 'N/A')} (as of {safe_get('payems').get('date', 'N/A')})
-          * Unemployment Rate: {safe_get('unrate').get('value', 'N/A')}% (as of {safe_get('unrate').get('date', 'N/A')})
-          * 10-Year Treasury Yield: {safe_get('dgs10').get('value', 'N/A')}% (as of {safe_get('dgs10').get('date', 'N/A')})
-          * S&P 500 Index: {safe_get('sp500').get('value', 'N/A')} (as of {safe_get('sp500').get('date', 'N/A')})
-
-        [기준 시간]
-        {now_str}
-
-        [데이터 매칭 지침]
-        1. 헤더 섹션의 S&P500 {{지수}} 위치에는 JSON의 S&P 500 Index 'value'를 사용합니다.
-        2. {{현재시간}} 위치에는 '{now_str}'을 기입하세요.
-        3. 디자인 유지: 원본 디자인의 모든 Tailwind CSS 클래스를 절대 생략하지 마세요.
-        4. **제공된 FRED 경제 지표들(금리, VIX, 고용 등)을 분석 내용에 적극 반영하여 전문적인 인사이트를 제공하세요.**
-        5. **금리와 고용 지표는 제공된 날짜를 확인하여 최신 상태인지 언급하세요.**
-        6. **수치와 설명이 논리적으로 일치하는지 마지막으로 한 번 더 검토하고 출력해줘. (매우 중요)**
-        """
-        
-        response = client.models.generate_content(
-            model=target_model, 
-            contents=final_prompt
-        )
-        
-        html_content = "\n" + response.text.replace('```html', '').replace('```', '').strip()
+    # 1. 클라이언트 설정
+    client = genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(api_version='v1beta')
+    )
+    
+    # 2. 모델 결정 (GEMINI_MODEL 지정 > 디스크 캐시 > 모델 목록, NOT_FOUND일 때만 다시 조회)
+    models = ModelResolver(client)
 
-        # 4. 파일 저장
-        public_dir = os.path.join(os.getcwd(), 'public')
-        if not os.path.exists(public_dir): os.makedirs(public_dir)
-        
-        file_path = os.path.join(public_dir, 'gemini_snp_adv.html')
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"Gemini S&P 500 리포트 생성 및 저장 성공: {file_path}")
+    # 3. 프롬프트 준비
+    prompt_template = ""
+    if os.path.exists('advisor_snp_set.txt'):
+        with open('advisor_snp_set.txt', 'r', encoding='utf-8') as f:
+            prompt_template = f.read()
+    
+    now = datetime.utcnow() + timedelta(hours=9)
+    now_str = format_updated(now, "ko")
 
-        # 5. 다국어 버전 생성
-        try:
-            translate_prompt = ""
-            if os.path.exists('translate_prompt.txt'):
-                with open('translate_prompt.txt', 'r', encoding='utf-8') as f:
-                    translate_prompt = f.read()
-            
-            if translate_prompt:
-                print("미국 시장 리포트 다국어 번역 요청 중...")
-                translation_response = client.models.generate_content(
-                    model=target_model,
-                    contents=f"{translate_prompt}\n\n[번역할 HTML]\n{html_content}"
-                )
-                english_html = translation_response.text.replace('```html', '').replace('```', '').strip()
-                
-                bilingual_content = f"""
-<div class="lang-ko">
-{html_content}
-</div>
-<div class="lang-en">
-{english_html}
-</div>
-"""
-                bilingual_file_path = os.path.join(public_dir, 'gemini_snp_adv_ko_en.html')
-                with open(bilingual_file_path, 'w', encoding='utf-8') as f:
-                    f.write(bilingual_content)
-                print(f"다국어 S&P 500 리포트 생성 및 저장 성공: {bilingual_file_path}")
-        except Exception as e:
-            print(f"다국어 리포트 생성 중 에러 발생: {e}")
+    # 안전하게 데이터를 가져오기 위한 헬퍼
+    def safe_get(key):
+        val = data.get(key)
+        return val if isinstance(val, dict) else {}
+
+    # 최종 프롬프트 구성 (FRED 지표 포함, 모델은 서술 문장 JSON만 생성)
+    final_prompt = f"""
+    {prompt_template}
+
+    [분석할 실시간 데이터]
+    - CNN Fear & Greed: {data.get('fng_score', 'N/A')} ({data.get('fng_description', 'N/A')})
+    - Economic Indicators (FRED):
+      * FED FUNDS RATE: {safe_get('fedfunds').get('value', 'N/A')}% (as of {safe_get('fedfunds').get('date', 'N/A')})
+      * VIX: {safe_get('vix').get('value', 'N/A')} (as of {safe_get('vix').get('date', 'N/A')})
+      * Non-farm Payrolls: {safe_get('payems').get('value', 'N/A')} (as of {safe_get('payems').get('date', 'N/A')})
+      * Unemployment Rate: {safe_get('unrate').get('value', 'N/A')}% (as of {safe_get('unrate').get('date', 'N/A')})
+      * 10-Year Treasury Yield: {safe_get('dgs10').get('value', 'N/A')}% (as of {safe_get('dgs10').get('date', 'N/A')})
+      * S&P 500 Index: {safe_get('sp500').get('value', 'N/A')} (as of {safe_get('sp500').get('date', 'N/A')})
+
+    [기준 시간]
+    {now_str}
 
+    [서술 지침]
+    1. **제공된 FRED 경제 지표들(금리, VIX, 고용 등)을 분석 내용에 적극 반영하여 전문적인 인사이트를 제공하세요.**
+    2. **금리와 고용 지표는 제공된 날짜를 확인하여 최신 상태인지 언급하세요.**
+    3. **수치와 설명이 논리적으로 일치하는지 마지막으로 한 번 더 검토하고 출력해줘. (매우 중요)**
+    """
+    
+    # 4. 저장 경로 (public/gemini_snp_adv.html, public/gemini_snp_adv_ko_en.html)와 번역 프롬프트
+    public_dir = os.path.join(os.getcwd(), 'public')
+    translate_prompt = ""
+    if os.path.exists('translate_prompt.txt'):
+        with open('translate_prompt.txt', 'r', encoding='utf-8') as f:
+            translate_prompt = f.read()
+
+    return ReportJob(
+        label="S&P 500",
+        models=models,
+        prompt=final_prompt,
+        ko_path=os.path.join(public_dir, 'gemini_snp_adv.html'),
+        bilingual_path=os.path.join(public_dir, 'gemini_snp_adv_ko_en.html'),
+        translate_prompt=translate_prompt,
+        # 헤더(S&P 500 지수, 업데이트 시간)와 섹션 마크업은 fng.report_template에서 렌더링
+        render=lambda text, lang: render_snp_report(data, parse_narrative(text), now, lang),
+        config={"response_mime_type": "application/json"},
+        # 입력 데이터와 프롬프트 파일이 그대로면 직전 리포트 재사용 (휴장일 등)
+        cache_key=report_key(data, ['advisor_snp_set.txt', 'translate_prompt.txt']),
+    )
+
+def generate_gemini_snp_report(data):
+    """한국어 리포트는 스트리밍으로 저장하고 영어 버전은 동시에 생성합니다 (fng.report_pipeline)."""
+    try:
+        run_reports([build_gemini_snp_report_job(data)])
     except Exception as e:
         print(f"Gemini S&P 500 리포트 생성 중 에러 발생: {e}")
 
 def update_fng():
     if db:
-        # 1. CNN F&G 데이터 수집
-        index_data = fear_and_greed.get()
-        print(f"CNN FNG 수집 완료: {index_data.value}")
-
-        # 2. FRED 경제 지표 수집
-        fred_indicators = {
-            'fedfunds': get_fred_data('FEDFUNDS'),
-            'vix': get_fred_data('VIXCLS'),
-            'payems': get_fred_data('PAYEMS'),
-            'unrate': get_fred_data('UNRATE'),
-            'dgs10': get_fred_data('DGS10'),
-            'sp500': get_fred_data('SP500')
-        }
-        print("FRED 경제 지표 수집 완료")
+        # 1~2. CNN F&G 데이터와 FRED 경제 지표를 동시에 수집 (전체 마감 시간 내 실패/지연 항목은 None)
+        with telemetry.span("us_inputs"):
+            inputs = fetch_us_inputs(get_cnn_fng, get_fred_data)
+        index_data = inputs.fng
+        fred_indicators = inputs.fred_indicators()
+        fng_value = index_data.value if index_data is not None else None
+        fng_description = index_data.description if index_data is not None else None
+        print(f"CNN FNG 수집 완료: {fng_value}")
+        print(f"FRED 경제 지표 수집 완료 ({inputs.elapsed:.2f}초, 누락: {inputs.missing() or '없음'})")
 
         # 3. 통합 데이터 구성 및 Firestore 누적 저장 (us_index 컬렉션)
         us_data_to_save = {
-            'fng_value': index_data.value,
-            'fng_description': index_data.description,
+            'fng_value': fng_value,
+            'fng_description': fng_description,
             'timestamp': firestore.SERVER_TIMESTAMP,
             'fedfunds': fred_indicators['fedfunds'],
             'vix': fred_indicators['vix'],
@@ -189,14 +186,32 @@ def update_fng():
             'sp500': fred_indicators['sp500']
         }
         
-        db.collection('us_index').add(us_data_to_save)
-        print(f"US 통합 지표 Firestore 저장 완료 (us_index)")
+        # 월별 요약 문서(us_index_history)에는 차트에 쓰는 값만 미국 동부 기준 날짜로 기록
+        history_entry = {'fng_value': fng_value, 'fng_description': fng_description}
+        for name, item in fred_indicators.items():
+            history_entry[name] = item['value'] if item else None
+        us_date = datetime.now(US_EASTERN).strftime('%Y%m%d') # 서머타임(EDT, UTC-4) 반영
+        with telemetry.span("firestore"):
+            with IndexWriter(db, 'us_index') as writer:
+                writer.add(us_data_to_save, us_date, history=history_entry)
+            telemetry.add_stats("firestore", writer.stats)
+        print(f"US 통합 지표 Firestore 저장 완료 (us_index, us_index_history)")
+
+        # 정적 데이터 갱신 (public/data/us_index, 이력 파일이 없으면 Firestore 월별 요약으로 시작)
+        with telemetry.span("static_export"):
+            try:
+                latest = {k: v for k, v in us_data_to_save.items() if k != 'timestamp'}
+                latest['timestamp'] = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+                StaticExporter('us_index').update(latest, us_date, history_entry,
+                                                  seed=lambda: read_history(db, 'us_index', '0000-00', '9999-99'))
+            except Exception as e:
+                print(f"정적 데이터 갱신 중 오류 발생: {e}")
 
         # 4. AI 리포트 생성용 데이터 구성
         report_data = {
-            "fng_score": index_data.value,
-            "fng_description": index_data.description,
-            "last_update": str(index_data.last_update)
+            "fng_score": fng_value,
+            "fng_description": fng_description,
+            "last_update": str(index_data.last_update) if index_data is not None else None
         }
         report_data.update(fred_indicators)
         
@@ -205,37 +220,148 @@ def update_fng():
         print("Firestore client not initialized. Skipping FNG update.")
 
 
+# 감성 분석: 한국어/영어 금융 뉴스 사전 모델 (fng.sentiment). 첫 /analyze 요청에서 한 번 로드하므로
+# update_fng 등 감성 분석을 쓰지 않는 실행(cron)은 사전 로드 비용을 내지 않음
+SENTIMENT_MAX_BATCH = int(os.environ.get('SENTIMENT_MAX_BATCH', '10000')) # JSON 요청 한 번의 최대 문장 수
+SENTIMENT_STREAM_BATCH = int(os.environ.get('SENTIMENT_STREAM_BATCH', '1000')) # NDJSON 요청을 몇 줄씩 모아 점수를 매길지
+NDJSON_MIMETYPE = 'application/x-ndjson'
+NDJSON_READ_SIZE = 64 * 1024
+
+
+def _iter_lines(stream):
+    """요청 본문을 64KB씩 읽어 줄 단위로 나눕니다 (werkzeug 스트림을 줄 단위로 순회하면 바이트 단위로 읽어 매우 느림)."""
+    pending = b""
+    while True:
+        chunk = stream.read(NDJSON_READ_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _analyze_ndjson(lines):
+    """
+    NDJSON 요청(한 줄에 {"text": ..., "id": ...} 또는 JSON 문자열)을 SENTIMENT_STREAM_BATCH줄씩 모아 점수를 매기고,
+    결과를 요청과 같은 순서로 한 줄씩 내보냅니다. 잘못된 줄은 {"line": n, "error": ...}로 응답하고 계속 진행합니다.
+    """
+    batch = [] # (줄 번호, id, 문장 또는 None, 오류)
+
+    def flush():
+        results = iter(get_sentiment_model().analyze([text for _, _, text, _ in batch if text is not None]))
+        out = []
+        for line_no, item_id, text, error in batch:
+            row = next(results) if text is not None else {"line": line_no, "error": error}
+            if item_id is not None:
+                row["id"] = item_id
+            out.append(json.dumps(row, ensure_ascii=False))
+        batch.clear()
+        return "\n".join(out) + "\n"
+
+    for line_no, raw in enumerate(lines, 1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            batch.append((line_no, None, None, "invalid JSON"))
+        else:
+            if isinstance(item, str):
+                batch.append((line_no, None, item, None))
+            elif isinstance(item, dict) and isinstance(item.get('text'), str):
+                batch.append((line_no, item.get('id'), item['text'], None))
+            else:
+                batch.append((line_no, item.get('id') if isinstance(item, dict) else None, None, "'text' must be a string"))
+        if len(batch) >= SENTIMENT_STREAM_BATCH:
+            yield flush()
+    if batch:
+        yield flush()
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze_sentiment():
+    """
+    감성 분석 (score: 0~1, 0.5 중립 / compound: -1~1).
+    - {"text": "..."}: 결과 하나 (text, sentiment, score, compound, language, matches)
+    - {"texts": ["...", ...]}: {"results": [...], "count": n}, 한 번의 배치로 계산 (문서별 합산은 np.bincount)
+    - Content-Type: application/x-ndjson: 한 줄에 문장 하나, 결과도 NDJSON으로 스트리밍
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        return app.response_class(stream_with_context(_analyze_ndjson(_iter_lines(request.stream))), mimetype=NDJSON_MIMETYPE)
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
 
-    data = request.get_json()
-    text = data.get('text')
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
+    texts = data.get('texts')
+    if texts is not None:
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            return jsonify({"error": "'texts' must be a list of strings"}), 400
+        if len(texts) > SENTIMENT_MAX_BATCH:
+            return jsonify({"error": f"Too many texts (max {SENTIMENT_MAX_BATCH}); use NDJSON streaming"}), 413
+        results = get_sentiment_model().analyze(texts)
+        return jsonify({"results": results, "count": len(results)})
 
-    if not text:
+    text = data.get('text')
+    if not text or not isinstance(text, str):
         return jsonify({"error": "No 'text' field provided"}), 400
+    return jsonify(get_sentiment_model().analyze([text])[0])
 
-    # Placeholder for actual sentiment analysis logic
-    # In a real application, you would integrate a sentiment analysis library here
-    # For example, using NLTK, TextBlob, or a custom model
-    print(f"Received text for analysis: {text}")
-    
-    # Dummy sentiment result
-    sentiment_score = 0.5
-    sentiment_label = "neutral"
-    if "good" in text.lower() or "happy" in text.lower():
-        sentiment_label = "positive"
-        sentiment_score = 0.9
-    elif "bad" in text.lower() or "sad" in text.lower():
-        sentiment_label = "negative"
-        sentiment_score = 0.1
-
-    return jsonify({
-        "text": text,
-        "sentiment": sentiment_label,
-        "score": sentiment_score
-    })
+# 한국 공포/탐욕 지수 상주 서비스: 최신 스냅샷을 메모리에 두고 백그라운드에서 주기적으로 재계산
+# KR_INDEX_REFRESH_MINUTES가 설정된 경우에만 갱신 스레드를 시작 (예: gunicorn main:app)
+# 하루 한 번 전체 계산 후, 장중에는 KOSPI 현재가 관련 지표만 다시 계산하고 바뀐 값만 Firestore에 씀
+# (korea_fear_greed.IntradayIndex, 장 시간 외에는 요청 없음)
+kr_index_store = SnapshotStore()
+kr_index_refresher = None
+kr_intraday = None
+
+
+def _compute_kr_index():
+    global kr_intraday
+    import korea_fear_greed # pandas 등 무거운 모듈은 서비스가 켜진 경우에만 로드
+    if kr_intraday is None:
+        kr_intraday = korea_fear_greed.IntradayIndex(db=db)
+    return kr_intraday.refresh()
+
+
+def start_kr_index_service(interval_minutes):
+    global kr_index_refresher
+    if kr_index_refresher is None:
+        kr_index_refresher = SnapshotRefresher(kr_index_store, _compute_kr_index, interval_minutes * 60, name="kr-index")
+        kr_index_refresher.start()
+        print(f"/kr/index 갱신 스레드 시작 ({interval_minutes}분 간격)")
+    return kr_index_refresher
+
+
+@app.route('/kr/index', methods=['GET'])
+def kr_index():
+    snapshot = kr_index_store.current()
+    if snapshot is None:
+        return jsonify({"error": "Index not computed yet"}), 503
+
+    headers = {
+        "ETag": snapshot.etag,
+        "Last-Modified": snapshot.last_modified_http,
+        "Cache-Control": "public, max-age=60",
+    }
+    # If-None-Match가 있으면 ETag만 비교하고, 없을 때만 If-Modified-Since 사용 (RFC 9110)
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(snapshot.etag.strip('"'))
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and snapshot.last_modified <= since.timestamp()
+    if not_modified:
+        return app.response_class(status=304, headers=headers)
+    return app.response_class(snapshot.body, mimetype='application/json', headers=headers)
+
+
+if os.environ.get('KR_INDEX_REFRESH_MINUTES'):
+    start_kr_index_service(float(os.environ['KR_INDEX_REFRESH_MINUTES']))
 
 # Original standalone execution, now integrated with Flask app.run()
 if __name__ == "__main__":
@@ -48,6 +48,7 @@ const translations = {
         "indicator3": "시장의 폭(ADR)",
         "indicator4": "시장 변동성(VKOSPI)",
         "indicator5": "옵션 풋콜 비율(PCR)",
+        "indicator6": "뉴스 헤드라인 심리",
         "updated-at": "업데이트",
         "time-suffix": "(KST)",
         "exp-title-korea": "지표별 계산 방식 및 스케일링",
@@ -256,6 +257,7 @@ const translations = {
         "indicator3": "Market Breadth (ADR)",
         "indicator4": "Market Volatility (VKOSPI)",
         "indicator5": "Put/Call Ratio (PCR)",
+        "indicator6": "News Headline Sentiment",
         "updated-at": "Updated",
         "time-suffix": "(KST)",
         "exp-title-korea": "Calculation and Scaling per Indicator",